@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Streaming analyzer for TeX log files
+
+Parses pdfTeX's line-wrapped log output incrementally, tracks the input
+file stack from '(' / ')' nesting, and reports structured diagnostics
+(errors, undefined references and citations, font substitutions, bad
+boxes) plus a "rerun needed" verdict so a build driver can stop as soon
+as the output has converged.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from collections import namedtuple
+
+# pdfTeX hard-wraps log lines at max_print_line bytes (79 by default)
+MAX_PRINT_LINE = 79
+CHUNK_SIZE = 64 * 1024
+ERROR_CONTEXT_LINES = 16
+
+Diagnostic = namedtuple('Diagnostic', 'severity kind message file line')
+
+WARNING_RE = re.compile(r'^(?:(LaTeX Font|LaTeX|pdfTeX)|(?:Package|Class|Module) ([\w.@-]+)) Warning: (.*)$')
+ERROR_RE = re.compile(r'^! (.*)$')
+ERROR_LINE_RE = re.compile(r'^l\.(\d+)')
+BOX_RE = re.compile(
+    r'^(Overfull|Underfull) \\([hv]box) \(([^)]*)\) '
+    r'(in paragraph|in alignment|detected|has occurred while \\output is active)'
+    r'(?: at lines? (\d+)(?:--(\d+))?)?'
+)
+NO_FILE_RE = re.compile(r'^No file (\S+)\.$')
+INPUT_LINE_RE = re.compile(r'on input line (\d+)')
+REFERENCE_RE = re.compile(r"^Reference `([^']*)' on page \S+ undefined")
+CITATION_RE = re.compile(r"^Citation `([^']*)' on page \S+ undefined")
+MULTIPLY_DEFINED_RE = re.compile(r"^Label `([^']*)' multiply defined")
+FONT_RE = re.compile(r"^Font shape `([^']*)' (?:undefined|in size \S+ not available)")
+FILE_NAME_RE = re.compile(r'\(("[^"]+"|[^\s(){}<>\[\]"]+)')
+RERUN_RE = re.compile(r'\brerun\b|may have changed', re.IGNORECASE)
+# Auxiliary files whose absence on the first pass requires another, but only
+# when the document has something to resolve from them
+RERUN_AUX_EXTENSIONS = ('.aux', '.toc', '.lof', '.lot', '.out', '.bbl', '.nav', '.snm')
+# .aux lines that the next pass reads back (labels, citations, toc/lof/lot entries)
+AUX_ENTRY_RE = re.compile(r'^\\(?:newlabel|citation|@writefile)\{')
+
+
+def looks_like_file(name):
+    """Tell file names apart from ordinary parenthesised text"""
+    if name.startswith(('./', '../', '/', '"')) or re.match(r'^[A-Za-z]:[\\/]', name):
+        return True
+    return re.search(r'\.[A-Za-z][A-Za-z0-9]{0,5}$', name) is not None
+
+
+def aux_has_entries(path):
+    """True when the .aux written by the run holds anything a rerun would use"""
+    if not path:
+        return False
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return any(AUX_ENTRY_RE.match(line) for line in f)
+    except OSError:
+        return False
+
+
+def aux_path_for(log_path):
+    return os.path.splitext(log_path)[0] + '.aux'
+
+
+class LogAnalyzer:
+    """Incremental TeX log parser; feed() bytes as they arrive, then close()"""
+
+    def __init__(self, max_line=MAX_PRINT_LINE, aux_path=None):
+        self.max_line = max_line
+        # The .aux file written by the run, checked when an auxiliary file was missing
+        self.aux_path = aux_path
+        self._missing_aux = []
+        self.diagnostics = []
+        self.rerun_reasons = []
+        self.file_stack = []
+        self._partial = b''
+        self._wrapped = b''
+        self._pending = None
+        self._skip = None
+
+    @property
+    def current_file(self):
+        for name in reversed(self.file_stack):
+            if name is not None:
+                return name
+        return None
+
+    @property
+    def rerun_needed(self):
+        return bool(self.rerun_reasons)
+
+    @property
+    def errors(self):
+        return [d for d in self.diagnostics if d.severity == 'error']
+
+    def feed(self, data):
+        """Consume a chunk of raw log bytes; returns diagnostics completed by it"""
+        start = len(self.diagnostics)
+        lines = (self._partial + data).split(b'\n')
+        self._partial = lines.pop()
+        for raw in lines:
+            raw = raw.rstrip(b'\r')
+            if len(raw) == self.max_line:
+                self._wrapped += raw
+                continue
+            self._line((self._wrapped + raw).decode('utf-8', errors='replace'))
+            self._wrapped = b''
+        return self.diagnostics[start:]
+
+    def close(self):
+        """Flush buffered input at end of stream"""
+        start = len(self.diagnostics)
+        tail = self._wrapped + self._partial
+        self._wrapped = self._partial = b''
+        if tail:
+            self._line(tail.decode('utf-8', errors='replace'))
+        self._flush()
+        self._check_missing_aux()
+        return self.diagnostics[start:]
+
+    def summary(self):
+        counts = {}
+        for diagnostic in self.diagnostics:
+            counts[diagnostic.kind] = counts.get(diagnostic.kind, 0) + 1
+        return {
+            'errors': len(self.errors),
+            'counts': counts,
+            'rerun_needed': self.rerun_needed,
+            'rerun_reasons': self.rerun_reasons,
+        }
+
+    # -- line handling -------------------------------------------------
+
+    def _line(self, line):
+        if self._pending and self._continues(line):
+            return
+        self._flush()
+
+        if self._skip == 'box':
+            if not line.strip() or line == ' []':
+                self._skip = None
+            return
+        if self._skip == 'context':
+            # Second half of an error context line; may hold unbalanced parens
+            self._skip = None
+            return
+
+        error = ERROR_RE.match(line)
+        if error:
+            self._pending = ['error', 'error', [error.group(1)], None, self.current_file]
+            return
+
+        warning = WARNING_RE.match(line)
+        if warning:
+            source = warning.group(1) or warning.group(2)
+            self._pending = ['warning', source, [warning.group(3)], None, self.current_file]
+            return
+
+        box = BOX_RE.match(line)
+        if box:
+            kind = box.group(1).lower()
+            line_no = int(box.group(5)) if box.group(5) else None
+            message = f"{box.group(1)} \\{box.group(2)} ({box.group(3)}) {box.group(4)}"
+            self._emit('badbox', kind, message, self.current_file, line_no)
+            if box.group(4) in ('in paragraph', 'in alignment'):
+                self._skip = 'box'
+            return
+
+        missing = NO_FILE_RE.match(line)
+        if missing:
+            name = missing.group(1)
+            self._emit('info', 'missing-file', f"No file {name}", self.current_file, None)
+            if name.endswith(RERUN_AUX_EXTENSIONS):
+                self._missing_aux.append(name)
+            return
+
+        self._track_files(line)
+
+    def _continues(self, line):
+        """Attach continuation lines to the pending warning or error"""
+        severity, source, parts, line_no, _ = self._pending
+        if severity == 'error':
+            context = ERROR_LINE_RE.match(line)
+            if context:
+                self._pending[3] = int(context.group(1))
+                self._flush()
+                self._skip = 'context'
+                return True
+            if len(parts) > ERROR_CONTEXT_LINES:
+                # No l.<n> context (e.g. emergency stop); give up on this error
+                return False
+            # The message runs to the first blank line; the rest is help and context
+            if not line.strip():
+                parts.append('')
+            elif parts[-1] or len(parts) == 1:
+                parts.append(line.strip())
+            else:
+                parts.append('')
+            return True
+        prefix = f"({source})" if source not in ('LaTeX', 'pdfTeX') else None
+        if source == 'LaTeX Font':
+            prefix = '(Font)'
+        if prefix and line.startswith(prefix):
+            parts.append(line[len(prefix):].strip())
+            return True
+        if not prefix and line.strip() and not line.startswith(('(', '[', ')')):
+            # LaTeX warnings keep going until a blank line
+            parts.append(line.strip())
+            return True
+        return False
+
+    def _flush(self):
+        if not self._pending:
+            return
+        severity, source, parts, line_no, file_name = self._pending
+        self._pending = None
+        message = ' '.join(part for part in parts if part)
+        if severity == 'error':
+            self._emit('error', 'error', message, file_name, line_no)
+            return
+
+        match = INPUT_LINE_RE.search(message)
+        line_no = int(match.group(1)) if match else None
+        kind = 'package-warning'
+        if source == 'LaTeX':
+            kind = 'latex-warning'
+            if REFERENCE_RE.match(message):
+                kind = 'undefined-reference'
+            elif CITATION_RE.match(message):
+                kind = 'undefined-citation'
+            elif MULTIPLY_DEFINED_RE.match(message):
+                kind = 'multiply-defined'
+        elif source == 'LaTeX Font' and FONT_RE.match(message):
+            kind = 'font-substitution'
+        elif source in ('natbib', 'biblatex') and 'undefined' in message:
+            kind = 'undefined-citation'
+        self._emit('warning', kind, f"{source}: {message}" if kind == 'package-warning' else message,
+                   file_name, line_no)
+
+        if RERUN_RE.search(message) or (source == 'rerunfilecheck' and 'has changed' in message):
+            self.rerun_reasons.append(message)
+
+    def _check_missing_aux(self):
+        """A missing auxiliary file only matters if a second pass has something to resolve"""
+        if not self._missing_aux:
+            return
+        unresolved = any(d.kind in ('undefined-reference', 'undefined-citation') for d in self.diagnostics)
+        if unresolved or aux_has_entries(self.aux_path):
+            self.rerun_reasons.extend(f"{name} did not exist" for name in self._missing_aux)
+        self._missing_aux = []
+
+    def _emit(self, severity, kind, message, file_name, line_no):
+        self.diagnostics.append(Diagnostic(severity, kind, message, file_name, line_no))
+
+    def _track_files(self, line):
+        position = 0
+        while True:
+            opening = line.find('(', position)
+            closing = line.find(')', position)
+            if opening == -1 and closing == -1:
+                return
+            if closing == -1 or (opening != -1 and opening < closing):
+                match = FILE_NAME_RE.match(line, opening)
+                name = match.group(1).strip('"') if match else None
+                self.file_stack.append(name if name and looks_like_file(name) else None)
+                position = match.end() if match and name else opening + 1
+            else:
+                if self.file_stack:
+                    self.file_stack.pop()
+                position = closing + 1
+
+
+def analyze_stream(stream, analyzer=None):
+    """Run a binary stream through an analyzer chunk by chunk"""
+    analyzer = analyzer or LogAnalyzer()
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        analyzer.feed(chunk)
+    analyzer.close()
+    return analyzer
+
+
+def analyze_log(filename):
+    with open(filename, 'rb') as f:
+        return analyze_stream(f, LogAnalyzer(aux_path=aux_path_for(filename)))
+
+
+def format_diagnostic(diagnostic):
+    location = diagnostic.file or '?'
+    if diagnostic.line is not None:
+        location += f":{diagnostic.line}"
+    return f"{location}: {diagnostic.severity}: {diagnostic.message} [{diagnostic.kind}]"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize a TeX log file')
+    parser.add_argument('filename', help="log file to analyze, or '-' for stdin")
+    parser.add_argument('--json', action='store_true', help='print diagnostics and verdict as JSON')
+    parser.add_argument('--no-badboxes', action='store_true', help='hide overfull/underfull box reports')
+    parser.add_argument('--max-line', type=int, default=MAX_PRINT_LINE,
+                        help='max_print_line the log was written with (default: 79)')
+    args = parser.parse_args()
+
+    analyzer = LogAnalyzer(args.max_line, None if args.filename == '-' else aux_path_for(args.filename))
+    if args.filename == '-':
+        analyze_stream(sys.stdin.buffer, analyzer)
+    else:
+        with open(args.filename, 'rb') as f:
+            analyze_stream(f, analyzer)
+
+    diagnostics = [d for d in analyzer.diagnostics
+                   if not (args.no_badboxes and d.severity == 'badbox')]
+    if args.json:
+        print(json.dumps({
+            'diagnostics': [d._asdict() for d in diagnostics],
+            **analyzer.summary(),
+        }, indent=2))
+    else:
+        for diagnostic in diagnostics:
+            print(format_diagnostic(diagnostic))
+        summary = analyzer.summary()
+        counts = ', '.join(f"{count} {kind}" for kind, count in sorted(summary['counts'].items()))
+        print(f"\n{len(analyzer.diagnostics)} diagnostics ({counts or 'none'})")
+        if analyzer.rerun_needed:
+            print(f"Rerun needed: {analyzer.rerun_reasons[0]}")
+        else:
+            print("Output has converged; no rerun needed.")
+
+    sys.exit(1 if analyzer.errors else 0)
+
+if __name__ == "__main__":
+    main()
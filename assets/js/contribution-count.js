@@ -2,6 +2,8 @@
   'use strict';
 
   var TIMEOUT_MS = 5000;
+  // The build re-stamps the snapshot at least every six days; older than this, ask GitHub directly
+  var SNAPSHOT_MAX_AGE_MS = 8 * 24 * 60 * 60 * 1000;
   var activeRequest = null;
   var requestSequence = 0;
   var hasRequested = false;
@@ -29,6 +31,35 @@
     if (value && typeof count !== 'number' && state !== 'success') value.textContent = '—';
   }
 
+  function snapshot(container) {
+    var count = Number(container.getAttribute('data-snapshot-count'));
+    var generated = Date.parse(container.getAttribute('data-snapshot-generated') || '');
+    if (!container.hasAttribute('data-snapshot-count') || !Number.isInteger(count) || count < 0 || isNaN(generated)) return null;
+    var age = Date.now() - generated;
+    if (age < -5 * 60 * 1000 || age > SNAPSHOT_MAX_AGE_MS) return null;
+    return { count: count, date: new Date(generated).toISOString().slice(0, 10) };
+  }
+
+  function showCount(count, asOf) {
+    if (count === 0) {
+      setState('empty', 'Selected contribution records remain available above. View the evidence or retry the count.', 0);
+    } else {
+      setState('success', count + ' merged pull requests to external repositories' + (asOf ? ' as of ' + asOf : '') + '.', count);
+    }
+  }
+
+  // First load: use the build-time snapshot when it is fresh, else the live API
+  function loadCount() {
+    var container = root();
+    if (!container || hasRequested || activeRequest) return;
+    var recent = snapshot(container);
+    if (!recent) return refreshCount();
+    hasRequested = true;
+    var button = retryButton();
+    if (button) button.textContent = 'Refresh count';
+    showCount(recent.count, recent.date);
+  }
+
   function isRateLimited(response, body) {
     return response.status === 403 || response.status === 429 || /rate limit/i.test(body || '');
   }
@@ -80,12 +111,7 @@
           setState('incomplete', 'GitHub returned a partial result, so no exact count is shown. The selected evidence remains available; retry later.');
           return;
         }
-        var count = typeof payload.total_count === 'number' ? payload.total_count : 0;
-        if (count === 0) {
-          setState('empty', 'Selected contribution records remain available above. View the evidence or retry the count.', 0);
-        } else {
-          setState('success', count + ' merged pull requests to external repositories.', count);
-        }
+        showCount(typeof payload.total_count === 'number' ? payload.total_count : 0);
       } catch (error) {
         if (request.cancelled || request !== activeRequest) return;
         if (error && error.name === 'AbortError' && request.timedOut) {
@@ -125,7 +151,7 @@
       var observer = new IntersectionObserver(function (entries) {
         if (!entries.some(function (entry) { return entry.isIntersecting; }) || hasRequested) return;
         observer.disconnect();
-        refreshCount();
+        loadCount();
       }, { rootMargin: '240px 0px' });
       observer.observe(container);
     }
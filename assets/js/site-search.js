@@ -0,0 +1,267 @@
+(function () {
+  'use strict';
+
+  // Index format and tokenization mirror build-search-index.py
+  var MAX_RESULTS = 20;
+  var PREFIX_WEIGHT = 0.7;
+  var DEBOUNCE_MS = 150;
+  var TERM_END = '{'; // sorts after every [a-z0-9] term character
+
+  var container = document.querySelector('[data-site-search]');
+  if (!container) return;
+  var input = container.querySelector('[data-search-input]');
+  var form = container.querySelector('form');
+  var status = container.querySelector('[data-search-status]');
+  var list = container.querySelector('[data-search-results]');
+  var manifestUrl = container.getAttribute('data-search-index');
+  var files = {};
+  var manifest = null;
+  var latest = 0;
+
+  function fetchJson(url, options) {
+    return fetch(url, options).then(function (response) {
+      if (!response.ok) throw new Error('HTTP ' + response.status);
+      return response.json();
+    });
+  }
+
+  function loadManifest() {
+    if (!manifest) {
+      manifest = fetchJson(manifestUrl, { cache: 'no-cache' }).catch(function (error) {
+        manifest = null;
+        throw error;
+      });
+    }
+    return manifest;
+  }
+
+  // Shard and document files are content-hashed, so each is fetched at most once
+  function loadFile(name) {
+    if (!files[name]) {
+      files[name] = fetchJson(new URL(name, new URL(manifestUrl, window.location.href)).href).catch(function (error) {
+        delete files[name];
+        throw error;
+      });
+    }
+    return files[name];
+  }
+
+  function stem(token) {
+    if (token.length > 4 && /ies$/.test(token)) return token.slice(0, -3) + 'y';
+    if (token.length > 3 && /s$/.test(token) && !/(ss|us|is)$/.test(token)) return token.slice(0, -1);
+    return token;
+  }
+
+  function tokenize(text, stopwords) {
+    var folded = text.normalize('NFKD').replace(/[^\x00-\x7f]/g, '').toLowerCase();
+    return (folded.match(/[a-z0-9]+/g) || []).filter(function (token) {
+      return token.length >= 2 && token.length <= 32 && !stopwords[token] && !(/^\d+$/.test(token) && token.length !== 4);
+    }).map(stem);
+  }
+
+  // Index of the last shard whose first term sorts at or before `term`
+  function shardIndex(shards, term) {
+    var low = 0;
+    var high = shards.length - 1;
+    var found = 0;
+    while (low <= high) {
+      var middle = (low + high) >> 1;
+      if (shards[middle][0] <= term) {
+        found = middle;
+        low = middle + 1;
+      } else {
+        high = middle - 1;
+      }
+    }
+    return found;
+  }
+
+  // Shards holding `term`, or every term starting with it when `expand` is set
+  function shardsFor(shards, term, expand) {
+    var first = shardIndex(shards, term);
+    var names = [shards[first][1]];
+    for (var index = first + 1; expand && index < shards.length && shards[index][0] < term + TERM_END; index += 1) {
+      names.push(shards[index][1]);
+    }
+    return names;
+  }
+
+  function addPostings(postings, scores, factor) {
+    for (var index = 0; index < postings.length; index += 2) {
+      var weight = postings[index + 1] * factor;
+      if (!(postings[index] in scores) || scores[postings[index]] < weight) scores[postings[index]] = weight;
+    }
+  }
+
+  function addSubtree(node, scores, factor) {
+    Object.keys(node).forEach(function (edge) {
+      if (edge === '') addPostings(node[''], scores, factor);
+      else addSubtree(node[edge], scores, factor);
+    });
+  }
+
+  // Walk a shard's radix trie, keeping each document's best weight for this query term
+  function match(shard, term, expand, scores) {
+    var node = shard.t;
+    var rest;
+    if (term.indexOf(shard.p) === 0) {
+      rest = term.slice(shard.p.length);
+    } else if (expand && shard.p.indexOf(term) === 0) {
+      addSubtree(node, scores, PREFIX_WEIGHT);
+      return;
+    } else {
+      return;
+    }
+    while (rest) {
+      var next = null;
+      var edges = Object.keys(node);
+      for (var index = 0; index < edges.length; index += 1) {
+        if (edges[index] && edges[index][0] === rest[0]) next = edges[index];
+      }
+      if (next === null) return;
+      if (rest.indexOf(next) === 0) {
+        rest = rest.slice(next.length);
+        node = node[next];
+      } else if (expand && next.indexOf(rest) === 0) {
+        addSubtree(node[next], scores, PREFIX_WEIGHT);
+        return;
+      } else {
+        return;
+      }
+    }
+    if (node['']) addPostings(node[''], scores, 1);
+    if (expand) {
+      Object.keys(node).forEach(function (edge) {
+        if (edge !== '') addSubtree(node[edge], scores, PREFIX_WEIGHT);
+      });
+    }
+  }
+
+  function search(query) {
+    return loadManifest().then(function (index) {
+      var stopwords = {};
+      index.stopwords.forEach(function (word) { stopwords[word] = true; });
+      var terms = tokenize(query, stopwords);
+      if (!terms.length || !index.shards.length) return { terms: terms, results: [] };
+
+      // Only the last term is still being typed, so only it matches as a prefix
+      var lookups = terms.map(function (term, position) {
+        var expand = position === terms.length - 1;
+        return Promise.all(shardsFor(index.shards, term, expand).map(loadFile)).then(function (shards) {
+          var scores = {};
+          shards.forEach(function (shard) { match(shard, term, expand, scores); });
+          return scores;
+        });
+      });
+      return Promise.all(lookups).then(function (loaded) {
+        var totals = null;
+        loaded.forEach(function (scores) {
+          var next = {};
+          Object.keys(scores).forEach(function (doc) {
+            if (totals === null || doc in totals) next[doc] = (totals ? totals[doc] : 0) + scores[doc];
+          });
+          totals = next;
+        });
+        var ranked = Object.keys(totals).sort(function (left, right) {
+          return totals[right] - totals[left] || left - right;
+        }).slice(0, MAX_RESULTS);
+        // Fetch metadata only for the document files the top results fall in
+        var needed = {};
+        ranked.forEach(function (doc) { needed[Math.floor(doc / index.docs_per_file)] = true; });
+        var chunks = Object.keys(needed);
+        return Promise.all(chunks.map(function (chunk) { return loadFile(index.docs[chunk]); })).then(function (loadedDocs) {
+          var byChunk = {};
+          chunks.forEach(function (chunk, position) { byChunk[chunk] = loadedDocs[position]; });
+          var results = ranked.map(function (doc) {
+            return byChunk[Math.floor(doc / index.docs_per_file)][doc % index.docs_per_file];
+          });
+          return { terms: terms, results: results };
+        });
+      });
+    });
+  }
+
+  function element(tag, className, text) {
+    var node = document.createElement(tag);
+    if (className) node.className = className;
+    if (text) node.textContent = text;
+    return node;
+  }
+
+  function renderResult(doc) {
+    var item = element('li');
+    var article = element('article', 'secondary-record');
+    article.setAttribute('data-secondary-record', '');
+    article.setAttribute('data-search-result', doc[1]);
+    article.appendChild(element('p', 'secondary-record__eyebrow', doc[2]));
+    var body = element('div', 'secondary-record__body');
+    var heading = element('h3');
+    var link = element('a', null, doc[0]);
+    link.href = doc[1];
+    heading.appendChild(link);
+    body.appendChild(heading);
+    if (doc[3]) {
+      var meta = element('p', 'secondary-record__meta');
+      var time = element('time', null, doc[3]);
+      time.setAttribute('datetime', doc[3]);
+      meta.appendChild(time);
+      body.appendChild(meta);
+    }
+    if (doc[4]) body.appendChild(element('p', 'secondary-record__outcome', doc[4]));
+    article.appendChild(body);
+    item.appendChild(article);
+    return item;
+  }
+
+  function run(query) {
+    var request = ++latest;
+    query = query.trim();
+    if (!query) {
+      list.replaceChildren();
+      status.textContent = '';
+      return;
+    }
+    container.setAttribute('aria-busy', 'true');
+    search(query).then(function (found) {
+      if (request !== latest) return;
+      list.replaceChildren.apply(list, found.results.map(renderResult));
+      if (!found.terms.length) status.textContent = 'Type a more specific word to search.';
+      else if (!found.results.length) status.textContent = 'No results for “' + query + '”.';
+      else status.textContent = found.results.length + (found.results.length === 1 ? ' result' : ' results') + ' for “' + query + '”.';
+    }).catch(function () {
+      if (request !== latest) return;
+      list.replaceChildren();
+      status.textContent = 'Search is unavailable right now. Browse the posts and projects instead.';
+    }).then(function () {
+      if (request === latest) container.setAttribute('aria-busy', 'false');
+    });
+  }
+
+  function updateLocation(query) {
+    var url = new URL(window.location.href);
+    if (query.trim()) url.searchParams.set('q', query.trim());
+    else url.searchParams.delete('q');
+    window.history.replaceState(null, '', url);
+  }
+
+  var timer = null;
+  input.addEventListener('input', function () {
+    window.clearTimeout(timer);
+    timer = window.setTimeout(function () {
+      updateLocation(input.value);
+      run(input.value);
+    }, DEBOUNCE_MS);
+  });
+  form.addEventListener('submit', function (event) {
+    event.preventDefault();
+    window.clearTimeout(timer);
+    updateLocation(input.value);
+    run(input.value);
+  });
+
+  var initial = new URL(window.location.href).searchParams.get('q');
+  if (initial) {
+    input.value = initial;
+    run(initial);
+  }
+})();
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for validate-latex.py
+
+Runs the validator's single-pass engine over a corpus made of the real
+repository documents (_posts/*.tex, figures/*.tex) plus generated
+stress documents (deep nesting, very long lines, comment-heavy sources
+and a multi-megabyte paper) and reports MB/s, the cost of each rule over
+the bare lexer pass, and peak memory. Results can be saved as a baseline
+so a slow new rule is caught before it ships:
+
+    python3 bench-latex.py --save-baseline
+    python3 bench-latex.py --compare
+"""
+import argparse
+import gc
+import glob
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from script_loader import load_script
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(REPO_ROOT, '.bench-latex-baseline.json')
+REAL_DOCUMENTS = ['_posts/*.tex', 'figures/*.tex']
+# Allowed slowdown against the baseline before --compare fails
+TOLERANCE = 0.25
+
+WORDS = (
+    'contract', 'model', 'token', 'schema', 'latency', 'provider', 'violation',
+    'framework', 'response', 'retry', 'budget', 'output', 'prompt', 'taxonomy',
+)
+
+
+validator = load_script('validate-latex.py')
+
+
+# ---------------------------------------------------------------------------
+# Synthetic corpus
+
+def sentence(rng, words=12):
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    extras = [
+        lambda: f" $x_{{{rng.randint(1, 9)}}}^2$",
+        lambda: f" \\textbf{{{rng.choice(WORDS)}}}",
+        lambda: f" \\cite{{key{rng.randint(1, 200)}}}",
+        lambda: f" \\ref{{sec:{rng.choice(WORDS)}}}",
+        lambda: " 42\\% of calls",
+    ]
+    for _ in range(rng.randint(0, 3)):
+        text += rng.choice(extras)()
+    return text.capitalize() + '.'
+
+
+def wrap_document(body):
+    return '\\documentclass{article}\n\\usepackage{amsmath}\n\\begin{document}\n' + body + '\\end{document}\n'
+
+
+def generate_nested(rng, depth=60, repeat=40):
+    parts = []
+    envs = ('itemize', 'enumerate', 'minipage', 'center', 'quote')
+    for _ in range(repeat):
+        stack = []
+        for level in range(depth):
+            env = envs[level % len(envs)]
+            arg = '{0.9\\linewidth}' if env == 'minipage' else ''
+            parts.append('  ' * level + f"\\begin{{{env}}}{arg}{{")
+            if env in ('itemize', 'enumerate'):
+                parts.append('  ' * level + f"\\item {sentence(rng, 6)}")
+            stack.append(env)
+        for level, env in reversed(list(enumerate(stack))):
+            parts.append('  ' * level + f"}}\\end{{{env}}}")
+    return wrap_document('\n'.join(parts) + '\n')
+
+
+def generate_long_lines(rng, lines=200, length=20000):
+    parts = []
+    for _ in range(lines):
+        line = []
+        size = 0
+        while size < length:
+            chunk = sentence(rng) + ' '
+            line.append(chunk)
+            size += len(chunk)
+        parts.append(''.join(line))
+    return wrap_document('\n'.join(parts) + '\n')
+
+
+def generate_comments(rng, lines=60000):
+    parts = []
+    for _ in range(lines):
+        if rng.random() < 0.7:
+            parts.append(f"% {sentence(rng)} {{ unbalanced & _ # in a comment")
+        else:
+            parts.append(sentence(rng) + f" % trailing {rng.choice(WORDS)}")
+    return wrap_document('\n'.join(parts) + '\n')
+
+
+def generate_large(rng, megabytes=4.0):
+    target = int(megabytes * 1024 * 1024)
+    parts = []
+    size = 0
+    section = 0
+    while size < target:
+        section += 1
+        block = [f"\\section{{{rng.choice(WORDS).title()} {section}}}\\label{{sec:s{section}}}"]
+        for _ in range(rng.randint(3, 8)):
+            block.append(' '.join(sentence(rng) for _ in range(rng.randint(3, 7))))
+            block.append('')
+        block.append('\\begin{table}[h]\n\\centering\n\\begin{tabular}{lrr}\n\\toprule')
+        for _ in range(rng.randint(3, 10)):
+            block.append(f"{rng.choice(WORDS)} & {rng.randint(1, 999)} & {rng.random():.2f} \\\\")
+        block.append('\\bottomrule\n\\end{tabular}\n\\end{table}')
+        block.append(f"\\begin{{equation}}\\label{{eq:e{section}}}\n"
+                     f"C_{{{section}}} = \\sum_{{i=1}}^{{n}} \\alpha_i x_i\n\\end{{equation}}")
+        block.append(f"% TODO revisit section {section}")
+        text = '\n'.join(block) + '\n'
+        parts.append(text)
+        size += len(text)
+    return wrap_document(''.join(parts))
+
+
+def build_corpus(seed=1, megabytes=4.0):
+    """Return [(name, text)] for the real documents and the synthetic ones"""
+    corpus = []
+    for pattern in REAL_DOCUMENTS:
+        for path in sorted(glob.glob(os.path.join(REPO_ROOT, pattern))):
+            with open(path, 'r', encoding='utf-8') as f:
+                corpus.append((os.path.relpath(path, REPO_ROOT), f.read()))
+    rng = random.Random(seed)
+    corpus.append(('synthetic/nested', generate_nested(rng)))
+    corpus.append(('synthetic/long-lines', generate_long_lines(rng)))
+    corpus.append(('synthetic/comments', generate_comments(rng)))
+    corpus.append((f'synthetic/large-{megabytes:g}mb', generate_large(rng, megabytes)))
+    return corpus
+
+
+def write_corpus(directory, corpus):
+    os.makedirs(directory, exist_ok=True)
+    for name, text in corpus:
+        path = os.path.join(directory, name.replace('/', '__'))
+        if not path.endswith('.tex'):
+            path += '.tex'
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"  • {path} ({len(text.encode('utf-8')) / 1024:.1f} KB)")
+
+
+# ---------------------------------------------------------------------------
+# Measurements
+
+def token_rules():
+    """Every rule that runs inside the engine pass (index rules run on the index)"""
+    return [rule for rule in validator.RULES if not issubclass(rule, validator.IndexRule)]
+
+
+def time_once(rule_classes, text):
+    """Wall time of one engine run over text with fresh rule instances"""
+    rules = [rule() for rule in rule_classes]
+    # Like timeit, keep collector pauses out of the measurement
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        validator.Engine(rules).run('bench.tex', text)
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def time_run(rule_classes, text, repeat):
+    """Best wall time of the engine over text with fresh rule instances"""
+    return min(time_once(rule_classes, text) for _ in range(repeat))
+
+
+def time_rule(rule, text, repeat):
+    """Best times of the bare lexer and of the rule alone, run alternately
+
+    Both minimums come from the same number of runs taken side by side, so
+    neither side gets more chances at a fast run and drift during the
+    benchmark affects both equally.
+    """
+    lexer = rule_alone = None
+    for _ in range(repeat):
+        bare = time_once([], text)
+        with_rule = time_once([rule], text)
+        lexer = bare if lexer is None else min(lexer, bare)
+        rule_alone = with_rule if rule_alone is None else min(rule_alone, with_rule)
+    return lexer, rule_alone
+
+
+def peak_memory(rule_classes, text):
+    tracemalloc.start()
+    try:
+        validator.Engine([rule() for rule in rule_classes]).run('bench.tex', text)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmark(corpus, repeat, per_rule=True):
+    rules = token_rules()
+    total_bytes = sum(len(text.encode('utf-8')) for _, text in corpus)
+    documents = {}
+    for name, text in corpus:
+        size = len(text.encode('utf-8'))
+        elapsed = time_run(rules, text, repeat)
+        documents[name] = {
+            'bytes': size,
+            'seconds': elapsed,
+            'mb_per_s': size / elapsed / 1e6 if elapsed else 0.0,
+            'peak_bytes': peak_memory(rules, text),
+        }
+
+    # Per-rule cost: each rule alone minus the bare lexer pass timed
+    # alternately with it, so both sides are the best of the same number of
+    # runs. The reported lexer time is the best over all of those runs.
+    rule_costs = {}
+    if per_rule:
+        lexer = {}
+        for rule in rules:
+            cost = 0.0
+            for name, text in corpus:
+                bare, alone = time_rule(rule, text, repeat)
+                lexer[name] = bare if name not in lexer else min(lexer[name], bare)
+                cost += max(alone - bare, 0.0)
+            rule_costs[rule.name] = cost
+        rule_costs['(lexer)'] = sum(lexer.values())
+
+    total_seconds = sum(result['seconds'] for result in documents.values())
+    return {
+        'documents': documents,
+        'rules': rule_costs,
+        'total': {
+            'bytes': total_bytes,
+            'seconds': total_seconds,
+            'mb_per_s': total_bytes / total_seconds / 1e6 if total_seconds else 0.0,
+            'peak_bytes': max(result['peak_bytes'] for result in documents.values()),
+        },
+    }
+
+
+def print_report(results):
+    print(f"{'document':38} {'size':>10} {'time':>9} {'MB/s':>7} {'peak':>10}")
+    print('-' * 78)
+    for name, result in results['documents'].items():
+        print(f"{name:38} {result['bytes'] / 1024:9.1f}K {result['seconds'] * 1000:8.1f}ms "
+              f"{result['mb_per_s']:7.2f} {result['peak_bytes'] / 1024:9.1f}K")
+    total = results['total']
+    print('-' * 78)
+    print(f"{'total':38} {total['bytes'] / 1024:9.1f}K {total['seconds'] * 1000:8.1f}ms "
+          f"{total['mb_per_s']:7.2f} {total['peak_bytes'] / 1024:9.1f}K")
+
+    if results['rules']:
+        lexer = results['rules']['(lexer)']
+        print(f"\n{'rule':28} {'cost':>10} {'vs lexer':>9}")
+        print('-' * 49)
+        for name, cost in sorted(results['rules'].items(), key=lambda item: -item[1]):
+            share = cost / lexer * 100 if lexer else 0.0
+            print(f"{name:28} {cost * 1000:8.1f}ms {share:8.1f}%")
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Return regressions beyond tolerance against a saved baseline"""
+    regressions = []
+    old_total = baseline['total']['mb_per_s']
+    new_total = results['total']['mb_per_s']
+    if old_total and new_total < old_total * (1 - tolerance):
+        regressions.append(f"total throughput {new_total:.2f} MB/s < baseline {old_total:.2f} MB/s")
+
+    # Rule costs are judged against the lexer so machine speed cancels out
+    old_lexer = baseline['rules'].get('(lexer)')
+    new_lexer = results['rules'].get('(lexer)')
+    if old_lexer and new_lexer:
+        for name, cost in results['rules'].items():
+            if name == '(lexer)':
+                continue
+            new_share = cost / new_lexer
+            old_share = baseline['rules'].get(name, 0.0) / old_lexer
+            if new_share > old_share + tolerance * max(old_share, 0.05):
+                regressions.append(f"rule {name} costs {new_share * 100:.1f}% of the lexer pass "
+                                   f"(baseline {old_share * 100:.1f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark validate-latex.py throughput')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement; the best is kept')
+    parser.add_argument('--size', type=float, default=4.0, help='size of the large synthetic document in MB')
+    parser.add_argument('--seed', type=int, default=1, help='seed for the synthetic corpus')
+    parser.add_argument('--no-rules', action='store_true', help='skip the per-rule cost breakdown')
+    parser.add_argument('--write-corpus', metavar='DIR', help='write the corpus to DIR and exit')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    parser.add_argument('--save-baseline', action='store_true', help=f"store results in {os.path.basename(BASELINE_FILE)}")
+    parser.add_argument('--compare', action='store_true', help='fail if results regress against the baseline')
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.seed, args.size)
+    if args.write_corpus:
+        write_corpus(args.write_corpus, corpus)
+        sys.exit(0)
+
+    results = run_benchmark(corpus, max(1, args.repeat), per_rule=not args.no_rules)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+    if args.save_baseline:
+        with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {os.path.relpath(BASELINE_FILE, REPO_ROOT)}")
+
+    if args.compare:
+        try:
+            with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except OSError:
+            print("No baseline found; run with --save-baseline first.")
+            sys.exit(1)
+        regressions = compare(results, baseline)
+        if regressions:
+            print("\nPerformance regressions:")
+            for regression in regressions:
+                print(f"  ✗ {regression}")
+            sys.exit(1)
+        print("\n✓ No regressions against the baseline")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Responsive image variant pipeline
+
+Resizes every raster under assets/images (and the generated paper
+figures, figures/fig*.png) into width-bucketed WebP and, when the
+installed Pillow can encode it, AVIF variants under
+assets/images/responsive/. Sources whose content hash and settings are
+unchanged since the last run are skipped; changed ones are encoded in a
+process pool. The manifest written to _data/responsive_images.json is
+read by _includes/responsive-image.html to emit <picture> srcsets:
+
+    python3 build-images.py            # refresh stale variants
+    python3 build-images.py --force    # re-encode everything
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.path.join(REPO_ROOT, 'assets', 'images', 'responsive')
+MANIFEST = os.path.join(REPO_ROOT, '_data', 'responsive_images.json')
+SOURCES = ['assets/images/**/*.png', 'assets/images/**/*.jpg', 'assets/images/**/*.jpeg',
+           'assets/images/**/*.webp', 'figures/fig*.png']
+# Directories Jekyll does not publish; their variants need a full-width fallback
+UNPUBLISHED = ('figures/',)
+WIDTHS = (320, 480, 640, 960, 1280, 1920)
+QUALITY = {'webp': 80, 'avif': 55}
+# Icons are served at their natural size; variants would never be picked
+SKIPPED_DIRS = ('assets/images/responsive/', 'assets/images/favicon/', 'assets/images/icons/')
+# Hand-made variants such as romel-320.webp are outputs, not sources
+VARIANT_RE = re.compile(r'-\d+\.webp$')
+
+
+def available_formats():
+    """WebP always; AVIF with Pillow >= 11.3 or the pillow-avif-plugin"""
+    if Image is None:
+        return []
+    try:
+        import pillow_avif  # noqa: F401  (registers the AVIF codec)
+    except ImportError:
+        pass
+    Image.init()
+    return [fmt for fmt in ('avif', 'webp') if fmt.upper() in Image.SAVE]
+
+
+def find_sources():
+    sources = set()
+    for pattern in SOURCES:
+        for path in glob.glob(os.path.join(REPO_ROOT, pattern), recursive=True):
+            relative = os.path.relpath(path, REPO_ROOT).replace(os.sep, '/')
+            if relative.startswith(SKIPPED_DIRS) or VARIANT_RE.search(relative):
+                continue
+            sources.add(relative)
+    return sorted(sources)
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def settings_key(formats):
+    return json.dumps({'widths': WIDTHS, 'quality': QUALITY, 'formats': formats}, sort_keys=True)
+
+
+def source_key(path, formats):
+    """Content hash of the source combined with the encoder settings"""
+    digest = hashlib.sha256(file_hash(os.path.join(REPO_ROOT, path)).encode('ascii'))
+    digest.update(settings_key(formats).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def site_path(relative):
+    return '/' + relative
+
+
+def variant_path(source, width, fmt):
+    if source.startswith('assets/images/'):
+        source = source[len('assets/images/'):]
+    stem = os.path.splitext(source)[0]
+    return f"assets/images/responsive/{stem}-{width}.{fmt}"
+
+
+def bucket_widths(width, published):
+    """Buckets below the source width; unpublished sources also get a full-width copy"""
+    widths = [bucket for bucket in WIDTHS if bucket < width]
+    if not published or not widths:
+        widths.append(width)
+    return widths
+
+
+def encode(task):
+    """Worker: resize one source into every bucket and format; None for an unreadable source"""
+    source, formats, published = task
+    try:
+        image = Image.open(os.path.join(REPO_ROOT, source))
+        image.load()
+    except OSError:
+        return source, None
+    with image:
+        width, height = image.size
+        if image.mode not in ('RGB', 'RGBA'):
+            alpha = image.mode in ('LA', 'PA') or 'transparency' in image.info
+            image = image.convert('RGBA' if alpha else 'RGB')
+        entry = {'width': width, 'height': height}
+        for fmt in formats:
+            variants = []
+            for bucket in bucket_widths(width, published):
+                target = variant_path(source, bucket, fmt)
+                resized = image if bucket == width else image.resize(
+                    (bucket, max(1, round(height * bucket / width))), Image.LANCZOS)
+                os.makedirs(os.path.dirname(os.path.join(REPO_ROOT, target)), exist_ok=True)
+                resized.save(os.path.join(REPO_ROOT, target), fmt.upper(), quality=QUALITY[fmt])
+                variants.append({'path': site_path(target), 'width': bucket})
+            entry[fmt] = variants
+    return source, entry
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest):
+    content = json.dumps(manifest, indent=2, sort_keys=True) + '\n'
+    try:
+        with open(MANIFEST, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return
+    except OSError:
+        pass
+    with open(MANIFEST, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def outputs_exist(entry, formats):
+    return all(os.path.exists(os.path.join(REPO_ROOT, variant['path'].lstrip('/')))
+               for fmt in formats for variant in entry.get(fmt, []))
+
+
+def prune(manifest):
+    """Delete variant files no manifest entry refers to"""
+    keep = {os.path.join(REPO_ROOT, variant['path'].lstrip('/'))
+            for entry in manifest.values() for key, value in entry.items()
+            if isinstance(value, list) for variant in value}
+    removed = 0
+    for path in glob.glob(os.path.join(OUTPUT_DIR, '**', '*.*'), recursive=True):
+        if path not in keep:
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def refresh(sources=None, jobs=None, force=False):
+    """Encode stale sources in parallel; returns ({source: status}, manifest)"""
+    formats = available_formats()
+    previous = load_manifest()
+    sources = sources or find_sources()
+
+    manifest, stale = {}, []
+    for source in sources:
+        key = source_key(source, formats)
+        entry = previous.get(site_path(source))
+        if not force and entry and entry.get('hash') == key and outputs_exist(entry, formats):
+            manifest[site_path(source)] = entry
+        else:
+            stale.append((source, key))
+
+    results = {source: 'cached' for source in sources if site_path(source) in manifest}
+    if stale:
+        tasks = [(source, formats, not source.startswith(UNPUBLISHED)) for source, _ in stale]
+        keys = dict(stale)
+        with ProcessPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as executor:
+            for source, entry in executor.map(encode, tasks):
+                if entry is None:
+                    results[source] = 'unreadable'
+                    continue
+                entry['hash'] = keys[source]
+                if source.startswith(UNPUBLISHED):
+                    entry['fallback'] = entry['webp'][-1]['path']
+                else:
+                    entry['fallback'] = site_path(source)
+                manifest[site_path(source)] = entry
+                results[source] = 'encoded'
+
+    # Keep entries for sources outside this run (e.g. when only some were named)
+    for path, entry in previous.items():
+        if path not in manifest and os.path.exists(os.path.join(REPO_ROOT, path.lstrip('/'))) \
+                and path.lstrip('/') not in sources:
+            manifest[path] = entry
+    save_manifest(manifest)
+    prune(manifest)
+    return results, manifest
+
+
+def variant_bytes(entry, fmt):
+    return sum(os.path.getsize(os.path.join(REPO_ROOT, variant['path'].lstrip('/')))
+               for variant in entry.get(fmt, [])[:1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build width-bucketed WebP/AVIF variants for site images')
+    parser.add_argument('sources', nargs='*', metavar='IMAGE',
+                        help='repository-relative images to refresh (default: every raster)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='images to encode in parallel')
+    parser.add_argument('--force', action='store_true', help='re-encode even if the source is unchanged')
+    args = parser.parse_args()
+
+    if Image is None:
+        print("Pillow not found. Install it with: pip install Pillow")
+        sys.exit(1)
+    if 'webp' not in available_formats():
+        print("This Pillow build cannot encode WebP; reinstall it with libwebp.")
+        sys.exit(1)
+    missing = [source for source in args.sources if not os.path.exists(os.path.join(REPO_ROOT, source))]
+    if missing:
+        parser.error(f"no such image(s): {', '.join(missing)}")
+
+    sources = [os.path.relpath(os.path.join(REPO_ROOT, source), REPO_ROOT).replace(os.sep, '/')
+               for source in args.sources]
+    results, manifest = refresh(sources, max(1, args.jobs), args.force)
+    saved = 0
+    for source, status in results.items():
+        if status == 'unreadable':
+            print(f"✗ {source}: not an image Pillow can read; skipped")
+            continue
+        entry = manifest[site_path(source)]
+        original = os.path.getsize(os.path.join(REPO_ROOT, source))
+        smallest = variant_bytes(entry, 'webp')
+        saved += max(original - smallest, 0)
+        print(f"✓ {source}: {status} ({original / 1024:.1f} KB → {smallest / 1024:.1f} KB at "
+              f"{entry['webp'][0]['width']}w)")
+    formats = ', '.join(available_formats())
+    print(f"\n{len(results)} images ({formats}); smallest variants save {saved / 1024:.1f} KB for narrow screens")
+    print(f"Manifest: {os.path.relpath(MANIFEST, REPO_ROOT)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Incremental, parallel build driver for the repository's LaTeX documents
+
+Refreshes the TikZ figure cache (tikz-cache.py), then models the paper
+and the CV variants together with their inputs (.tex includes, .bib
+files, included graphics) as a dependency graph. Documents whose input
+hashes are unchanged are skipped, independent documents compile in
+parallel, and each document gets only as many pdflatex passes as it
+needs for its .aux file to converge. validate-latex.py runs as a
+pre-check before TeX is started. A document with no outputs keeps its
+PDF next to its source.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from script_loader import load_script
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = os.path.join(REPO_ROOT, '.latex-build-state.json')
+STATE_VERSION = 1
+MAX_PASSES = 5
+GRAPHICS_EXTENSIONS = ('.pdf', '.png', '.jpg', '.jpeg', '.eps')
+# Pre-check findings that make a TeX run pointless
+BLOCKING_RULES = {'brace-balance', 'environment-balance', 'environment-typo', 'missing-include'}
+
+# name -> root document and the files the built PDF is copied to
+DOCUMENTS = {
+    'llm': {
+        'source': 'figures/llm.tex',
+        'outputs': ['figures/llm.pdf', 'assets/pdf/llm-api-contracts.pdf'],
+    },
+    'cv': {
+        'source': '_posts/cv.tex',
+        'outputs': ['assets/pdf/cv.pdf'],
+        'clean': True,
+    },
+    'cv-software-engineer': {
+        'source': '_posts/cv_software_engineer.tex',
+        'outputs': [],
+        'clean': True,
+    },
+    'one-paged': {
+        'source': '_posts/one_paged.tex',
+        'outputs': [],
+        'clean': True,
+    },
+}
+
+
+validator = load_script('validate-latex.py')
+log_analyzer = load_script('analyze-latex-log.py')
+tikz_cache = load_script('tikz-cache.py')
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_state():
+    try:
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('version') == STATE_VERSION:
+            return state
+    except (OSError, ValueError):
+        pass
+    return {'version': STATE_VERSION, 'documents': {}}
+
+
+def save_state(state):
+    with open(STATE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+class Document:
+    """One root .tex file, its discovered inputs and its build outputs"""
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.source = os.path.join(REPO_ROOT, spec['source'])
+        self.directory = os.path.dirname(self.source)
+        self.stem = os.path.splitext(os.path.basename(self.source))[0]
+        self.outputs = [os.path.join(REPO_ROOT, path) for path in spec['outputs']]
+        self.clean = spec.get('clean', False)
+        self.inputs = []
+        self.has_bibliography = False
+
+    @property
+    def pdf(self):
+        return os.path.join(self.directory, self.stem + '.pdf')
+
+    @property
+    def aux(self):
+        return os.path.join(self.directory, self.stem + '.aux')
+
+    @property
+    def log(self):
+        return os.path.join(self.directory, self.stem + '.log')
+
+    def scan(self):
+        """Collect every input file through the validator's symbol index"""
+        index = validator.SymbolIndex(self.source).build()
+        index.save()
+        inputs = set()
+        for name, symbols in index.files.items():
+            inputs.add(os.path.join(self.directory, name))
+            if name.endswith('.bib'):
+                self.has_bibliography = True
+            for kind, target, _ in symbols['includes']:
+                # Skip macro-built paths such as \tikzfigure's \csname lookup
+                if kind == 'graphics' and not any(char in target for char in '\\#'):
+                    graphic = self._resolve_graphic(target)
+                    if graphic:
+                        inputs.add(graphic)
+        self.inputs = sorted(inputs)
+        return self
+
+    def input_hash(self):
+        digest = hashlib.sha256()
+        for path in self.inputs:
+            digest.update(os.path.relpath(path, REPO_ROOT).encode('utf-8'))
+            digest.update(file_hash(path).encode('ascii') if os.path.exists(path) else b'missing')
+        return digest.hexdigest()
+
+    def _resolve_graphic(self, target):
+        base = os.path.join(self.directory, target)
+        candidates = [base] if os.path.splitext(target)[1] else []
+        candidates += [base + extension for extension in GRAPHICS_EXTENSIONS]
+        for candidate in candidates:
+            if os.path.isfile(candidate):
+                return candidate
+        # Not built yet; may be produced by another document
+        return base if os.path.splitext(target)[1] else base + '.pdf'
+
+
+def dependency_graph(documents):
+    """Map each document to the documents whose PDFs it includes"""
+    producers = {}
+    for document in documents.values():
+        for path in [document.pdf, *document.outputs]:
+            producers[os.path.normpath(path)] = document.name
+    graph = {}
+    for document in documents.values():
+        graph[document.name] = {
+            producers[os.path.normpath(path)] for path in document.inputs
+            if os.path.normpath(path) in producers and producers[os.path.normpath(path)] != document.name
+        }
+    return graph
+
+
+def find_cycle(graph, names):
+    """A dependency cycle reachable from `names` as [a, b, ..., a], or None"""
+    state = {}
+    path = []
+
+    def visit(name):
+        state[name] = 'visiting'
+        path.append(name)
+        for dep in sorted(graph[name]):
+            if state.get(dep) == 'visiting':
+                return path[path.index(dep):] + [dep]
+            if dep not in state:
+                cycle = visit(dep)
+                if cycle:
+                    return cycle
+        path.pop()
+        state[name] = 'done'
+        return None
+
+    for name in sorted(names):
+        if name not in state:
+            cycle = visit(name)
+            if cycle:
+                return cycle
+    return None
+
+
+def aux_stamp(document):
+    if not os.path.exists(document.aux):
+        return None
+    return file_hash(document.aux)
+
+
+def citation_stamp(document):
+    """Hash of the .aux lines BibTeX reads"""
+    if not os.path.exists(document.aux):
+        return None
+    digest = hashlib.sha256()
+    with open(document.aux, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            if line.startswith(('\\citation', '\\bibdata', '\\bibstyle')):
+                digest.update(line.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def run_tool(command, cwd):
+    return subprocess.run(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode
+
+
+def precheck(document, messages):
+    """Fast validate-latex.py pass; returns False when TeX should not run"""
+    blocking = False
+    for line, rule, message, path in validator.check_latex(document.source):
+        text = validator.format_issue(line, rule, message, path)
+        if rule in BLOCKING_RULES:
+            blocking = True
+            messages.append(f"  ✗ {text}")
+        else:
+            messages.append(f"  ! {text}")
+    return not blocking
+
+
+def compile_document(document, record):
+    """Run pdflatex (and BibTeX) until the .aux file converges"""
+    messages = []
+    command = ['pdflatex', '-interaction=nonstopmode', '-halt-on-error', document.stem + '.tex']
+    passes = 0
+    analysis = None
+    while passes < MAX_PASSES:
+        before = aux_stamp(document)
+        passes += 1
+        status = run_tool(command, document.directory)
+        analysis = log_analyzer.analyze_log(document.log)
+        if status != 0 or analysis.errors:
+            for diagnostic in analysis.errors:
+                messages.append(f"  ✗ {log_analyzer.format_diagnostic(diagnostic)}")
+            return False, passes, messages
+
+        if document.has_bibliography:
+            citations = citation_stamp(document)
+            if citations != record.get('citations') or not os.path.exists(
+                    os.path.join(document.directory, document.stem + '.bbl')):
+                if run_tool(['bibtex', document.stem], document.directory) != 0:
+                    messages.append("  ✗ bibtex failed")
+                    return False, passes, messages
+                record['citations'] = citations
+                continue
+
+        if aux_stamp(document) == before and not analysis.rerun_needed:
+            break
+
+    if analysis is not None and analysis.rerun_needed:
+        messages.append(f"  ! Still not converged after {passes} passes: {analysis.rerun_reasons[0]}")
+    for diagnostic in analysis.diagnostics if analysis else []:
+        if diagnostic.kind in ('undefined-reference', 'undefined-citation', 'multiply-defined'):
+            messages.append(f"  ! {log_analyzer.format_diagnostic(diagnostic)}")
+    return True, passes, messages
+
+
+def build_document(document, record, force, validate):
+    """Build one document; returns (status, detail lines)"""
+    messages = []
+    input_hash = document.input_hash()
+    outputs_present = os.path.exists(document.pdf) or (document.outputs and all(
+        os.path.exists(path) for path in document.outputs))
+    if not force and record.get('inputs') == input_hash and outputs_present:
+        return 'up-to-date', messages
+
+    if validate and not precheck(document, messages):
+        return 'invalid', messages
+
+    ok, passes, compile_messages = compile_document(document, record)
+    messages.extend(compile_messages)
+    if not ok:
+        return 'failed', messages
+
+    for output in document.outputs:
+        if os.path.abspath(output) != os.path.abspath(document.pdf):
+            os.makedirs(os.path.dirname(output), exist_ok=True)
+            shutil.copyfile(document.pdf, output)
+    if document.clean:
+        for extension in ('.aux', '.log', '.out', '.bbl', '.blg'):
+            path = os.path.join(document.directory, document.stem + extension)
+            if os.path.exists(path):
+                os.remove(path)
+        if document.outputs:
+            os.remove(document.pdf)
+        record.pop('citations', None)
+
+    record['inputs'] = input_hash
+    messages.insert(0, f"  {passes} pdflatex pass{'es' if passes != 1 else ''}")
+    return 'built', messages
+
+
+def build(names, jobs, force=False, validate=True, dry_run=False):
+    """Build the named documents and whatever they depend on, in parallel"""
+    documents = {name: Document(name, DOCUMENTS[name]).scan() for name in DOCUMENTS}
+    graph = dependency_graph(documents)
+
+    wanted = set()
+    stack = list(names)
+    while stack:
+        name = stack.pop()
+        if name not in wanted:
+            wanted.add(name)
+            stack.extend(graph[name])
+
+    cycle = find_cycle(graph, wanted)
+    if cycle:
+        print(f"✗ Dependency cycle: {' → '.join(cycle)}")
+        return False
+
+    state = load_state()
+    records = state['documents']
+
+    if dry_run:
+        for figure in tikz_cache.load_figures():
+            print(f"{'cached' if figure.cached and not force else 'stale':10}  {figure.name:22} tikz: {figure.stem}.pdf")
+        for name in sorted(wanted):
+            document = documents[name]
+            fresh = records.get(name, {}).get('inputs') == document.input_hash()
+            deps = ', '.join(sorted(graph[name])) or '-'
+            print(f"{'up-to-date' if fresh and not force else 'stale':10}  {name:22} deps: {deps}")
+            for path in document.inputs:
+                print(f"            {os.path.relpath(path, REPO_ROOT)}")
+        return True
+
+    ok = True
+    for name, status in tikz_cache.refresh(jobs=jobs, force=force).items():
+        failed = status.startswith('failed')
+        ok = ok and not failed
+        print(f"{'✗' if failed else '✓'} {name}: {status}")
+    # The manifest may have changed; pick it up in the input hashes
+    documents = {name: Document(name, DOCUMENTS[name]).scan() for name in DOCUMENTS}
+
+    results = {}
+    pending = set(wanted)
+    running = {}
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while pending or running:
+            for name in sorted(pending):
+                deps = graph[name] & wanted
+                if any(results.get(dep) in ('failed', 'invalid', 'skipped') for dep in deps):
+                    results[name] = 'skipped'
+                    print(f"– {name}: skipped (dependency failed)")
+                    pending.discard(name)
+                elif all(dep in results for dep in deps):
+                    # Input hashes are taken when the job starts, after upstream PDFs are rebuilt
+                    record = records.setdefault(name, {})
+                    future = executor.submit(build_document, documents[name], record, force, validate)
+                    running[future] = name
+                    pending.discard(name)
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                status, messages = future.result()
+                results[name] = status
+                mark = {'built': '✓', 'up-to-date': '✓'}.get(status, '✗')
+                print(f"{mark} {name}: {status}")
+                for message in messages:
+                    print(message)
+            save_state(state)
+
+    return ok and all(status in ('built', 'up-to-date') for status in results.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the LaTeX documents incrementally')
+    parser.add_argument('documents', nargs='*', metavar='DOCUMENT',
+                        help=f"documents to build (default: all of {', '.join(DOCUMENTS)})")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='documents to compile in parallel')
+    parser.add_argument('--force', action='store_true', help='rebuild even if inputs are unchanged')
+    parser.add_argument('--no-validate', action='store_true', help='skip the validate-latex.py pre-check')
+    parser.add_argument('--dry-run', action='store_true', help='show the dependency graph and stale documents')
+    args = parser.parse_args()
+
+    unknown = [name for name in args.documents if name not in DOCUMENTS]
+    if unknown:
+        parser.error(f"unknown document(s): {', '.join(unknown)}")
+    if not args.dry_run and shutil.which('pdflatex') is None:
+        print("pdflatex not found. Please install a LaTeX distribution.")
+        sys.exit(1)
+
+    names = args.documents or list(DOCUMENTS)
+    ok = build(names, max(1, args.jobs), args.force, not args.no_validate, args.dry_run)
+    sys.exit(0 if ok else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Build the sharded static search index under assets/search
+
+Tokenizes the blog posts, project write-ups, publications and the
+research anchors in _data/research.yml into an inverted index with
+precomputed BM25 weights. Terms are stored in radix (prefix) tries split
+into shards of a few KB along term-prefix boundaries; each shard file is
+named by its content hash, and manifest.json lists the first term of
+every shard. The search page (assets/js/site-search.js) fetches the
+manifest and then only the shards whose term ranges cover the typed
+prefixes.
+
+Tokenized documents are cached by source hash in
+.search-index-cache.json, so a rebuild only re-reads files that changed
+(BM25 weights are still recomputed, since they depend on the whole
+corpus):
+
+    python3 build-search-index.py
+    python3 build-search-index.py --force   # re-tokenize everything
+"""
+import argparse
+import datetime
+import glob
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import unicodedata
+from collections import Counter
+from zoneinfo import ZoneInfo
+
+import yaml
+
+from script_loader import load_script
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.path.join(REPO_ROOT, 'assets', 'search')
+MANIFEST = os.path.join(OUTPUT_DIR, 'manifest.json')
+CACHE_FILE = os.path.join(REPO_ROOT, '.search-index-cache.json')
+# Bump when tokenization changes so cached documents are re-tokenized
+TOKENIZER_VERSION = 1
+
+# Split a shard by the next prefix character once its JSON exceeds this size
+SHARD_BYTES = 4096
+MAX_PREFIX = 4
+# BM25 parameters, and how much a title occurrence counts against body text
+K1 = 1.2
+B = 0.75
+TITLE_BOOST = 3
+SUMMARY_CHARS = 140
+# Result metadata is fetched in files of this many documents
+DOCS_PER_FILE = 12
+
+STOPWORDS = frozenset('''
+a about after all also an and any are as at be because been but by can could did do does
+for from had has have how i if in into is it its just more most my no not of on or our so
+such than that the their them then there these they this those through to too up us was
+we were what when where which while who why will with within without would you your
+'''.split())
+
+FRONT_MATTER_RE = re.compile(r'\A---\s*\n(.*?)\n---\s*(?:\n|\Z)', re.DOTALL)
+CODE_FENCE_RE = re.compile(r'^(```|~~~).*?^\1[ \t]*$', re.MULTILINE | re.DOTALL)
+LIQUID_RE = re.compile(r'\{%.*?%\}|\{\{.*?\}\}', re.DOTALL)
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+LINK_TARGET_RE = re.compile(r'\]\([^)]*\)')
+URL_RE = re.compile(r'https?://\S+')
+MARKDOWN_MARK_RE = re.compile(r'^\s*(?:#+|>|[-*+]|\d+\.)\s+|[*_`]+', re.MULTILINE)
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+SHARD_FILE_RE = re.compile(r'^(docs|terms)\.[0-9a-f]{10}\.json$')
+# research.yml fields that hold text worth searching
+RESEARCH_FIELDS = ('label', 'title', 'question', 'description', 'status', 'context')
+
+
+data_loader = load_script('load-data.py')
+
+
+def fold(text):
+    """Lowercase ASCII folding: 'Él Niño' -> 'el nino'"""
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').lower()
+
+
+def stem(token):
+    """Light plural folding shared with site-search.js: agents -> agent, queries -> query"""
+    if len(token) > 4 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    if len(token) > 3 and token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    terms = []
+    for token in TOKEN_RE.findall(fold(text)):
+        if len(token) < 2 or len(token) > 32 or token in STOPWORDS:
+            continue
+        # Bare numbers are noise apart from years
+        if token.isdigit() and len(token) != 4:
+            continue
+        terms.append(stem(token))
+    return terms
+
+
+def plain_text(markdown):
+    """Searchable prose from a Markdown/Liquid body; code blocks and URLs are dropped"""
+    text = CODE_FENCE_RE.sub(' ', markdown)
+    text = LIQUID_RE.sub(' ', text)
+    text = HTML_TAG_RE.sub(' ', text)
+    text = LINK_TARGET_RE.sub(']', text)
+    return URL_RE.sub(' ', text)
+
+
+def summarize(text):
+    text = MARKDOWN_MARK_RE.sub('', HTML_TAG_RE.sub('', str(text or '')))
+    text = re.sub(r'\s+', ' ', text).strip()
+    if len(text) <= SUMMARY_CHARS:
+        return text
+    return text[:SUMMARY_CHARS].rsplit(' ', 1)[0] + '…'
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Sources
+
+def site_config():
+    return data_loader.load('_config.yml')
+
+
+def read_page(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    match = FRONT_MATTER_RE.match(text)
+    if not match:
+        return {}, text
+    return yaml.safe_load(match.group(1)) or {}, text[match.end():]
+
+
+def document(title, url, kind, date, summary, body):
+    terms = Counter(tokenize(body))
+    for term in tokenize(title):
+        terms[term] += TITLE_BOOST
+    return {'title': title, 'url': url, 'kind': kind, 'date': date,
+            'summary': summarize(summary), 'terms': dict(terms)}
+
+
+def local_day(value, zone):
+    """Front matter date (date, datetime or string) as the site-local day"""
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(zone)
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value)[:10])
+
+
+def post_documents(path, config):
+    """Posts use the site permalink /blog/:year/:month/:day/:title/"""
+    meta, body = read_page(path)
+    if meta.get('published') is False:
+        return []
+    name = os.path.splitext(os.path.basename(path))[0]
+    slug = name[11:]
+    day = local_day(meta.get('date') or name[:10], ZoneInfo(config.get('timezone') or 'UTC'))
+    url = meta.get('permalink') or config['permalink'].replace(':year', f"{day.year:04d}") \
+        .replace(':month', f"{day.month:02d}").replace(':day', f"{day.day:02d}").replace(':title', slug)
+    title = str(meta.get('title') or slug)
+    summary = meta.get('description') or meta.get('excerpt') or plain_text(body)
+    return [document(title, url, 'Post', day.isoformat(), summary, plain_text(body))]
+
+
+def project_documents(path, config):
+    """Showcase documents render at /showcase/<path>/"""
+    meta, body = read_page(path)
+    if meta.get('published') is False or meta.get('show') is False:
+        return []
+    relative = os.path.relpath(os.path.splitext(path)[0], os.path.join(REPO_ROOT, '_showcase'))
+    url = meta.get('permalink') or f"/showcase/{relative.replace(os.sep, '/')}/"
+    title = str(meta.get('title') or relative)
+    fields = ' '.join(str(meta.get(key) or '') for key in ('subtitle', 'excerpt', 'problem', 'approach', 'outcome'))
+    date = local_day(meta['date'], ZoneInfo(config.get('timezone') or 'UTC')).isoformat() if meta.get('date') else ''
+    return [document(title, url, 'Project', date, meta.get('excerpt') or meta.get('subtitle'),
+                     fields + ' ' + plain_text(body))]
+
+
+def publication_documents(path, config):
+    """Publications have no pages of their own; results open the archive"""
+    meta, body = read_page(path)
+    if meta.get('published') is False:
+        return []
+    title = str(meta.get('title') or os.path.basename(path))
+    fields = ' '.join(str(meta.get(key) or '') for key in ('abstract', 'pub', 'status_label'))
+    fields += ' ' + ' '.join(str(author) for author in meta.get('authors') or [])
+    return [document(title, '/publications/', 'Publication', str(meta.get('pub_date') or ''),
+                     meta.get('abstract'), fields + ' ' + plain_text(body))]
+
+
+def research_documents(path, config):
+    """Each research anchor is rendered at /research/#<id>"""
+    data = data_loader.load(path) or {}
+    documents = []
+    for anchor in data.get('anchors') or []:
+        if not anchor.get('id'):
+            continue
+        text = ' '.join(str(anchor.get(field) or '') for field in RESEARCH_FIELDS)
+        documents.append(document(str(anchor.get('title') or anchor['id']), f"/research/#{anchor['id']}",
+                                  'Research', str(anchor.get('last_verified') or ''),
+                                  anchor.get('description') or anchor.get('question'), text))
+    return documents
+
+
+SOURCES = (
+    ('_posts/*.md', post_documents),
+    ('_showcase/projects/*.md', project_documents),
+    ('_publications/**/*.md', publication_documents),
+    ('_data/research.yml', research_documents),
+)
+
+
+def collect(cache, config, force=False):
+    """Documents from every source, re-tokenizing only changed files; returns (docs, tokenized)"""
+    previous = cache.get('sources', {}) if cache.get('version') == TOKENIZER_VERSION and not force else {}
+    sources, documents, tokenized = {}, [], 0
+    for pattern, reader in SOURCES:
+        for path in sorted(glob.glob(os.path.join(REPO_ROOT, pattern), recursive=True)):
+            name = os.path.relpath(path, REPO_ROOT)
+            digest = file_hash(path)
+            entry = previous.get(name)
+            if not entry or entry['hash'] != digest:
+                entry = {'hash': digest, 'documents': reader(path, config)}
+                tokenized += 1
+            sources[name] = entry
+            documents.extend(entry['documents'])
+    cache['version'] = TOKENIZER_VERSION
+    cache['sources'] = sources
+    return documents, tokenized
+
+
+# ---------------------------------------------------------------------------
+# Index
+
+def bm25_postings(documents):
+    """term -> [(doc id, weight x100)] sorted by doc id"""
+    lengths = [sum(doc['terms'].values()) for doc in documents]
+    average = sum(lengths) / len(lengths) if lengths else 0.0
+    frequency = Counter(term for doc in documents for term in doc['terms'])
+    total = len(documents)
+    postings = {}
+    for doc_id, (doc, length) in enumerate(zip(documents, lengths)):
+        norm = K1 * (1 - B + B * length / average) if average else K1
+        for term, tf in doc['terms'].items():
+            idf = math.log(1 + (total - frequency[term] + 0.5) / (frequency[term] + 0.5))
+            weight = idf * tf * (K1 + 1) / (tf + norm)
+            postings.setdefault(term, []).append((doc_id, max(1, round(weight * 100))))
+    return postings
+
+
+def radix_trie(terms, postings, offset):
+    """Nested {edge: node} mapping; a node's "" key holds the flat [doc, weight, ...] postings"""
+    root = {}
+    for term in terms:
+        node = root
+        for char in term[offset:]:
+            node = node.setdefault(char, {})
+        node[''] = [value for pair in postings[term] for value in pair]
+
+    def compress(node):
+        compressed = {}
+        for edge, child in node.items():
+            if edge == '':
+                compressed[''] = child
+                continue
+            # Merge chains of single-child nodes into one edge label
+            while len(child) == 1 and '' not in child:
+                (char, grandchild), = child.items()
+                edge += char
+                child = grandchild
+            compressed[edge] = compress(child)
+        return compressed
+
+    return compress(root)
+
+
+def encode(data):
+    return json.dumps(data, separators=(',', ':'), sort_keys=True, ensure_ascii=False)
+
+
+def trie_size(terms, postings):
+    return len(encode(radix_trie(terms, postings, 0)))
+
+
+def split(prefix, terms, postings):
+    """Sorted groups of terms, split by the next prefix character until each fits SHARD_BYTES
+
+    Returns [(parent prefix, terms)]; sibling groups share their parent prefix.
+    """
+    if trie_size(terms, postings) <= SHARD_BYTES or len(prefix) >= MAX_PREFIX:
+        return [(prefix[:-1], terms)]
+    groups = {}
+    for term in terms:
+        groups.setdefault(term[:len(prefix) + 1], []).append(term)
+    leaves = []
+    # A term equal to the prefix sorts first and stays in its own group
+    if prefix in groups:
+        leaves.append((prefix, groups.pop(prefix)))
+    for key in sorted(groups):
+        leaves.extend(split(key, groups[key], postings))
+    return leaves
+
+
+def common_prefix(terms):
+    return os.path.commonprefix(terms) if terms else ''
+
+
+def pack(leaves, postings):
+    """Merge adjacent sibling groups into shards up to SHARD_BYTES
+
+    Merging never crosses a parent prefix, so an edit only reshuffles the
+    shards under one prefix and the other shard files keep their hashes.
+    """
+    shards = []
+    for parent, terms in leaves:
+        if shards and shards[-1][0] == parent \
+                and trie_size(shards[-1][1] + terms, postings) <= SHARD_BYTES:
+            shards[-1][1].extend(terms)
+        else:
+            shards.append((parent, list(terms)))
+    return [terms for _, terms in shards]
+
+
+def shard_payload(terms, postings):
+    """{"p": common prefix, "t": radix trie below it}"""
+    prefix = common_prefix(terms)
+    return encode({'p': prefix, 't': radix_trie(terms, postings, len(prefix))})
+
+
+def content_name(stem_name, payload):
+    return f"{stem_name}.{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:10]}.json"
+
+
+def build(documents):
+    """Index files by name plus the manifest text; returns (files, manifest, shards)"""
+    postings = bm25_postings(documents)
+    shards = [(terms[0], shard_payload(terms, postings))
+              for terms in pack(split('', sorted(postings), postings), postings)]
+
+    files, doc_files = {}, []
+    for start in range(0, len(documents), DOCS_PER_FILE):
+        payload = encode([[doc['title'], doc['url'], doc['kind'], doc['date'], doc['summary']]
+                          for doc in documents[start:start + DOCS_PER_FILE]])
+        doc_files.append(content_name('docs', payload))
+        files[doc_files[-1]] = payload
+    manifest = {
+        'version': TOKENIZER_VERSION,
+        'documents': len(documents),
+        'terms': len(postings),
+        # Result titles and summaries, DOCS_PER_FILE documents per file in doc id order
+        'docs': doc_files,
+        'docs_per_file': DOCS_PER_FILE,
+        'stopwords': sorted(STOPWORDS),
+        # [first term, file]: a term lives in the last shard whose first term sorts <= it
+        'shards': [],
+    }
+    for first, payload in shards:
+        name = content_name('terms', payload)
+        manifest['shards'].append([first, name])
+        files[name] = payload
+    return files, encode(manifest) + '\n', shards
+
+
+def is_current(files, manifest):
+    """Whether assets/search already holds exactly this index"""
+    try:
+        with open(MANIFEST, 'r', encoding='utf-8') as f:
+            if f.read() != manifest:
+                return False
+    except OSError:
+        return False
+    return all(os.path.exists(os.path.join(OUTPUT_DIR, name)) for name in files)
+
+
+def write(files, manifest):
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    for name, payload in files.items():
+        path = os.path.join(OUTPUT_DIR, name)
+        if not os.path.exists(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+    with open(MANIFEST, 'w', encoding='utf-8') as f:
+        f.write(manifest)
+    # Drop shards the new manifest no longer references
+    for name in os.listdir(OUTPUT_DIR):
+        if SHARD_FILE_RE.match(name) and name not in files:
+            os.remove(os.path.join(OUTPUT_DIR, name))
+
+
+def load_cache():
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the sharded static search index in assets/search')
+    parser.add_argument('--force', action='store_true', help='re-tokenize every document')
+    parser.add_argument('--check', action='store_true',
+                        help='exit with status 1 if the committed index is out of date instead of writing it')
+    args = parser.parse_args()
+
+    cache = load_cache()
+    documents, tokenized = collect(cache, site_config(), args.force)
+    if not documents:
+        print("✗ No documents found to index.")
+        sys.exit(1)
+    files, manifest, shards = build(documents)
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, sort_keys=True)
+    if args.check:
+        if is_current(files, manifest):
+            print(f"✓ Search index is up to date ({len(documents)} documents)")
+            return
+        print("✗ Search index is out of date. Run: python3 build-search-index.py")
+        sys.exit(1)
+    write(files, manifest)
+
+    sizes = sorted(len(payload.encode('utf-8')) for _, payload in shards)
+    print(f"✓ {len(documents)} documents from {len(cache['sources'])} sources "
+          f"({tokenized} tokenized, {len(cache['sources']) - tokenized} unchanged)")
+    print(f"✓ {len(shards)} shards, median {sizes[len(sizes) // 2] / 1024:.1f} KB, "
+          f"largest {sizes[-1] / 1024:.1f} KB; {sum(len(payload) for payload in files.values()) / 1024:.1f} KB total")
+    print(f"Manifest: {os.path.relpath(MANIFEST, REPO_ROOT)}")
+
+if __name__ == '__main__':
+    main()
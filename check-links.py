@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Check every link in _data and the _posts/_showcase Markdown
+
+Links are extracted with their file and line and deduplicated. Internal
+links (/cv/, /assets/pdf/..., {{ '...' | relative_url }}) are resolved
+against the built _site, including #fragments. External links are checked
+concurrently over asyncio: a small keep-alive connection pool per host,
+at most --per-host requests in flight to one host and --delay seconds
+between request starts on that host. Requests use HEAD, falling back to
+GET when a server refuses it, and follow redirects.
+
+Responses are kept in .link-check-cache.json: working links are
+rechecked after a week and broken ones after a day. A repeat run only
+touches URLs whose entry has expired. Hosts that wall off automated
+clients (401/403/429/999) are reported as unverified rather than broken.
+
+    python3 check-links.py                   # internal and external links
+    python3 check-links.py --internal-only   # offline, against _site
+    python3 check-links.py --stand-in http://127.0.0.1:8000  # local stand-in server
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import re
+import ssl
+import sys
+import time
+from urllib.parse import unquote, urljoin, urlsplit
+
+import yaml
+
+from script_loader import load_script
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+SITE_DIR = os.path.join(REPO_ROOT, '_site')
+CACHE_FILE = os.path.join(REPO_ROOT, '.link-check-cache.json')
+SOURCE_GLOBS = ('_data/*.yml', '_data/*.yaml', '_posts/*.md', '_showcase/**/*.md')
+
+OK_TTL = 7 * 24 * 3600
+BROKEN_TTL = 24 * 3600
+# Timeouts and connection failures are usually transient
+ERROR_TTL = 3600
+TIMEOUT = 10
+MAX_REDIRECTS = 5
+CONCURRENCY = 32
+PER_HOST = 4
+HOST_DELAY = 0.1
+USER_AGENT = 'Mozilla/5.0 (compatible; tanzimhromel.com link check)'
+BLOCKED_STATUSES = frozenset((401, 403, 429, 999))
+REDIRECT_STATUSES = frozenset((301, 302, 303, 307, 308))
+
+URL_RE = re.compile(r'https?://[^\s<>"\'`\]\[{}|\\^]+')
+MARKDOWN_LINK_RE = re.compile(r'\]\(\s*<?([^)\s>]+)>?(?:\s+"[^"]*")?\s*\)')
+ATTRIBUTE_RE = re.compile(r'\b(?:href|src|data-src)\s*=\s*["\']([^"\']+)["\']')
+RELATIVE_URL_RE = re.compile(r'\{\{\s*[\'"]([^\'"]+)[\'"]\s*\|\s*(?:relative_url|absolute_url)\s*\}\}')
+CODE_FENCE_RE = re.compile(r'^\s*(```|~~~)')
+INLINE_CODE_RE = re.compile(r'`[^`]*`')
+ID_RE = re.compile(r'\s(?:id|name)\s*=\s*(["\'])(.*?)\1', re.I)
+TRAILING_PUNCTUATION = '.,;:!?*_'
+
+
+data_loader = load_script('load-data.py')
+
+
+def load_site_config():
+    config = data_loader.load('_config.yml') or {}
+    return (config.get('url') or '').rstrip('/'), (config.get('baseurl') or '').rstrip('/')
+
+
+# --- Extraction ---------------------------------------------------------
+
+def trim(url):
+    """Drop sentence punctuation and unbalanced closing parentheses from a bare URL"""
+    while url and (url[-1] in TRAILING_PUNCTUATION or (url[-1] == ')' and url.count(')') > url.count('('))):
+        url = url[:-1]
+    return url
+
+
+def links_in_text(text):
+    """Link targets in one line of Markdown, HTML or YAML text"""
+    text = RELATIVE_URL_RE.sub(lambda match: '/' + match.group(1).lstrip('/'), text)
+    found = [trim(url) for url in URL_RE.findall(text)]
+    for regex in (MARKDOWN_LINK_RE, ATTRIBUTE_RE):
+        found.extend(url for url in regex.findall(text) if url.startswith('/') and not url.startswith('//'))
+    return [url for url in found if url and '{{' not in url and '{%' not in url]
+
+
+def markdown_links(path):
+    occurrences = []
+    in_fence = False
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            if CODE_FENCE_RE.match(line):
+                in_fence = not in_fence
+                continue
+            if not in_fence:
+                occurrences.extend((url, number) for url in links_in_text(INLINE_CODE_RE.sub('', line)))
+    return occurrences
+
+
+def yaml_links(path):
+    """Links in scalar values, located on the source line they appear on"""
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    lines = source.splitlines()
+    root = yaml.compose(source)
+    occurrences, stack = [], [root] if root is not None else []
+    while stack:
+        node = stack.pop()
+        if isinstance(node, yaml.ScalarNode):
+            if isinstance(node.value, str):
+                start, end = node.start_mark.line, node.end_mark.line
+                for url in links_in_text(node.value):
+                    # Folded and multi-line scalars lose their line breaks, so find the URL in the source
+                    line = next((number for number in range(start, end + 1)
+                                 if number < len(lines) and url in lines[number]), start)
+                    occurrences.append((url, line + 1))
+        elif isinstance(node, yaml.SequenceNode):
+            stack.extend(node.value)
+        elif isinstance(node, yaml.MappingNode):
+            stack.extend(value for _, value in node.value)
+    return sorted(occurrences, key=lambda occurrence: occurrence[1])
+
+
+def collect(site_url='', baseurl=''):
+    """{url: [(file, line), ...]} with same-site absolute URLs made internal"""
+    links = {}
+    for pattern in SOURCE_GLOBS:
+        for path in sorted(glob.glob(os.path.join(REPO_ROOT, pattern), recursive=True)):
+            extract = yaml_links if path.endswith(('.yml', '.yaml')) else markdown_links
+            name = os.path.relpath(path, REPO_ROOT)
+            for url, line in extract(path):
+                if site_url and (url == site_url or url.startswith(site_url + '/')):
+                    url = url[len(site_url):] or '/'
+                if baseurl and url.startswith(baseurl + '/'):
+                    url = url[len(baseurl):]
+                links.setdefault(url, []).append((name, line))
+    return links
+
+
+# --- Internal links -----------------------------------------------------
+
+def site_file(site_dir, path):
+    """The built file a site path is served from, or None"""
+    target = os.path.join(site_dir, unquote(path).lstrip('/'))
+    for candidate in (target, os.path.join(target, 'index.html'), target.rstrip('/') + '.html'):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def check_internal(url, site_dir, anchors):
+    """None when the link resolves, otherwise the reason it does not"""
+    parts = urlsplit(url)
+    target = site_file(site_dir, parts.path)
+    if target is None:
+        return 'not in _site'
+    if parts.fragment and target.endswith('.html'):
+        if target not in anchors:
+            with open(target, encoding='utf-8', errors='replace') as f:
+                anchors[target] = {match[1] for match in ID_RE.findall(f.read())}
+        if unquote(parts.fragment) not in anchors[target]:
+            return f"no #{parts.fragment} in {os.path.relpath(target, site_dir)}"
+    return None
+
+
+# --- External links -----------------------------------------------------
+
+def cache_key(url):
+    return url.split('#', 1)[0]
+
+
+class HostPool:
+    """Keep-alive connections to one origin, with a concurrency cap and request spacing"""
+
+    def __init__(self, scheme, host, port, connect_to, per_host, delay):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.connect_to = connect_to
+        self.semaphore = asyncio.Semaphore(per_host)
+        self.delay = delay
+        self.idle = []
+        self.spacing = asyncio.Lock()
+        self.last_start = 0.0
+        self.ssl = None
+        if scheme == 'https' and connect_to is None:
+            self.ssl = ssl.create_default_context()
+
+    async def connection(self):
+        if self.idle:
+            return self.idle.pop(), True
+        host, port = self.connect_to or (self.host, self.port)
+        reader, writer = await asyncio.open_connection(
+            host, port, ssl=self.ssl, server_hostname=self.host if self.ssl else None)
+        return (reader, writer), False
+
+    async def wait_turn(self):
+        async with self.spacing:
+            pause = self.last_start + self.delay - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            self.last_start = time.monotonic()
+
+    async def request(self, method, target):
+        """(status, headers); a stale pooled connection is retried once on a fresh one"""
+        async with self.semaphore:
+            await self.wait_turn()
+            for _ in range(2):
+                writer, reused = None, False
+                try:
+                    # One deadline covers the connect, the TLS handshake and the exchange
+                    async with asyncio.timeout(TIMEOUT):
+                        (reader, writer), reused = await self.connection()
+                        return await self.exchange(reader, writer, method, target)
+                except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+                    if writer is not None:
+                        writer.close()
+                    if not reused:
+                        raise
+                except BaseException:
+                    if writer is not None:
+                        writer.close()
+                    raise
+            raise ConnectionError('connection reset')
+
+    async def exchange(self, reader, writer, method, target):
+        default_port = 443 if self.scheme == 'https' else 80
+        host = self.host if self.port == default_port else f"{self.host}:{self.port}"
+        writer.write((f"{method} {target} HTTP/1.1\r\nHost: {host}\r\nUser-Agent: {USER_AGENT}\r\n"
+                      "Accept: */*\r\nAccept-Encoding: identity\r\nConnection: keep-alive\r\n\r\n").encode('ascii'))
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError('connection closed')
+        parts = status_line.decode('latin-1').split(None, 2)
+        if len(parts) < 2 or not parts[0].startswith('HTTP/'):
+            raise ValueError('malformed status line')
+        status = int(parts[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        # Only bodiless HEAD responses leave the connection reusable; GET bodies are not read
+        if method == 'HEAD' and headers.get('connection', '').lower() != 'close':
+            self.idle.append((reader, writer))
+        else:
+            writer.close()
+        return status, headers
+
+    def close(self):
+        for _, writer in self.idle:
+            writer.close()
+        self.idle = []
+
+
+class LinkChecker:
+    def __init__(self, cache, stand_in=None, concurrency=CONCURRENCY, per_host=PER_HOST, delay=HOST_DELAY):
+        self.cache = cache
+        self.stand_in = stand_in
+        self.per_host = per_host
+        self.delay = delay
+        self.pools = {}
+        self.limit = asyncio.Semaphore(concurrency)
+        self.requests = 0
+
+    def pool(self, url):
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        key = (parts.scheme, parts.hostname, port)
+        if key not in self.pools:
+            self.pools[key] = HostPool(parts.scheme, parts.hostname, port, self.stand_in, self.per_host, self.delay)
+        return self.pools[key]
+
+    async def fetch(self, url):
+        """(status, final url) after redirects; HEAD first, GET when HEAD is refused"""
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            target = (parts.path or '/') + ('?' + parts.query if parts.query else '')
+            pool = self.pool(url)
+            self.requests += 1
+            status, headers = await pool.request('HEAD', target)
+            if status >= 400:
+                self.requests += 1
+                status, headers = await pool.request('GET', target)
+            if status in REDIRECT_STATUSES and headers.get('location'):
+                url = urljoin(url, headers['location'])
+                continue
+            return status, url
+        return None, url
+
+    async def check(self, key):
+        """Cache entry for one fragment-less URL, fetched only when the cached one expired"""
+        entry = self.cache.get(key)
+        if entry and entry['expires'] > time.time():
+            return dict(entry, cached=True)
+        async with self.limit:
+            try:
+                status, final = await self.fetch(key)
+                error = None if status is not None else 'too many redirects'
+            except asyncio.TimeoutError:
+                status, final, error = None, key, 'timed out'
+            except (OSError, ValueError, ssl.SSLError) as e:
+                status, final, error = None, key, str(e) or type(e).__name__
+        if error:
+            ttl = ERROR_TTL
+        elif status < 400 or status in BLOCKED_STATUSES:
+            ttl = OK_TTL
+        else:
+            ttl = BROKEN_TTL
+        entry = {'status': status, 'final': final, 'error': error, 'checked': int(time.time()),
+                 'expires': int(time.time()) + ttl}
+        self.cache[key] = entry
+        return dict(entry, cached=False)
+
+    async def run(self, urls):
+        # URLs that differ only by fragment share one request and one cache entry
+        keys = list(dict.fromkeys(cache_key(url) for url in urls))
+        try:
+            results = await asyncio.gather(*(self.check(key) for key in keys))
+        finally:
+            for pool in self.pools.values():
+                pool.close()
+        by_key = dict(zip(keys, results))
+        return {url: by_key[cache_key(url)] for url in urls}
+
+
+def load_cache(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache, path):
+    now = time.time()
+    # Entries that expired long ago are no longer worth keeping
+    live = {url: entry for url, entry in cache.items() if entry['expires'] > now - OK_TTL}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(live, f, indent=1, sort_keys=True)
+
+
+def classify(result):
+    if result['error']:
+        return 'broken', result['error']
+    if result['status'] in BLOCKED_STATUSES:
+        return 'unverified', f"HTTP {result['status']}"
+    if result['status'] >= 400:
+        return 'broken', f"HTTP {result['status']}"
+    return 'ok', None
+
+
+def describe(sources, limit=3):
+    shown = ', '.join(f"{name}:{line}" for name, line in sources[:limit])
+    return shown + (f" (+{len(sources) - limit} more)" if len(sources) > limit else '')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check internal and external links in the site sources')
+    scope = parser.add_mutually_exclusive_group()
+    scope.add_argument('--internal-only', action='store_true', help='only resolve links against _site')
+    scope.add_argument('--external-only', action='store_true', help='only check external URLs')
+    parser.add_argument('--site', default=SITE_DIR, help='built site directory (default: _site)')
+    parser.add_argument('--stand-in', metavar='URL',
+                        help='send every external request to this http:// server, keeping the Host header')
+    parser.add_argument('--cache', metavar='PATH',
+                        help='response cache (default: .link-check-cache.json; none with --stand-in)')
+    parser.add_argument('--refresh', action='store_true', help='ignore cached responses')
+    parser.add_argument('--per-host', type=int, default=PER_HOST, help='concurrent requests per host (default: 4)')
+    parser.add_argument('--delay', type=float, default=HOST_DELAY,
+                        help='seconds between request starts on one host (default: 0.1)')
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    site_url, baseurl = load_site_config()
+    links = collect(site_url, baseurl)
+    internal = sorted(url for url in links if url.startswith('/'))
+    external = sorted(url for url in links if url.startswith(('http://', 'https://')))
+    failures = 0
+
+    if not args.external_only:
+        site_dir = os.path.abspath(args.site)
+        if not os.path.isdir(site_dir):
+            print(f"{os.path.relpath(site_dir)} not found. Run \"bundle exec jekyll build\" first, or pass --external-only.")
+            sys.exit(1)
+        anchors = {}
+        for url in internal:
+            reason = check_internal(url, site_dir, anchors)
+            if reason:
+                failures += 1
+                print(f"✗ {url}: {reason} — {describe(links[url])}")
+
+    unverified = cached = 0
+    if not args.internal_only:
+        stand_in = None
+        if args.stand_in:
+            parts = urlsplit(args.stand_in)
+            if parts.scheme != 'http' or not parts.hostname:
+                parser.error('--stand-in must be an http:// URL')
+            stand_in = (parts.hostname, parts.port or 80)
+        # Stand-in responses must not leak into the real cache
+        cache_path = args.cache or (None if stand_in else CACHE_FILE)
+        cache = load_cache(cache_path) if cache_path and not args.refresh else {}
+        checker = LinkChecker(cache, stand_in, per_host=max(1, args.per_host), delay=max(0.0, args.delay))
+        results = asyncio.run(checker.run(external))
+        if cache_path:
+            save_cache(cache, cache_path)
+        for url in external:
+            result = results[url]
+            cached += result['cached']
+            state, reason = classify(result)
+            if state == 'broken':
+                failures += 1
+                print(f"✗ {url}: {reason} — {describe(links[url])}")
+            elif state == 'unverified':
+                unverified += 1
+                print(f"? {url}: {reason}, not verifiable by a script — {describe(links[url])}")
+            elif urlsplit(result['final']).hostname != urlsplit(url).hostname:
+                print(f"→ {url} now redirects to {result['final']}")
+
+    checked_internal = 0 if args.external_only else len(internal)
+    checked_external = 0 if args.internal_only else len(external)
+    occurrences = sum(len(sources) for sources in links.values())
+    summary = (f"{checked_internal} internal and {checked_external} external links "
+               f"({occurrences} occurrences)")
+    if checked_external:
+        summary += f", {cached} external from cache, {unverified} unverified"
+    summary += f" in {time.monotonic() - started:.1f}s"
+    if failures:
+        print(f"\n✗ {failures} broken of {summary}")
+        sys.exit(1)
+    print(f"\n✓ No broken links among {summary}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Build-time snapshot of the merged external pull request count
+
+Runs with the daily refresh-pages.yml build and writes
+_data/contribution_count.json, which contributions.html exposes to
+assets/js/contribution-count.js so visitors read the count from the page
+instead of calling the GitHub Search API. The count is fetched
+incrementally: a baseline of PRs merged before a cutoff day is refreshed
+weekly, and each run only asks for PRs merged since that day. Every
+query is a conditional request (If-None-Match) against responses cached
+in .contribution-count-cache.json, so unchanged results cost a 304.
+
+    python3 contribution-snapshot.py
+    python3 contribution-snapshot.py --api-url http://127.0.0.1:8000  # local stand-in server
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from script_loader import load_script
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+PROFILE = os.path.join(REPO_ROOT, '_data', 'profile.yml')
+SNAPSHOT = os.path.join(REPO_ROOT, '_data', 'contribution_count.json')
+CACHE_FILE = os.path.join(REPO_ROOT, '.contribution-count-cache.json')
+DEFAULT_API_URL = 'https://api.github.com'
+# Re-count the whole history this often; in between only new merges are queried
+BASELINE_MAX_AGE_DAYS = 7
+# An unchanged count is re-stamped this often, inside the browser's 8-day freshness
+# window, so the snapshot commit (and Pages build) does not happen every day
+SNAPSHOT_REFRESH_DAYS = 6
+TIMEOUT = 10
+
+
+data_loader = load_script('load-data.py')
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def search_query(user, merged):
+    """The same query the browser fallback runs, narrowed by a merged: qualifier"""
+    return f"author:{user} type:pr is:merged -user:{user} merged:{merged}"
+
+
+class SearchClient:
+    """GitHub issue search with ETag revalidation against an on-disk cache"""
+
+    def __init__(self, api_url, cache, token=None):
+        self.api_url = api_url.rstrip('/')
+        self.cache = cache
+        self.token = token
+        self.requests = 0
+        self.revalidated = 0
+
+    def count(self, query):
+        url = f"{self.api_url}/search/issues?" + urllib.parse.urlencode({'q': query, 'per_page': 1})
+        headers = {'Accept': 'application/vnd.github+json', 'User-Agent': 'contribution-snapshot'}
+        if self.token:
+            headers['Authorization'] = f"Bearer {self.token}"
+        cached = self.cache.get(query)
+        if cached and cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+
+        self.requests += 1
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=TIMEOUT) as response:
+                payload = json.loads(response.read().decode('utf-8') or '{}')
+                etag = response.headers.get('ETag')
+        except urllib.error.HTTPError as error:
+            if error.code == 304 and cached:
+                self.revalidated += 1
+                return cached['total_count']
+            body = error.read().decode('utf-8', errors='replace')
+            if error.code in (403, 429) or 'rate limit' in body.lower():
+                raise SnapshotError(f"GitHub search is rate-limited (HTTP {error.code})")
+            raise SnapshotError(f"GitHub search failed with HTTP {error.code}")
+        except (urllib.error.URLError, OSError, ValueError) as error:
+            raise SnapshotError(f"GitHub search request failed: {error}")
+
+        if payload.get('incomplete_results') is True:
+            raise SnapshotError('GitHub returned incomplete search results')
+        count = payload.get('total_count')
+        if not isinstance(count, int):
+            raise SnapshotError('GitHub search response has no total_count')
+        self.cache[query] = {'etag': etag, 'total_count': count}
+        return count
+
+
+def load_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def github_user():
+    return data_loader.load(PROFILE)['github']
+
+
+def fetch_count(client, user, cache, today, full=False):
+    """Baseline (merged before the cutoff day) plus merges since; returns the total"""
+    baseline = cache.get('baseline')
+    if full or not baseline or baseline.get('user') != user:
+        baseline = None
+    else:
+        age = today - datetime.date.fromisoformat(baseline['cutoff'])
+        if age.days > BASELINE_MAX_AGE_DAYS:
+            baseline = None
+
+    queries = cache.setdefault('queries', {})
+    if baseline is None:
+        cutoff = today.isoformat()
+        baseline = {'user': user, 'cutoff': cutoff,
+                    'count': client.count(search_query(user, f"<{cutoff}"))}
+        cache['baseline'] = baseline
+        # Queries against older cutoffs can never be revalidated again
+        for query in [query for query in queries if f"merged:>={cutoff}" not in query]:
+            del queries[query]
+
+    recent = client.count(search_query(user, f">={baseline['cutoff']}"))
+    return baseline['count'] + recent
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write the merged contribution count snapshot')
+    parser.add_argument('--api-url', default=os.environ.get('GITHUB_API_URL', DEFAULT_API_URL),
+                        help='GitHub API base URL (default: $GITHUB_API_URL or api.github.com)')
+    parser.add_argument('--user', help='GitHub user (default: github in _data/profile.yml)')
+    parser.add_argument('--full', action='store_true', help='recount the whole history instead of new merges')
+    args = parser.parse_args()
+
+    user = args.user or github_user()
+    cache = load_json(CACHE_FILE, {})
+    client = SearchClient(args.api_url, cache.setdefault('queries', {}),
+                          os.environ.get('GITHUB_TOKEN') or os.environ.get('GH_TOKEN'))
+    now = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+    try:
+        count = fetch_count(client, user, cache, now.date(), args.full)
+    except SnapshotError as error:
+        # Leave the previous snapshot alone; once stale, browsers fall back to the live API
+        print(f"✗ {error}; keeping the existing snapshot")
+        write_json(CACHE_FILE, cache)
+        sys.exit(1)
+    write_json(CACHE_FILE, cache)
+
+    previous = load_json(SNAPSHOT, {})
+    try:
+        stamped = datetime.datetime.fromisoformat(previous['generated_at'].replace('Z', '+00:00'))
+    except (KeyError, AttributeError, ValueError):
+        stamped = None
+    if previous.get('user') == user and previous.get('total_count') == count and stamped \
+            and now - stamped < datetime.timedelta(days=SNAPSHOT_REFRESH_DAYS):
+        print(f"✓ {count} merged pull requests for {user}; snapshot from "
+              f"{previous['generated_at']} is still current")
+        return
+
+    snapshot = {
+        'user': user,
+        'total_count': count,
+        'generated_at': now.isoformat().replace('+00:00', 'Z'),
+    }
+    write_json(SNAPSHOT, snapshot)
+    print(f"✓ {count} merged pull requests for {user} "
+          f"({client.requests} requests, {client.revalidated} unchanged)")
+    print(f"Snapshot: {os.path.relpath(SNAPSHOT, REPO_ROOT)}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,706 @@
+#!/usr/bin/env python3
+"""
+Critical CSS and per-layout stylesheets from assets/css/overhaul.css
+
+Reads every built page in _site, groups the pages by the layout named on
+<body data-layout>, and matches each selector in overhaul.css against the
+page DOM. Rules that match anywhere on a layout's pages are written, in
+source order, to assets/css/layouts/<layout>.css; rules that match an
+element before the fold (the site header and roughly the first
+--fold-chars characters of page text) become that layout's critical CSS
+in _data/critical_css.json. The default layout inlines the critical CSS
+and loads the layout stylesheet asynchronously. Without the data file it
+keeps the render-blocking overhaul.css link.
+
+The data file also holds a copy of the overhaul.css it was generated
+from. overhaul.css carries empty front matter so Jekyll exposes its text
+as a page, and default.html keeps the full overhaul.css link whenever the
+two differ. A stylesheet edit published before the output is regenerated
+therefore never serves pruned rules.
+
+Matching is conservative. Hover, focus and other interaction states,
+pseudo-elements and unknown pseudo-classes count as matching. So does
+any class or attribute named in a string in the site JavaScript (theme,
+menu and shell state, search results). Per-page results are cached in
+.critical-css-cache.json by page and stylesheet hash. The stage needs a
+build first, and a rebuild afterwards publishes the new data:
+
+    bundle exec jekyll build && python3 critical-css.py
+    python3 critical-css.py --check   # fail if the committed output is stale
+"""
+import argparse
+import glob
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+from html.parser import HTMLParser
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+SITE_DIR = os.path.join(REPO_ROOT, '_site')
+SOURCE_CSS = os.path.join(REPO_ROOT, 'assets', 'css', 'overhaul.css')
+LAYOUT_CSS_DIR = os.path.join(REPO_ROOT, 'assets', 'css', 'layouts')
+DATA_FILE = os.path.join(REPO_ROOT, '_data', 'critical_css.json')
+CACHE_FILE = os.path.join(REPO_ROOT, '.critical-css-cache.json')
+SCRIPT_GLOB = os.path.join(REPO_ROOT, 'assets', 'js', '*.js')
+ENGINE_VERSION = 1
+
+# About one 390x844 phone screen of body text, with room for larger headings
+DEFAULT_FOLD_CHARS = 1200
+
+VOID_ELEMENTS = frozenset('area base br col embed hr img input link meta param source track wbr'.split())
+RAW_TEXT_ELEMENTS = frozenset(('script', 'style', 'template'))
+# States that depend on interaction or the browser, not on the built DOM
+STATE_PSEUDOS = frozenset('''
+    hover focus focus-visible focus-within active visited link any-link target checked
+    disabled enabled placeholder-shown indeterminate default valid invalid required optional
+    read-only read-write fullscreen empty has
+'''.split())
+STRUCTURAL_PSEUDOS = frozenset('''
+    root first-child last-child only-child nth-child nth-last-child
+    first-of-type last-of-type only-of-type nth-of-type nth-last-of-type
+'''.split())
+NESTING_AT_RULES = ('@media', '@supports', '@layer', '@container')
+
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+# Jekyll's front matter pattern; overhaul.css has an empty block so it is rendered as a page
+FRONT_MATTER_RE = re.compile(r'\A---\s*\n.*?\n?^(?:---|\.\.\.)\s*$\n?', re.S | re.M)
+STRING_LITERAL_RE = re.compile(r'\'((?:[^\'\\\n]|\\.)*)\'|"((?:[^"\\\n]|\\.)*)"')
+SCRIPT_BLOCK_RE = re.compile(r'<script(?![^>]*application/ld\+json)[^>]*>(.*?)</script>', re.S | re.I)
+BODY_RE = re.compile(r'<body\b.*</body>', re.S | re.I)
+REVISION_RE = re.compile(r'\?v=\d+')
+WORD_RE = re.compile(r'[A-Za-z_][\w-]*')
+ANIMATION_NAME_RE = re.compile(r'animation(?:-name)?\s*:\s*([^;}]+)')
+NTH_RE = re.compile(r'^\s*(?:(odd)|(even)|([+-]?\d*)n\s*(?:([+-])\s*(\d+))?|([+-]?\d+))\s*$')
+SIMPLE_SELECTOR_RE = re.compile(r'''
+    (?P<tag>\*|[A-Za-z][\w-]*)
+  | \#(?P<id>[\w-]+)
+  | \.(?P<cls>[\w-]+)
+  | \[\s*(?P<attr>[\w-]+)\s*(?:(?P<op>[~|^$*]?=)\s*(?P<value>"[^"]*"|'[^']*'|[^\]\s]+)\s*(?P<flag>[is])?\s*)?\]
+  | ::(?P<element>[\w-]+)(?:\((?P<element_arg>[^)]*)\))?
+  | :(?P<pseudo>[\w-]+)
+''', re.X)
+
+
+class SelectorError(ValueError):
+    pass
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def gzip_size(text):
+    return len(gzip.compress(text.encode('utf-8'), compresslevel=6, mtime=0))
+
+
+def format_kb(size):
+    return f"{size / 1024:.1f} KB"
+
+
+# --- Stylesheet ---------------------------------------------------------
+
+def scan_to(text, pos, stops):
+    """Index of the first character in `stops` outside strings and parentheses"""
+    depth = 0
+    while pos < len(text):
+        char = text[pos]
+        if char in '"\'':
+            end = text.index(char, pos + 1)
+            while text[end - 1] == '\\':
+                end = text.index(char, end + 1)
+            pos = end
+        elif depth == 0 and char in stops:
+            return pos
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        pos += 1
+    return pos
+
+
+def matching_brace(text, pos):
+    """Index of the '}' closing the block that opens at text[pos]"""
+    depth = 0
+    while True:
+        pos = scan_to(text, pos, '{}')
+        if pos >= len(text):
+            raise ValueError('unbalanced braces in stylesheet')
+        depth += 1 if text[pos] == '{' else -1
+        if depth == 0:
+            return pos
+        pos += 1
+
+
+def parse_css(text, counter=None):
+    """Rules as ('rule', selector, body, index), ('group', prelude, children) or ('raw', text)"""
+    counter = counter if counter is not None else [0]
+    nodes = []
+    pos = 0
+    while True:
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+        if pos >= len(text):
+            return nodes
+        stop = scan_to(text, pos, '{;')
+        prelude = ' '.join(text[pos:stop].split())
+        if stop >= len(text) or text[stop] == ';':
+            nodes.append(('raw', prelude + ';'))
+            pos = stop + 1
+            continue
+        end = matching_brace(text, stop)
+        body = text[stop + 1:end]
+        if prelude.startswith(NESTING_AT_RULES):
+            nodes.append(('group', prelude, parse_css(body, counter)))
+        elif prelude.startswith('@'):
+            nodes.append(('raw', prelude + '{' + minify(body) + '}'))
+        else:
+            nodes.append(('rule', prelude, body, counter[0]))
+            counter[0] += 1
+        pos = end + 1
+
+
+def source_text(path=SOURCE_CSS):
+    """overhaul.css as Jekyll exposes it: the text after its front matter"""
+    with open(path, encoding='utf-8') as f:
+        return FRONT_MATTER_RE.sub('', f.read(), count=1)
+
+
+def load_stylesheet(path=SOURCE_CSS):
+    return parse_css(CSS_COMMENT_RE.sub('', source_text(path)))
+
+
+def iter_rules(nodes):
+    for node in nodes:
+        if node[0] == 'rule':
+            yield node
+        elif node[0] == 'group':
+            yield from iter_rules(node[2])
+
+
+def minify(text, selector=False):
+    """Collapse whitespace outside strings; selectors keep descendant spaces"""
+    parts = []
+    for index, piece in enumerate(re.split(r'("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')', text)):
+        if index % 2:
+            parts.append(piece)
+            continue
+        piece = re.sub(r'\s+', ' ', piece)
+        piece = re.sub(r'\s*([{};,])\s*', r'\1', piece)
+        piece = re.sub(r'\s*([>+~])\s*' if selector else r'(?<=[\w-])\s*:\s*', r'\1' if selector else ':', piece)
+        parts.append(piece)
+    return ''.join(parts).strip().replace(';}', '}').rstrip(';')
+
+
+def serialize(nodes, keep, keyframes_used=None):
+    """Minified CSS for the kept rule indices, dropping groups left empty"""
+    out = []
+    for node in nodes:
+        if node[0] == 'rule':
+            if node[3] in keep:
+                out.append(f"{minify(node[1], selector=True)}{{{minify(node[2])}}}")
+        elif node[0] == 'group':
+            inner = serialize(node[2], keep, keyframes_used)
+            if inner:
+                out.append(f"{node[1]}{{{inner}}}")
+        elif node[1].startswith('@keyframes'):
+            name = node[1].split('{', 1)[0].split()[1]
+            if keyframes_used is None or name in keyframes_used:
+                out.append(node[1])
+        else:
+            out.append(node[1])
+    return ''.join(out)
+
+
+def animation_names(nodes, keep):
+    names = set()
+    for node in iter_rules(nodes):
+        if node[3] in keep:
+            for value in ANIMATION_NAME_RE.findall(node[2]):
+                names.update(WORD_RE.findall(value))
+    return names
+
+
+def in_print_only(nodes, inside=False):
+    """Indices of rules that only apply to print, which never block the first paint"""
+    found = set()
+    for node in nodes:
+        if node[0] == 'rule' and inside:
+            found.add(node[3])
+        elif node[0] == 'group':
+            found |= in_print_only(node[2], inside or node[1].replace(' ', '') == '@mediaprint')
+    return found
+
+
+# --- Selectors ----------------------------------------------------------
+
+def split_list(text):
+    """Split on top-level commas"""
+    items, depth, start = [], 0, 0
+    for pos, char in enumerate(text):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            items.append(text[start:pos].strip())
+            start = pos + 1
+    items.append(text[start:].strip())
+    return [item for item in items if item]
+
+
+def parse_selector(text):
+    """[(combinator, [simple, ...]), ...] from left to right"""
+    parts, compound, combinator = [], [], None
+    pos = 0
+    while pos < len(text):
+        char = text[pos]
+        if char.isspace() or char in '>+~':
+            if compound:
+                parts.append((combinator, compound))
+                compound, combinator = [], ' '
+            while pos < len(text) and (text[pos].isspace() or text[pos] in '>+~'):
+                if text[pos] in '>+~':
+                    combinator = text[pos]
+                pos += 1
+            continue
+        match = SIMPLE_SELECTOR_RE.match(text, pos)
+        if not match:
+            raise SelectorError(text)
+        pos = match.end()
+        if match.group('tag'):
+            compound.append(('tag', match.group('tag').lower()))
+        elif match.group('id'):
+            compound.append(('id', match.group('id')))
+        elif match.group('cls'):
+            compound.append(('class', match.group('cls')))
+        elif match.group('attr'):
+            value = match.group('value')
+            if value and value[0] in '"\'':
+                value = value[1:-1]
+            compound.append(('attr', match.group('attr').lower(), match.group('op'), value, match.group('flag')))
+        elif match.group('element'):
+            compound.append(('state', match.group('element')))
+        else:
+            name = match.group('pseudo').lower()
+            argument = None
+            if pos < len(text) and text[pos] == '(':
+                end = scan_to(text, pos + 1, ')')
+                argument = text[pos + 1:end]
+                pos = end + 1
+            if name in ('not', 'is', 'where', 'matches'):
+                compound.append((name, [parse_selector(item) for item in split_list(argument or '')]))
+            elif name in STRUCTURAL_PSEUDOS:
+                compound.append(('structural', name, argument))
+            else:
+                compound.append(('state', name))
+    if compound:
+        parts.append((combinator, compound))
+    if not parts:
+        raise SelectorError(text)
+    return parts
+
+
+def nth_matches(expression, position):
+    match = NTH_RE.match(expression or '')
+    if not match:
+        return True
+    odd, even, step, sign, offset, constant = match.groups()
+    if odd:
+        step, offset = 2, 1
+    elif even:
+        step, offset = 2, 0
+    elif constant is not None:
+        return position == int(constant)
+    else:
+        step = int(step + '1') if step in ('', '+', '-') else int(step)
+        offset = int(offset or 0) * (-1 if sign == '-' else 1)
+    if step == 0:
+        return position == offset
+    return (position - offset) % step == 0 and (position - offset) // step >= 0
+
+
+class Element:
+    __slots__ = ('tag', 'attrs', 'classes', 'parent', 'children', 'order', 'fold')
+
+    def __init__(self, tag, attrs, parent, order, fold):
+        self.tag = tag
+        self.attrs = attrs
+        self.classes = frozenset(attrs.get('class', '').split())
+        self.parent = parent
+        self.children = []
+        self.order = order
+        self.fold = fold
+
+    def siblings(self):
+        return self.parent.children if self.parent else [self]
+
+
+class Page:
+    """The element tree of one built page, with a fold flag on each element"""
+
+    def __init__(self, html, fold_chars):
+        self.elements = []
+        self.by_tag, self.by_class, self.by_id = {}, {}, {}
+        self.layout = None
+        builder = TreeBuilder(self, fold_chars)
+        builder.feed(html)
+        builder.close()
+
+    def add(self, element):
+        self.elements.append(element)
+        self.by_tag.setdefault(element.tag, []).append(element)
+        for name in element.classes:
+            self.by_class.setdefault(name, []).append(element)
+        if 'id' in element.attrs:
+            self.by_id.setdefault(element.attrs['id'], []).append(element)
+
+
+class TreeBuilder(HTMLParser):
+    def __init__(self, page, fold_chars):
+        super().__init__(convert_charrefs=True)
+        self.page = page
+        self.fold_chars = fold_chars
+        self.stack = []
+        self.text_seen = 0
+        self.in_body = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name.lower(): value or '' for name, value in attrs}
+        if tag == 'body':
+            self.in_body = True
+            self.page.layout = attrs.get('data-layout')
+        parent = self.stack[-1] if self.stack else None
+        element = Element(tag, attrs, parent, len(self.page.elements), self.text_seen < self.fold_chars)
+        if parent:
+            parent.children.append(element)
+        self.page.add(element)
+        if tag not in VOID_ELEMENTS:
+            self.stack.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS and self.stack and self.stack[-1].tag == tag:
+            self.stack.pop()
+
+    def handle_endtag(self, tag):
+        for depth in range(len(self.stack) - 1, -1, -1):
+            if self.stack[depth].tag == tag:
+                del self.stack[depth:]
+                return
+
+    def handle_data(self, data):
+        if self.in_body and not (self.stack and self.stack[-1].tag in RAW_TEXT_ELEMENTS):
+            self.text_seen += len(data.strip())
+
+
+class Matcher:
+    """Selector matching against a Page, treating runtime classes and attributes as present"""
+
+    def __init__(self, dynamic):
+        self.dynamic = dynamic
+
+    def uncertain(self, parts):
+        for _, compound in parts:
+            for simple in compound:
+                if simple[0] == 'state' or (simple[0] in ('class', 'attr') and simple[1] in self.dynamic):
+                    return True
+                if simple[0] in ('not', 'is', 'where', 'matches') and any(self.uncertain(p) for p in simple[1]):
+                    return True
+        return False
+
+    def simple_matches(self, element, simple):
+        kind = simple[0]
+        if kind == 'tag':
+            return simple[1] == '*' or element.tag == simple[1]
+        if kind == 'id':
+            return element.attrs.get('id') == simple[1]
+        if kind == 'class':
+            return simple[1] in element.classes or simple[1] in self.dynamic
+        if kind == 'attr':
+            return self.attr_matches(element, *simple[1:])
+        if kind == 'state':
+            return True
+        if kind == 'structural':
+            return self.structural_matches(element, simple[1], simple[2])
+        if kind == 'not':
+            if any(self.uncertain(parts) for parts in simple[1]):
+                return True
+            return not any(self.matches(element, parts) for parts in simple[1])
+        return any(self.matches(element, parts) for parts in simple[1])
+
+    def attr_matches(self, element, name, op, value, flag):
+        if name in self.dynamic:
+            return True
+        if name not in element.attrs:
+            return False
+        if op is None:
+            return True
+        actual = element.attrs[name]
+        if flag == 'i':
+            actual, value = actual.lower(), value.lower()
+        if op == '=':
+            return actual == value
+        if op == '~=':
+            return value in actual.split()
+        if op == '|=':
+            return actual == value or actual.startswith(value + '-')
+        if op == '^=':
+            return bool(value) and actual.startswith(value)
+        if op == '$=':
+            return bool(value) and actual.endswith(value)
+        return bool(value) and value in actual
+
+    def structural_matches(self, element, name, argument):
+        if name == 'root':
+            return element.parent is None
+        siblings = element.siblings()
+        if name.endswith('of-type'):
+            siblings = [sibling for sibling in siblings if sibling.tag == element.tag]
+        position = siblings.index(element) + 1
+        from_end = len(siblings) - position + 1
+        if name in ('first-child', 'first-of-type'):
+            return position == 1
+        if name in ('last-child', 'last-of-type'):
+            return from_end == 1
+        if name in ('only-child', 'only-of-type'):
+            return len(siblings) == 1
+        if name.startswith('nth-last'):
+            return nth_matches(argument, from_end)
+        return nth_matches(argument, position)
+
+    def matches(self, element, parts, index=None):
+        index = len(parts) - 1 if index is None else index
+        combinator, compound = parts[index]
+        if not all(self.simple_matches(element, simple) for simple in compound):
+            return False
+        if index == 0:
+            return True
+        if combinator == '>':
+            return element.parent is not None and self.matches(element.parent, parts, index - 1)
+        if combinator == ' ':
+            ancestor = element.parent
+            while ancestor is not None:
+                if self.matches(ancestor, parts, index - 1):
+                    return True
+                ancestor = ancestor.parent
+            return False
+        siblings = element.siblings()
+        position = siblings.index(element)
+        if combinator == '+':
+            return position > 0 and self.matches(siblings[position - 1], parts, index - 1)
+        return any(self.matches(sibling, parts, index - 1) for sibling in siblings[:position])
+
+    def candidates(self, page, compound):
+        """Elements that could match the rightmost compound, in document order"""
+        for simple in compound:
+            if simple[0] == 'id':
+                return page.by_id.get(simple[1], [])
+        for simple in compound:
+            if simple[0] == 'class' and simple[1] not in self.dynamic:
+                return page.by_class.get(simple[1], [])
+        for simple in compound:
+            if simple[0] == 'tag' and simple[1] != '*':
+                return page.by_tag.get(simple[1], [])
+        return page.elements
+
+    def first_match(self, page, parts):
+        """The earliest element matching the selector, or None"""
+        for element in self.candidates(page, parts[-1][1]):
+            if self.matches(element, parts):
+                return element
+        return None
+
+    def created_by_script(self, parts):
+        """Selectors whose subject carries a class only the site JavaScript adds"""
+        return any(simple[0] == 'class' and simple[1] in self.dynamic for simple in parts[-1][1])
+
+
+def dynamic_tokens(html_pages=()):
+    """Class and attribute names that appear as strings in first-party scripts"""
+    sources = []
+    for path in sorted(glob.glob(SCRIPT_GLOB)):
+        with open(path, encoding='utf-8') as f:
+            sources.append(f.read())
+    for html in html_pages:
+        sources.extend(SCRIPT_BLOCK_RE.findall(html))
+    tokens = set()
+    for source in sources:
+        for match in STRING_LITERAL_RE.finditer(source):
+            tokens.update(WORD_RE.findall(match.group(1) or match.group(2) or ''))
+    return frozenset(tokens)
+
+
+def match_page(page, rules, matcher):
+    """Rule indices matching anywhere on the page, and those matching before the fold"""
+    used, fold = [], []
+    for _, selector_text, _, index in rules:
+        hit = hit_fold = False
+        for selector in split_list(selector_text):
+            try:
+                parts = parse_selector(selector)
+            except SelectorError:
+                hit = hit_fold = True
+                break
+            element = matcher.first_match(page, parts)
+            if element is not None:
+                hit = True
+                if element.fold:
+                    hit_fold = True
+                    break
+            elif matcher.created_by_script(parts):
+                hit = True
+        if hit:
+            used.append(index)
+        if hit_fold:
+            fold.append(index)
+    return used, fold
+
+
+# --- Site ---------------------------------------------------------------
+
+def page_key(html, css_digest, dynamic, fold_chars):
+    """Cache key over the page body (without ?v= build revisions) and the stylesheet"""
+    body = BODY_RE.search(html)
+    digest = hashlib.sha256()
+    for part in (REVISION_RE.sub('', body.group(0) if body else html), css_digest,
+                 ' '.join(sorted(dynamic)), str(fold_chars), str(ENGINE_VERSION)):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def load_cache():
+    try:
+        with open(CACHE_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build(site_dir, fold_chars=DEFAULT_FOLD_CHARS, use_cache=True):
+    """{layout: {'pages': n, 'used': set, 'fold': set}} plus the parsed stylesheet"""
+    nodes = load_stylesheet()
+    rules = list(iter_rules(nodes))
+    css_digest = file_hash(SOURCE_CSS)
+    pages = []
+    for path in sorted(glob.glob(os.path.join(site_dir, '**', '*.html'), recursive=True)):
+        with open(path, encoding='utf-8', errors='replace') as f:
+            html = f.read()
+        if 'data-layout=' in html:
+            pages.append((path, html))
+    dynamic = dynamic_tokens(html for _, html in pages)
+    matcher = Matcher(dynamic)
+    cache = load_cache() if use_cache else {}
+    fresh = {}
+    layouts = {}
+    for path, html in pages:
+        key = page_key(html, css_digest, dynamic, fold_chars)
+        page = None
+        if key in cache:
+            entry = cache[key]
+        else:
+            page = Page(html, fold_chars)
+            used, fold = match_page(page, rules, matcher)
+            entry = {'layout': page.layout, 'used': used, 'fold': fold}
+        fresh[key] = entry
+        if not entry['layout']:
+            continue
+        layout = layouts.setdefault(entry['layout'], {'pages': 0, 'used': set(), 'fold': set()})
+        layout['pages'] += 1
+        layout['used'].update(entry['used'])
+        layout['fold'].update(entry['fold'])
+    if use_cache:
+        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(fresh, f)
+    return nodes, css_digest, layouts
+
+
+def render(nodes, css_digest, layouts):
+    """(stylesheet files, data) for the matched layouts"""
+    print_only = in_print_only(nodes)
+    # default.html compares source_css with the live overhaul.css and falls back to it when they differ
+    files, data = {}, {'source': css_digest[:16], 'source_css': source_text(), 'layouts': {}}
+    for name, layout in sorted(layouts.items()):
+        critical_rules = layout['fold'] - print_only
+        stylesheet = f"/assets/css/layouts/{name}.css"
+        files[os.path.join(LAYOUT_CSS_DIR, name + '.css')] = (
+            '/* Generated by critical-css.py from assets/css/overhaul.css; edit that file instead. */\n'
+            + serialize(nodes, layout['used'], animation_names(nodes, layout['used'])) + '\n')
+        data['layouts'][name] = {
+            'critical': serialize(nodes, critical_rules, animation_names(nodes, critical_rules)),
+            'stylesheet': stylesheet,
+        }
+    files[DATA_FILE] = json.dumps(data, indent=2, ensure_ascii=False) + '\n'
+    return files
+
+
+def read_text(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract critical CSS and per-layout stylesheets')
+    parser.add_argument('--site', default=SITE_DIR, help='built site directory (default: _site)')
+    parser.add_argument('--fold-chars', type=int, default=DEFAULT_FOLD_CHARS,
+                        help='characters of page text treated as above the fold (default: %(default)s)')
+    parser.add_argument('--check', action='store_true', help='exit 1 if the committed output is stale')
+    parser.add_argument('--force', action='store_true', help='ignore cached match results')
+    args = parser.parse_args()
+
+    site_dir = os.path.abspath(args.site)
+    if not os.path.isdir(site_dir):
+        print(f'{os.path.relpath(site_dir)} not found. Run "bundle exec jekyll build" first.')
+        sys.exit(1)
+    if args.check and not os.path.exists(DATA_FILE):
+        print('✓ No critical CSS generated; layouts load overhaul.css directly')
+        return
+
+    nodes, css_digest, layouts = build(site_dir, args.fold_chars, use_cache=not args.force)
+    if not layouts:
+        print(f"✗ No pages in {os.path.relpath(site_dir)} carry <body data-layout>; rebuild the site first")
+        sys.exit(1)
+    files = render(nodes, css_digest, layouts)
+
+    if args.check:
+        stale = [path for path, text in files.items() if read_text(path) != text]
+        for path in stale:
+            print(f"✗ {os.path.relpath(path, REPO_ROOT)} is stale")
+        if stale:
+            print('Run "python3 critical-css.py" after a build and rebuild the site.')
+            sys.exit(1)
+        print(f"✓ Critical CSS is current for {len(layouts)} layouts")
+        return
+
+    os.makedirs(LAYOUT_CSS_DIR, exist_ok=True)
+    for path, text in files.items():
+        if read_text(path) != text:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+    for stale in glob.glob(os.path.join(LAYOUT_CSS_DIR, '*.css')):
+        if stale not in files:
+            os.remove(stale)
+
+    with open(SOURCE_CSS, encoding='utf-8') as f:
+        source_size = gzip_size(f.read())
+    data = json.loads(files[DATA_FILE])
+    for name, layout in sorted(layouts.items()):
+        stylesheet = files[os.path.join(LAYOUT_CSS_DIR, name + '.css')]
+        critical = format_kb(gzip_size(data['layouts'][name]['critical']))
+        print(f"✓ {name}: {layout['pages']} pages, critical {critical} inline, "
+              f"{format_kb(gzip_size(stylesheet))} async (overhaul.css {format_kb(source_size)})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Date-transition precompiler for the Jekyll data files
+
+Templates compare build-time site.time against date-bounded entries in
+_data/*.yml (start_date / end_date_exclusive on positions, education and
+identity.statuses), so the rendered site only changes on the days one of
+those boundaries is crossed. This script resolves every entry to
+upcoming / active / ended as of a given day, lists the transition dates,
+and tells refresh-pages.yml whether anything changed since the last
+Pages build:
+
+    python3 date-transitions.py                          # view as of today, next transition
+    python3 date-transitions.py --as-of 2026-09-01
+    python3 date-transitions.py --since 2026-08-30T04:20:00Z --github-output
+"""
+import argparse
+import datetime
+import glob
+import json
+import os
+import sys
+from collections.abc import Mapping
+from zoneinfo import ZoneInfo
+
+from script_loader import load_script
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(REPO_ROOT, '_data')
+CONFIG = os.path.join(REPO_ROOT, '_config.yml')
+# Fields the templates compare with `site.time | date: '%Y-%m-%d'`
+START_FIELD = 'start_date'
+END_FIELD = 'end_date_exclusive'
+LABEL_FIELDS = ('name', 'label', 'title', 'role', 'position', 'institution', 'organization', 'id')
+
+
+data_loader = load_script('load-data.py')
+
+
+def parse_boundary(value):
+    """'2026-09-01', '2018-04' or '2015' -> the first day the string compares <= as_of"""
+    text = str(value).strip()
+    parts = text.split('-')
+    try:
+        year = int(parts[0])
+        month = int(parts[1]) if len(parts) > 1 else 1
+        day = int(parts[2]) if len(parts) > 2 else 1
+        return datetime.date(year, month, day)
+    except (ValueError, IndexError):
+        return None
+
+
+class Entry:
+    """One date-bounded mapping somewhere in a data file"""
+
+    def __init__(self, location, label, start, end):
+        self.location = location
+        self.label = label
+        self.start = start
+        self.end = end
+
+    def state(self, day):
+        if self.start and day < self.start:
+            return 'upcoming'
+        if self.end and day >= self.end:
+            return 'ended'
+        return 'active'
+
+    @property
+    def boundaries(self):
+        return [boundary for boundary in (self.start, self.end) if boundary]
+
+
+def collect(node, location, entries):
+    if isinstance(node, Mapping):
+        if START_FIELD in node or END_FIELD in node:
+            start = parse_boundary(node[START_FIELD]) if node.get(START_FIELD) else None
+            end = parse_boundary(node[END_FIELD]) if node.get(END_FIELD) else None
+            if start or end:
+                label = next((str(node[field]) for field in LABEL_FIELDS if node.get(field)), location)
+                entries.append(Entry(location, label, start, end))
+        for key, value in node.items():
+            collect(value, f"{location}.{key}", entries)
+    elif isinstance(node, list):
+        for index, value in enumerate(node):
+            collect(value, f"{location}[{index}]", entries)
+
+
+def scan(data_dir=DATA_DIR):
+    entries = []
+    for path in sorted(glob.glob(os.path.join(data_dir, '*.yml')) + glob.glob(os.path.join(data_dir, '*.yaml'))):
+        data = data_loader.load(path)
+        collect(data, os.path.splitext(os.path.basename(path))[0], entries)
+    return entries
+
+
+def transitions(entries):
+    return sorted({boundary for entry in entries for boundary in entry.boundaries})
+
+
+def next_transition(entries, day):
+    return next((boundary for boundary in transitions(entries) if boundary > day), None)
+
+
+def changed_between(entries, since, day):
+    """Transition dates crossed after `since` up to and including `day`"""
+    return [boundary for boundary in transitions(entries) if since < boundary <= day]
+
+
+def site_timezone():
+    return ZoneInfo(data_loader.load(CONFIG).get('timezone') or 'UTC')
+
+
+def local_date(value, zone):
+    """An ISO date or timestamp as a calendar day in the site's timezone"""
+    if len(value) == 10:
+        return datetime.date.fromisoformat(value)
+    moment = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return moment.astimezone(zone).date()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Resolve date-bounded data and find the next rendered change')
+    parser.add_argument('--as-of', help='day to resolve (default: today in the site timezone)')
+    parser.add_argument('--since', help='date or timestamp of the last Pages build; report whether a rebuild is due')
+    parser.add_argument('--json', action='store_true', help='print the resolved view as JSON')
+    parser.add_argument('--github-output', action='store_true',
+                        help='append rebuild=<true|false> and next=<date> to $GITHUB_OUTPUT')
+    args = parser.parse_args()
+
+    zone = site_timezone()
+    today = local_date(args.as_of, zone) if args.as_of else datetime.datetime.now(zone).date()
+    entries = scan()
+    upcoming = next_transition(entries, today)
+    crossed = changed_between(entries, local_date(args.since, zone), today) if args.since else []
+
+    if args.json:
+        print(json.dumps({
+            'as_of': today.isoformat(),
+            'next_transition': upcoming.isoformat() if upcoming else None,
+            'transitions': [boundary.isoformat() for boundary in transitions(entries)],
+            'entries': [{'location': entry.location, 'label': entry.label, 'state': entry.state(today)}
+                        for entry in entries],
+            **({'rebuild': bool(crossed)} if args.since else {}),
+        }, indent=2))
+    else:
+        print(f"As of {today.isoformat()} ({zone.key}):")
+        for entry in entries:
+            print(f"  {entry.state(today):8} {entry.label}  [{entry.location}]")
+        print(f"\nNext rendered change: {upcoming.isoformat() if upcoming else 'none scheduled'}")
+        if args.since:
+            if crossed:
+                print(f"Rebuild needed: crossed {', '.join(boundary.isoformat() for boundary in crossed)}")
+            else:
+                print("No date transition since the last build; skipping the rebuild.")
+
+    if args.github_output:
+        output = os.environ.get('GITHUB_OUTPUT')
+        if not output:
+            print("GITHUB_OUTPUT is not set.")
+            sys.exit(1)
+        with open(output, 'a', encoding='utf-8') as f:
+            f.write(f"rebuild={'true' if crossed else 'false'}\n")
+            f.write(f"next={upcoming.isoformat() if upcoming else ''}\n")
+
+if __name__ == '__main__':
+    main()
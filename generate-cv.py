@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Generate the CV variants in _posts/ from YAML data
+
+Renders _posts/cv.tex, _posts/cv_software_engineer.tex and
+_posts/one_paged.tex from the templates in _cv_templates/ using
+_data/profile.yml (identity, contact details, positions, education,
+awards and skills) and _data/cv.yml (which profile entries each CV
+shows, in what order, and any wording written for that CV).
+one_paged.tex shares the engineering template with
+cv_software_engineer.tex but caps its highlights, projects and
+achievements through its VARIANTS params, which the template reads as
+variant.*. Templates are compiled once into Python code objects cached
+in .cv-cache/. Every render records which data slices the variant read
+(e.g. profile.email or profile.positions) with a hash of each, so after
+an edit only the variants whose template or slices changed are
+regenerated and handed to build-latex.py, which compiles them in
+parallel:
+
+    python3 generate-cv.py               # regenerate and compile what changed
+    python3 generate-cv.py --no-compile  # only rewrite the .tex sources
+    python3 generate-cv.py --dry-run     # show which variants are stale and why
+
+Template syntax: \\VAR{expression} inserts a value and \\BLOCK{for ...},
+\\BLOCK{if ...}, \\BLOCK{else}, \\BLOCK{endfor} / \\BLOCK{endif} control
+flow; a line holding only a \\BLOCK{} tag produces no output.
+"""
+import argparse
+import hashlib
+import html
+import json
+import marshal
+import os
+import re
+import shutil
+import sys
+from collections.abc import Mapping
+
+from script_loader import load_script
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DIR = os.path.join(REPO_ROOT, '_cv_templates')
+CACHE_DIR = os.path.join(REPO_ROOT, '.cv-cache')
+STATE_FILE = os.path.join(CACHE_DIR, 'state.json')
+# Bump when the generated code changes shape so cached templates are recompiled
+ENGINE_VERSION = 1
+DATA_FILES = {
+    'profile': '_data/profile.yml',
+    'cv': '_data/cv.yml',
+    'site': '_config.yml',
+}
+
+# name -> template, generated source and the parameters the template reads
+# as variant.*; names match build-latex.py DOCUMENTS
+VARIANTS = {
+    'cv': {
+        'template': 'academic.tex',
+        'output': '_posts/cv.tex',
+    },
+    'cv-software-engineer': {
+        'template': 'engineering.tex',
+        'output': '_posts/cv_software_engineer.tex',
+    },
+    'one-paged': {
+        'template': 'engineering.tex',
+        'output': '_posts/one_paged.tex',
+        'params': {'max_highlights': 3, 'max_projects': 2, 'max_achievements': 3},
+    },
+}
+
+TAG_RE = re.compile(r'\\(VAR|BLOCK)\{(.*?)\}')
+BLOCK_LINE_RE = re.compile(r'^[ \t]*\\BLOCK\{(.*?)\}[ \t]*\n', re.MULTILINE)
+HTML_TAG_RE = re.compile(r'<(/?)([a-zA-Z]+)([^>]*)>')
+HREF_RE = re.compile(r'href=["\']([^"\']*)["\']')
+MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+data_loader = load_script('load-data.py')
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Template compiler
+
+class TemplateError(Exception):
+    pass
+
+
+def translate(source, name):
+    """Turn template text into the source of a Python render(out) function
+
+    Expressions may not contain a closing brace; \\VAR{} ends at the first one.
+    """
+    code = ['def render(out):']
+    depth = 1
+    position = 0
+
+    def emit(line):
+        code.append('    ' * depth + line)
+
+    # Standalone \BLOCK lines are rewritten so they leave no blank line behind
+    source = BLOCK_LINE_RE.sub(lambda match: f"\\BLOCK{{{match.group(1)}}}", source)
+    for match in TAG_RE.finditer(source):
+        literal = source[position:match.start()]
+        if literal:
+            emit(f"out({literal!r})")
+        position = match.end()
+        kind, body = match.group(1), match.group(2).strip()
+        line = source.count('\n', 0, match.start()) + 1
+        if kind == 'VAR':
+            emit(f"out(value({body}))")
+            continue
+        keyword = body.split(None, 1)[0] if body else ''
+        if keyword in ('for', 'if'):
+            emit(f"{body}:")
+            depth += 1
+        elif keyword == 'elif':
+            emit('pass')
+            depth -= 1
+            emit(f"{body}:")
+            depth += 1
+        elif keyword == 'else':
+            emit('pass')
+            depth -= 1
+            emit('else:')
+            depth += 1
+        elif keyword in ('endfor', 'endif'):
+            emit('pass')
+            depth -= 1
+        else:
+            raise TemplateError(f"{name}:{line}: unknown block '{body}'")
+        if depth < 1:
+            raise TemplateError(f"{name}:{line}: unmatched '{body}'")
+    if source[position:]:
+        emit(f"out({source[position:]!r})")
+    if depth != 1:
+        raise TemplateError(f"{name}: unclosed block")
+    return '\n'.join(code) + '\n'
+
+
+class Template:
+    """A template compiled to a code object, cached on disk by content hash"""
+
+    def __init__(self, name):
+        self.name = name
+        with open(os.path.join(TEMPLATE_DIR, name), 'r', encoding='utf-8') as f:
+            self.source = f.read()
+        self.hash = text_hash(self.source)
+        self.from_cache = False
+        self._render = self._load()
+
+    @property
+    def cache_path(self):
+        tag = f"{ENGINE_VERSION}-{sys.implementation.cache_tag}"
+        return os.path.join(CACHE_DIR, 'templates', f"{self.name}-{self.hash[:16]}-{tag}.bin")
+
+    def _load(self):
+        code = None
+        try:
+            with open(self.cache_path, 'rb') as f:
+                code = marshal.load(f)
+            self.from_cache = True
+        except (OSError, EOFError, ValueError, TypeError):
+            code = compile(translate(self.source, self.name), self.name, 'exec')
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, 'wb') as f:
+                marshal.dump(code, f)
+        namespace = dict(HELPERS)
+        exec(code, namespace)
+        return namespace['render']
+
+    def render(self, data):
+        parts = []
+        # Template names resolve against the data roots and helpers
+        self._render.__globals__.update(data)
+        self._render(parts.append)
+        return ''.join(parts)
+
+
+def value(item):
+    if item is None:
+        return ''
+    return str(item)
+
+
+def tex_escape(text):
+    """Escape plain text (e.g. names from profile.yml) for LaTeX"""
+    replacements = {'\\': r'\textbackslash{}', '&': r'\&', '%': r'\%', '$': r'\$', '#': r'\#',
+                    '_': r'\_', '{': r'\{', '}': r'\}', '~': r'\textasciitilde{}', '^': r'\^{}'}
+    return ''.join(replacements.get(char, char) for char in str(text))
+
+
+def html_to_tex(text):
+    """Convert the inline HTML of profile.yml (<b>, <em>, <a href>) to LaTeX
+
+    Other tags are dropped and their text kept; entities are unescaped and
+    the text escaped with tex().
+    """
+    parts = []
+    closers = []
+    position = 0
+    for match in HTML_TAG_RE.finditer(text):
+        parts.append(tex_escape(html.unescape(text[position:match.start()])))
+        position = match.end()
+        closing, tag = match.group(1), match.group(2).lower()
+        if tag in ('b', 'strong', 'em', 'i', 'a'):
+            if closing:
+                parts.append(closers.pop() if closers else '')
+                continue
+            if tag == 'a':
+                href = HREF_RE.search(match.group(3))
+                url = html.unescape(href.group(1)) if href else ''
+                url = url.replace('%', r'\%').replace('#', r'\#')
+                parts.append(f"\\href{{{url}}}{{")
+            else:
+                parts.append(r'\textbf{' if tag in ('b', 'strong') else r'\textit{')
+            closers.append('}')
+        elif tag == 'br':
+            parts.append(' ')
+    parts.append(tex_escape(html.unescape(text[position:])))
+    parts.extend(closers)
+    return re.sub(r'\s+', ' ', ''.join(parts)).strip()
+
+
+def month(date):
+    """'2023-06-01' or '2023-06' -> 'Jun 2023'; a bare year is kept"""
+    date = str(date)
+    if len(date) < 7:
+        return date
+    return f"{MONTHS[int(date[5:7]) - 1]} {date[:4]}"
+
+
+def date_range(entry, separator=' - '):
+    """Dates of a profile.yml position or school, e.g. 'Jun 2023 - Jun 2026'
+
+    An entry with no end date reads '<date_prefix> <start>' when it has a
+    prefix ('Starting Sep 2026') and '<start> - Present' otherwise.
+    """
+    start = month(entry.start_date)
+    if entry.end_date:
+        return f"{start}{separator}{month(entry.end_date)}"
+    if entry.date_prefix:
+        return f"{entry.date_prefix} {start}"
+    return f"{start}{separator}Present"
+
+
+def select(entries, choices):
+    """Pair each cv.yml choice with the profile.yml entry of the same id
+
+    A choice is an id or a mapping with an id and the wording this CV uses
+    for that entry (highlights, tagline); returns [(entry, wording)].
+    """
+    by_id = {entry.get('id'): entry for entry in entries or []}
+    pairs = []
+    for choice in choices or []:
+        wording = View({'id': choice}) if isinstance(choice, str) else choice
+        if wording.id not in by_id:
+            raise TemplateError(f"_data/cv.yml: no profile.yml entry with id '{wording.id}'")
+        pairs.append((by_id[wording.id], wording))
+    return pairs
+
+
+def bare_url(url):
+    """https://www.linkedin.com/in/thromel/ -> linkedin.com/in/thromel"""
+    return re.sub(r'^https?://(www\.)?', '', str(url)).rstrip('/')
+
+
+HELPERS = {
+    'value': value,
+    'tex': tex_escape,
+    'html': html_to_tex,
+    'month': month,
+    'dates': date_range,
+    'select': select,
+    'bare_url': bare_url,
+    'join': lambda items, separator=', ': separator.join(str(item) for item in items),
+}
+
+
+# ---------------------------------------------------------------------------
+# Data slices
+
+class View(dict):
+    """Attribute access over a YAML mapping; missing keys read as None"""
+
+    def __getattr__(self, key):
+        return wrap(self.get(key))
+
+
+def wrap(item):
+    if isinstance(item, dict) and not isinstance(item, View):
+        return View(item)
+    if isinstance(item, list):
+        return [wrap(element) for element in item]
+    return item
+
+
+class Tracked:
+    """A mapping that records the path of every slice a template reads
+
+    Nested mappings stay tracked; the first list or scalar reached is
+    recorded as a slice (profile.email, profile.positions) and
+    returned untracked, so a slice is the unit of invalidation.
+    """
+
+    def __init__(self, data, path, reads):
+        self._data = data
+        self._path = path
+        self._reads = reads
+
+    def __getattr__(self, key):
+        path = f"{self._path}.{key}"
+        item = self._data.get(key) if isinstance(self._data, Mapping) else None
+        if isinstance(item, Mapping):
+            return Tracked(item, path, self._reads)
+        self._reads.add(path)
+        return wrap(item)
+
+
+def load_data():
+    data = {}
+    for root, path in DATA_FILES.items():
+        data[root] = data_loader.load(path) or {}
+    return data
+
+
+def resolve_slice(data, path):
+    item = data
+    for key in path.split('.'):
+        item = item.get(key) if isinstance(item, Mapping) else None
+    return item
+
+
+def slice_hash(data, path):
+    return text_hash(json.dumps(resolve_slice(data, path), sort_keys=True, default=str))
+
+
+# ---------------------------------------------------------------------------
+# Variants
+
+def load_state():
+    try:
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('version') == ENGINE_VERSION:
+            return state
+    except (OSError, ValueError):
+        pass
+    return {'version': ENGINE_VERSION, 'variants': {}}
+
+
+def save_state(state):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(STATE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def stale_reasons(name, spec, template, data, record):
+    """Why a variant must be regenerated; empty when it is up to date"""
+    output = os.path.join(REPO_ROOT, spec['output'])
+    if not record:
+        return ['never generated']
+    reasons = []
+    if record.get('template') != template.hash:
+        reasons.append(f"template {spec['template']} changed")
+    if record.get('params') != params_hash(spec):
+        reasons.append('variant parameters changed')
+    for path, digest in sorted(record.get('slices', {}).items()):
+        if slice_hash(data, path) != digest:
+            reasons.append(f"{path} changed")
+    if not os.path.exists(output):
+        reasons.append(f"{spec['output']} is missing")
+    else:
+        with open(output, 'r', encoding='utf-8') as f:
+            if text_hash(f.read()) != record.get('output'):
+                reasons.append(f"{spec['output']} was edited by hand")
+    return reasons
+
+
+def params_hash(spec):
+    return text_hash(json.dumps(spec.get('params', {}), sort_keys=True))
+
+
+def render_variant(name, spec, template, data):
+    """Render one variant; returns (text, {slice path: hash})"""
+    reads = set()
+    roots = {root: Tracked(data[root], root, reads) for root in data}
+    roots['variant'] = View(spec.get('params', {}))
+    text = template.render(roots)
+    return text, {path: slice_hash(data, path) for path in sorted(reads)}
+
+
+def generate(names=None, force=False, dry_run=False):
+    """Regenerate stale variants; returns {name: (status, reasons)}"""
+    data = load_data()
+    state = load_state()
+    templates = {}
+    results = {}
+    for name in names or VARIANTS:
+        spec = VARIANTS[name]
+        if spec['template'] not in templates:
+            templates[spec['template']] = Template(spec['template'])
+        template = templates[spec['template']]
+        record = state['variants'].get(name)
+        reasons = ['forced'] if force else stale_reasons(name, spec, template, data, record)
+        if not reasons:
+            results[name] = ('up-to-date', [])
+            continue
+        if dry_run:
+            results[name] = ('stale', reasons)
+            continue
+
+        text, slices = render_variant(name, spec, template, data)
+        output = os.path.join(REPO_ROOT, spec['output'])
+        try:
+            with open(output, 'r', encoding='utf-8') as f:
+                unchanged = f.read() == text
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            with open(output, 'w', encoding='utf-8') as f:
+                f.write(text)
+        state['variants'][name] = {'template': template.hash, 'params': params_hash(spec),
+                                   'slices': slices, 'output': text_hash(text)}
+        results[name] = ('unchanged' if unchanged else 'generated', reasons)
+    if not dry_run:
+        save_state(state)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate the CV variants from _data/profile.yml and _data/cv.yml')
+    parser.add_argument('variants', nargs='*', metavar='VARIANT',
+                        help=f"variants to generate (default: all of {', '.join(VARIANTS)})")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='variants to compile in parallel')
+    parser.add_argument('--force', action='store_true', help='regenerate even if nothing changed')
+    parser.add_argument('--no-compile', action='store_true', help='only write the .tex sources')
+    parser.add_argument('--dry-run', action='store_true', help='report stale variants without writing anything')
+    args = parser.parse_args()
+
+    unknown = [name for name in args.variants if name not in VARIANTS]
+    if unknown:
+        parser.error(f"unknown variant(s): {', '.join(unknown)}")
+
+    try:
+        results = generate(args.variants, args.force, args.dry_run)
+    except TemplateError as error:
+        print(f"✗ {error}")
+        sys.exit(1)
+    for name, (status, reasons) in results.items():
+        detail = f" ({'; '.join(reasons)})" if reasons else ''
+        print(f"{'–' if status == 'up-to-date' else '✓'} {name}: {status}{detail}")
+
+    # A regenerated source whose text did not change needs no new PDF unless forced
+    changed = [name for name, (status, _) in results.items()
+               if status == 'generated' or (args.force and status != 'up-to-date')]
+    if args.dry_run or args.no_compile or not changed:
+        sys.exit(0)
+    if shutil.which('pdflatex') is None:
+        print("pdflatex not found. Please install a LaTeX distribution.")
+        sys.exit(1)
+    builder = load_script('build-latex.py')
+    sys.exit(0 if builder.build(changed, max(1, args.jobs), force=args.force) else 1)
+
+if __name__ == '__main__':
+    main()
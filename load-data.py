@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+Shared, snapshot-cached loader for the _data YAML files
+
+Each file is parsed once, checked against the schema declared for it in
+SCHEMAS below, and written to .data-cache/ as a binary snapshot stamped
+with the SHA-256 of the YAML and of the schema. Later loads hash the
+YAML, memory-map the matching snapshot, and unpickle a top-level section
+(positions, education, agenda, ...) only when it is first read, so a
+script that needs profile.github never materializes profile.short_bio.
+An edited file or schema gets a fresh parse and validation; a snapshot
+that cannot be written (read-only checkout) just falls back to the parse.
+
+Other scripts import it through script_loader:
+
+    from script_loader import load_script
+    data = load_script('load-data.py')
+    profile = data.load('profile')          # _data/profile.yml
+    positions = profile['positions']
+    site = data.load('_config.yml')         # any YAML file in the repo
+
+A mapping document comes back as a read-only Snapshot (a Mapping, not a
+dict), and each section object is cached for the life of the process:
+every load() of profile returns the same positions list. Treat sections
+as read-only. Mutating one changes what later loads in the same process
+see. Call materialize() for a private dict that is safe to edit.
+
+Run directly it validates every data file and refreshes the snapshots:
+
+    python3 load-data.py           # validate, snapshot and time each file
+    python3 load-data.py --check   # validate only, without touching the cache
+"""
+import argparse
+import datetime
+import glob
+import hashlib
+import mmap
+import os
+import pickle
+import re
+import struct
+import sys
+import time
+from collections.abc import Mapping
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(REPO_ROOT, '_data')
+CACHE_DIR = os.path.join(REPO_ROOT, '.data-cache')
+# magic, format version, SHA-256 of the YAML, SHA-256 of the schema, index length
+HEADER = struct.Struct('<6sH32s32sI')
+MAGIC = b'YSNAP\0'
+# Bump when the snapshot layout changes so old snapshots are rebuilt
+FORMAT_VERSION = 1
+
+# ---------------------------------------------------------------------------
+# Schemas
+#
+# A type (or tuple of types) checks isinstance, a compiled pattern checks a
+# string, [spec] checks every item of a list and {key: spec} checks a
+# mapping. Keys ending in '?' are optional; keys not listed are allowed.
+
+ISO_DATE = re.compile(r'^\d{4}(-\d{2}(-\d{2})?)?$')
+SLUG = re.compile(r'^[a-z0-9][a-z0-9-]*$')
+LINK = {'label': str, 'url': str}
+NAMED_URL = {'name': str, 'url': str}
+GROUPS = [{'type': str, 'names': [str]}]
+
+SCHEMAS = {
+    '_config.yml': {
+        'title': str,
+        'url': str,
+        'baseurl': str,
+        'timezone?': str,
+        'collections': dict,
+        'exclude': [str],
+    },
+    '_data/authors.yml': dict,
+    '_data/books.yml': [{
+        'title': str,
+        'author': str,
+        'type': str,
+        'subtitle?': str,
+        'starred?': bool,
+    }],
+    '_data/contributions.yml': {
+        'last_verified': ISO_DATE,
+        'highlights': [{
+            'name': str,
+            'repo': str,
+            'area': str,
+            'summary': str,
+            'proof_url': str,
+            'proof_label': str,
+        }],
+    },
+    # Entries of profile.yml picked by id, optionally with this CV's wording
+    '_data/cv.yml': {
+        'academic': {
+            'tagline': str,
+            'education': [{'id': SLUG, 'highlights?': [str]}],
+            'research': list,
+            'projects': list,
+            'open_source': list,
+            'experience': [{'id': SLUG, 'highlights?': [str]}],
+            'awards': [SLUG],
+            'references': str,
+        },
+        'engineering': {
+            'title': str,
+            'summary': str,
+            'experience': [{'id': SLUG, 'tagline?': str, 'highlights?': [str]}],
+            'projects': list,
+            'education': [{'id': SLUG, 'highlights?': [str]}],
+            'achievements': [SLUG],
+        },
+    },
+    '_data/learning.yml': {
+        'currently_learning': [{'title': str, 'type': str, 'category': str, 'progress': int, 'icon': str}],
+        'selected_courses': [{'provider': str, 'items': list}],
+        'resources': [{
+            'title': str,
+            'author': str,
+            'type': str,
+            'category': str,
+            'description': str,
+            'link': str,
+        }],
+        'categories': [{'id': str, 'name': str, 'icon': str}],
+    },
+    '_data/navigation.yml': {
+        'primary_pages': [{'name': str, 'url': str, 'active_prefix?': str}],
+        'header_action': NAMED_URL,
+        'footer_groups': [{'label': str, 'items': [NAMED_URL]}],
+        'pages': [NAMED_URL],
+    },
+    '_data/news.yaml': [{'title': str, 'date': datetime.date, 'url': str, 'description': str}],
+    '_data/oreilly_ml.yml': {
+        'books': [{'title': str, 'url': str, 'category': str, 'status': str}],
+    },
+    '_data/oreilly_swe.yml': {
+        'books': [{
+            'title': str,
+            'url': str,
+            'category': str,
+            'status': str,
+            'difficulty': str,
+            'priority': str,
+            'reading_order': int,
+            'est_weeks': int,
+            'notes?': str,
+        }],
+    },
+    '_data/profile.yml': {
+        'primary_name': str,
+        'navbar_name': str,
+        'about_snippet': str,
+        'email': str,
+        'github': str,
+        'linkedin': str,
+        'gscholar': str,
+        'orcid': str,
+        'cv_link': str,
+        'location': str,
+        'short_bio': str,
+        'current_affiliation': {'name': str, 'logo': str, 'url': str},
+        'research_statement': {'summary': str, 'lanes': list},
+        'summary': [str],
+        'research_interests': [str],
+        'positions': [{
+            'name': str,
+            'id': SLUG,
+            'role': str,
+            'organization': str,
+            'location': str,
+            'url': str,
+            'logo': str,
+            'logo_alt': str,
+            'date': str,
+            'display_date': str,
+            'start_date': ISO_DATE,
+            'start_label': str,
+            'end_date?': ISO_DATE,
+            'end_date_exclusive?': ISO_DATE,
+            'end_label?': str,
+            'description': str,
+            'responsibilities': [str],
+            'technologies': [str],
+            'links?': [LINK],
+        }],
+        'education': [{
+            'name': str,
+            'id': SLUG,
+            'location': str,
+            'url': str,
+            'logo': str,
+            'logo_width': int,
+            'logo_height': int,
+            'position': str,
+            'date': str,
+            'start_date': ISO_DATE,
+            'start_label': str,
+            'end_date?': ISO_DATE,
+            'end_label?': str,
+            'status?': str,
+            'description': str,
+        }],
+        'awards': [{
+            'name': str,
+            'id': SLUG,
+            'date': (str, int),
+            'organization': str,
+            'type': str,
+            'outcome': str,
+            'description': str,
+            'url?': str,
+        }],
+        'selected_working_set': GROUPS,
+        'technical_skills': GROUPS,
+        'research': [{'title': str, 'date': str, 'description': str, 'short_description': str, 'technologies': [str]}],
+        'projects': [{'title': str, 'date': str, 'description': str, 'link': str, 'technologies': [str]}],
+        'tests_and_certifications': [{'name': str, 'url': str}],
+        'books': [{'title': str, 'author': str, 'category': str, 'status': str, 'url': str}],
+        'hobbies': [{'type': str, 'items': list}],
+    },
+    '_data/research.yml': {
+        'agenda': {'eyebrow': str, 'thesis': str, 'trajectory': str, 'next_step': str},
+        'identity': {'statuses': list, 'thesis': str, 'bridge': str, 'interests': list},
+        'anchors': [{
+            'id': SLUG,
+            'label': str,
+            'title': str,
+            'publicity': str,
+            'status': str,
+            'question': str,
+            'description': str,
+            'context': str,
+            'last_verified': ISO_DATE,
+            'links': [LINK],
+            'image?': str,
+            'image_alt?': str,
+            'image_width?': int,
+            'image_height?': int,
+            'image_sources?': list,
+        }],
+        'supporting_systems': [{'name': str, 'role': str, 'status': str, 'url': str}],
+        'homepage': dict,
+        'contact': {'heading': str, 'copy': str},
+        'detail_pages': dict,
+    },
+}
+
+
+class SchemaError(ValueError):
+    """A data file that does not match its declared schema"""
+
+    def __init__(self, name, problems):
+        self.name = name
+        self.problems = problems
+        super().__init__(f"{name}: " + '; '.join(problems))
+
+
+def type_name(spec):
+    if isinstance(spec, tuple):
+        return ' or '.join(type_name(item) for item in spec)
+    if isinstance(spec, re.Pattern):
+        return f"a string matching {spec.pattern}"
+    return {str: 'a string', int: 'an integer', bool: 'a boolean', list: 'a list', dict: 'a mapping',
+            datetime.date: 'a date'}.get(spec, spec.__name__)
+
+
+def check(value, spec, path, problems):
+    """Append a message to `problems` for every place `value` departs from `spec`"""
+    if isinstance(spec, dict):
+        if not isinstance(value, dict):
+            problems.append(f"{path or 'root'}: expected a mapping, got {type(value).__name__}")
+            return
+        for key, item_spec in spec.items():
+            name = key.rstrip('?')
+            where = f"{path}.{name}" if path else name
+            if name in value:
+                check(value[name], item_spec, where, problems)
+            elif not key.endswith('?'):
+                problems.append(f"{where}: missing")
+    elif isinstance(spec, list):
+        if not isinstance(value, list):
+            problems.append(f"{path or 'root'}: expected a list, got {type(value).__name__}")
+            return
+        for index, item in enumerate(value):
+            check(item, spec[0], f"{path}[{index}]", problems)
+    elif isinstance(spec, re.Pattern):
+        if not isinstance(value, str) or not spec.match(value):
+            problems.append(f"{path}: expected {type_name(spec)}, got {value!r}")
+    # bool is an int subclass, so `progress: true` must not pass as an integer
+    elif not isinstance(value, spec) or (isinstance(value, bool) and bool not in (spec if isinstance(spec, tuple) else (spec,))):
+        problems.append(f"{path or 'root'}: expected {type_name(spec)}, got {type(value).__name__}")
+
+
+def validate(data, name):
+    """Raise SchemaError unless `data` matches the schema declared for `name`"""
+    spec = SCHEMAS.get(name)
+    if spec is None:
+        return
+    problems = []
+    check(data, spec, '', problems)
+    if problems:
+        raise SchemaError(name, problems)
+
+
+def schema_digest(name):
+    return hashlib.sha256(repr(SCHEMAS.get(name)).encode('utf-8')).digest()
+
+
+# ---------------------------------------------------------------------------
+# Snapshots
+
+class Snapshot(Mapping):
+    """A memory-mapped snapshot; each top-level section is unpickled on first access"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.source, self.schema, index_length = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} snapshot")
+        self.is_mapping, self._index = pickle.loads(self._map[HEADER.size:HEADER.size + index_length])
+        self._base = HEADER.size + index_length
+        self._sections = {}
+
+    def _unpickle(self, key):
+        offset, length = self._index[key]
+        start = self._base + offset
+        return pickle.loads(self._map[start:start + length])
+
+    def __getitem__(self, key):
+        if key not in self._sections:
+            self._sections[key] = self._unpickle(key)
+        return self._sections[key]
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def root(self):
+        """The snapshot itself for a mapping, otherwise the whole (list or scalar) document"""
+        return self if self.is_mapping else self[None]
+
+    def materialize(self):
+        """A private deep copy of the whole document, unpickled afresh and not shared"""
+        if not self.is_mapping:
+            return self._unpickle(None)
+        return {key: self._unpickle(key) for key in self}
+
+
+def write_snapshot(path, data, source, schema):
+    if isinstance(data, dict):
+        sections = list(data.items())
+    else:
+        sections = [(None, data)]
+    blobs, index, offset = [], {}, 0
+    for key, value in sections:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        index[key] = (offset, len(blob))
+        blobs.append(blob)
+        offset += len(blob)
+    index_blob = pickle.dumps((isinstance(data, dict), index), protocol=pickle.HIGHEST_PROTOCOL)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, source, schema, len(index_blob)))
+        f.write(index_blob)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(temp, path)
+
+
+def parse(raw):
+    # Importing PyYAML costs more than reading every snapshot, so only a parse pays for it
+    import yaml
+    return yaml.safe_load(raw.decode('utf-8'))
+
+
+def relative_name(source):
+    """'profile' -> '_data/profile.yml'; paths are taken relative to the repo root"""
+    if os.sep not in source and '/' not in source and not source.endswith(('.yml', '.yaml')):
+        for extension in ('.yml', '.yaml'):
+            if os.path.exists(os.path.join(DATA_DIR, source + extension)):
+                return f"_data/{source}{extension}"
+        raise FileNotFoundError(f"_data/{source}.yml not found")
+    return os.path.relpath(os.path.join(REPO_ROOT, source), REPO_ROOT).replace(os.sep, '/')
+
+
+def snapshot_path(name):
+    return os.path.join(CACHE_DIR, name.replace('/', '_') + '.snap')
+
+
+_open_snapshots = {}
+
+
+def load(source):
+    """The parsed, validated contents of a YAML file, from its snapshot when current
+
+    Mapping documents come back as a read-only Snapshot whose sections are
+    materialized on access and shared by every later load in the process,
+    so callers must not mutate them (use Snapshot.materialize() for an
+    editable copy). Lists and scalars come back as the cached value, and a
+    file whose snapshot cannot be written comes back as freshly parsed
+    data. Raises SchemaError when the file does not match its schema.
+    """
+    name = relative_name(source)
+    with open(os.path.join(REPO_ROOT, name), 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).digest()
+    schema = schema_digest(name)
+    path = snapshot_path(name)
+    snapshot = _open_snapshots.get(name)
+    if snapshot is None or snapshot.source != digest or snapshot.schema != schema:
+        try:
+            snapshot = Snapshot(path)
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError, struct.error):
+            snapshot = None
+    if snapshot is not None and snapshot.source == digest and snapshot.schema == schema:
+        _open_snapshots[name] = snapshot
+        return snapshot.root()
+
+    data = parse(raw)
+    validate(data, name)
+    try:
+        write_snapshot(path, data, digest, schema)
+        snapshot = Snapshot(path)
+    except OSError:
+        return data
+    _open_snapshots[name] = snapshot
+    return snapshot.root()
+
+
+def data_files():
+    paths = glob.glob(os.path.join(DATA_DIR, '*.yml')) + glob.glob(os.path.join(DATA_DIR, '*.yaml'))
+    return ['_config.yml'] + sorted(os.path.relpath(path, REPO_ROOT).replace(os.sep, '/') for path in paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate the _data YAML files and refresh their snapshots')
+    parser.add_argument('--check', action='store_true', help='validate only, without reading or writing snapshots')
+    args = parser.parse_args()
+
+    failures = 0
+    for name in data_files():
+        with open(os.path.join(REPO_ROOT, name), 'rb') as f:
+            raw = f.read()
+        started = time.perf_counter()
+        data = parse(raw)
+        parsed = time.perf_counter() - started
+        try:
+            validate(data, name)
+        except SchemaError as e:
+            failures += 1
+            print(f"✗ {name}:")
+            for problem in e.problems:
+                print(f"    {problem}")
+            continue
+        note = '' if name in SCHEMAS else ' (no schema declared)'
+        if args.check:
+            print(f"✓ {name}{note}")
+            continue
+        write_snapshot(snapshot_path(name), data, hashlib.sha256(raw).digest(), schema_digest(name))
+        started = time.perf_counter()
+        snapshot = Snapshot(snapshot_path(name))
+        snapshot.materialize()
+        loaded = time.perf_counter() - started
+        print(f"✓ {name}{note}: YAML {parsed * 1000:.1f} ms → snapshot {loaded * 1000:.2f} ms "
+              f"({len(snapshot) if snapshot.is_mapping else 1} sections)")
+
+    if failures:
+        print(f"\n✗ {failures} data files do not match their schema")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
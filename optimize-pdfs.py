@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Post-build optimization for the published PDFs in assets/pdf
+
+Each PDF is rewritten with Ghostscript (duplicate image detection, font
+subsetting, images downsampled to a target DPI) and then
+with qpdf (object streams, recompressed flate streams, linearization for
+fast first-page display). The smallest linearized candidate wins; a file
+is never replaced by a larger one. Results are cached by input hash in
+.pdf-optimize-cache/, so rerunning over already optimized files, or over
+a freshly rebuilt PDF whose inputs did not change, costs one hash:
+
+    python3 optimize-pdfs.py                    # every PDF in assets/pdf
+    python3 optimize-pdfs.py assets/pdf/cv.pdf  # just the CV
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+PDF_DIR = os.path.join(REPO_ROOT, 'assets', 'pdf')
+CACHE_DIR = os.path.join(REPO_ROOT, '.pdf-optimize-cache')
+STATE_FILE = os.path.join(CACHE_DIR, 'state.json')
+DEFAULT_DPI = 150
+# Only downsample images more than this factor above the target DPI
+DOWNSAMPLE_THRESHOLD = 1.5
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def settings_key(dpi, use_ghostscript):
+    return f"dpi={dpi};gs={int(use_ghostscript)};threshold={DOWNSAMPLE_THRESHOLD}"
+
+
+def load_state():
+    try:
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'outputs': []}
+
+
+def save_state(state):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(STATE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def ghostscript_command(source, target, dpi):
+    command = [
+        'gs', '-sDEVICE=pdfwrite', '-dCompatibilityLevel=1.5',
+        '-dNOPAUSE', '-dBATCH', '-dQUIET', '-dSAFER',
+        '-dDetectDuplicateImages=true', '-dEmbedAllFonts=true',
+        '-dSubsetFonts=true', '-dCompressFonts=true',
+    ]
+    for kind in ('Color', 'Gray', 'Mono'):
+        resolution = dpi * 2 if kind == 'Mono' else dpi
+        command += [
+            f'-dDownsample{kind}Images=true',
+            f'-d{kind}ImageDownsampleType=/{"Subsample" if kind == "Mono" else "Bicubic"}',
+            f'-d{kind}ImageResolution={resolution}',
+            f'-d{kind}ImageDownsampleThreshold={DOWNSAMPLE_THRESHOLD}',
+        ]
+    return command + [f'-sOutputFile={target}', source]
+
+
+def qpdf_command(source, target):
+    return [
+        'qpdf', '--linearize', '--object-streams=generate', '--compress-streams=y',
+        '--recompress-flate', '--compression-level=9', source, target,
+    ]
+
+
+def run(command):
+    """Run a tool; qpdf exits 3 for warnings but still writes the output"""
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    if result.returncode not in (0, 3):
+        return result.stdout.decode('utf-8', errors='replace').strip().splitlines()[-1:] or ['failed']
+    return None
+
+
+def optimize(source, target, dpi, use_ghostscript):
+    """Write the smallest linearized rewrite of source to target; returns an error or None"""
+    with tempfile.TemporaryDirectory() as scratch:
+        candidates = []
+        plain = os.path.join(scratch, 'plain.pdf')
+        error = run(qpdf_command(source, plain))
+        if error:
+            return f"qpdf: {error[0]}"
+        candidates.append(plain)
+
+        if use_ghostscript:
+            rewritten = os.path.join(scratch, 'gs.pdf')
+            linearized = os.path.join(scratch, 'gs-linearized.pdf')
+            # A Ghostscript failure only loses the downsampled candidate
+            if not run(ghostscript_command(source, rewritten, dpi)) and os.path.exists(rewritten) \
+                    and not run(qpdf_command(rewritten, linearized)):
+                candidates.append(linearized)
+
+        best = min(candidates, key=os.path.getsize)
+        if os.path.getsize(best) >= os.path.getsize(source):
+            # Still linearize, but never grow the file
+            best = plain if os.path.getsize(plain) <= os.path.getsize(source) else source
+        shutil.copyfile(best, target)
+    return None
+
+
+class PdfJob:
+    """One published PDF and its cache entry"""
+
+    def __init__(self, path, input_hash, dpi, use_ghostscript):
+        self.path = path
+        self.name = os.path.relpath(path, REPO_ROOT)
+        self.dpi = dpi
+        self.use_ghostscript = use_ghostscript
+        self.before = os.path.getsize(path)
+        self.input_hash = input_hash
+        settings = settings_key(dpi, use_ghostscript)
+        self.key = hashlib.sha256(f"{self.input_hash}\0{settings}".encode('utf-8')).hexdigest()[:16]
+        self.cached = os.path.join(CACHE_DIR, self.key + '.pdf')
+
+    def run(self):
+        """Returns (status, error)"""
+        if not os.path.exists(self.cached):
+            error = optimize(self.path, self.cached + '.tmp', self.dpi, self.use_ghostscript)
+            if error:
+                return 'failed', error
+            os.replace(self.cached + '.tmp', self.cached)
+            status = 'optimized'
+        else:
+            status = 'cached'
+        shutil.copyfile(self.cached, self.path)
+        return status, None
+
+
+def collect(paths):
+    if paths:
+        return [os.path.abspath(path) for path in paths]
+    return sorted(glob.glob(os.path.join(PDF_DIR, '*.pdf')))
+
+
+def refresh(paths=None, dpi=DEFAULT_DPI, jobs=None, force=False):
+    """Optimize stale PDFs in parallel; returns [(name, before, after, status)]"""
+    use_ghostscript = shutil.which('gs') is not None
+    state = load_state()
+    settings = settings_key(dpi, use_ghostscript)
+    outputs = set(state['outputs'])
+
+    results, jobs_to_run = [], []
+    for path in collect(paths):
+        digest = file_hash(path)
+        if not force and f"{digest}:{settings}" in outputs:
+            # Already the optimized output for these settings
+            size = os.path.getsize(path)
+            results.append((os.path.relpath(path, REPO_ROOT), size, size, 'up to date'))
+            continue
+        jobs_to_run.append(PdfJob(path, digest, dpi, use_ghostscript))
+
+    if force:
+        for job in jobs_to_run:
+            if os.path.exists(job.cached):
+                os.remove(job.cached)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as executor:
+        for job, (status, error) in zip(jobs_to_run, executor.map(PdfJob.run, jobs_to_run)):
+            if error:
+                results.append((job.name, job.before, job.before, f"failed: {error}"))
+                continue
+            outputs.add(f"{file_hash(job.path)}:{settings}")
+            results.append((job.name, job.before, os.path.getsize(job.path), status))
+
+    state['outputs'] = sorted(outputs)
+    save_state(state)
+    return sorted(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Linearize and recompress the published PDFs')
+    parser.add_argument('pdfs', nargs='*', metavar='PDF', help='PDFs to optimize (default: assets/pdf/*.pdf)')
+    parser.add_argument('--dpi', type=int, default=DEFAULT_DPI, help='target image resolution (default: 150)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='PDFs to process in parallel')
+    parser.add_argument('--force', action='store_true', help='ignore cached results')
+    args = parser.parse_args()
+
+    missing = [path for path in args.pdfs if not os.path.isfile(path)]
+    if missing:
+        parser.error(f"no such file(s): {', '.join(missing)}")
+    if shutil.which('qpdf') is None:
+        print("qpdf not found. Please install qpdf (and Ghostscript for image downsampling).")
+        sys.exit(1)
+    if shutil.which('gs') is None:
+        print("Ghostscript not found; only linearizing and recompressing streams.")
+
+    results = refresh(args.pdfs, args.dpi, max(1, args.jobs), args.force)
+    total_before = total_after = 0
+    for name, before, after, status in results:
+        total_before += before
+        total_after += after
+        mark = '✗' if status.startswith('failed') else '✓'
+        saved = (before - after) / before * 100 if before else 0.0
+        print(f"{mark} {name}: {status}, {before / 1024:.1f} KB → {after / 1024:.1f} KB ({saved:.1f}% saved)")
+    print(f"\nSaved {(total_before - total_after) / 1024:.1f} KB of {total_before / 1024:.1f} KB")
+    sys.exit(1 if any(result[3].startswith('failed') for result in results) else 0)
+
+if __name__ == '__main__':
+    main()
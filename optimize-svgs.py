@@ -0,0 +1,579 @@
+#!/usr/bin/env python3
+"""
+Minify the project diagrams in _diagrams/ into assets/images/projects
+
+_diagrams/ holds the editable diagrams. Each one is written to
+assets/images/projects/ under the same name without comments, editor
+namespaces (Inkscape, Sodipodi, Illustrator, Sketch, Figma), <metadata>,
+unused ids or formatting whitespace. Coordinates and path data are
+rounded to --precision decimals. Identical <defs> entries are merged and
+their references rewritten, and <style> blocks are compacted. Results
+are cached by source hash in .svg-optimize-cache/, so a diagram whose
+source and output are unchanged costs two hashes:
+
+    python3 optimize-svgs.py                     # every SVG in _diagrams/
+    python3 optimize-svgs.py --precision 1 _diagrams/ctxhelm-*.svg
+    python3 optimize-svgs.py --check             # exit 1 if an output is stale
+
+--sprite combines the diagrams a page embeds into one file under
+assets/images/projects/sprites/. Each diagram becomes a <view> named
+after its file, and the shared markers, gradients, filters and style
+rules are stored once across all the diagrams. The page then makes one
+request instead of one per diagram (--rewrite points its <img> tags at
+the views):
+
+    python3 optimize-svgs.py --sprite _showcase/projects/ctxhelm.md
+    <img src="/assets/images/projects/sprites/ctxhelm.svg#ctxhelm-eval-loop" ...>
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(REPO_ROOT, '_diagrams')
+SVG_DIR = os.path.join(REPO_ROOT, 'assets', 'images', 'projects')
+SPRITE_DIR = os.path.join(SVG_DIR, 'sprites')
+CACHE_DIR = os.path.join(REPO_ROOT, '.svg-optimize-cache')
+STATE_FILE = os.path.join(CACHE_DIR, 'state.json')
+DEFAULT_PRECISION = 2
+OPTIMIZER_VERSION = 1
+
+SVG_NS = 'http://www.w3.org/2000/svg'
+XLINK_NS = 'http://www.w3.org/1999/xlink'
+XML_NS = 'http://www.w3.org/XML/1998/namespace'
+# Rounded as numbers; units and percentages are kept
+NUMERIC_ATTRS = frozenset('''
+    x y x1 y1 x2 y2 cx cy r rx ry fx fy width height dx dy stdDeviation offset
+    refX refY markerWidth markerHeight stroke-width stroke-dashoffset stroke-dasharray
+    font-size opacity fill-opacity stroke-opacity flood-opacity stop-opacity
+    points viewBox transform gradientTransform patternTransform
+'''.split())
+TEXT_ELEMENTS = frozenset(('text', 'tspan', 'textPath', 'title', 'desc', 'style'))
+DROPPED_ELEMENTS = frozenset(('metadata',))
+DROPPED_ATTRS = frozenset(('version', 'data-name', 'enable-background', 'baseProfile'))
+# Root attributes that belong to the standalone document, not the drawing
+ROOT_ONLY_ATTRS = frozenset(('xmlns', 'width', 'height', 'viewBox', 'role', 'aria-labelledby',
+                             'aria-describedby', 'aria-label', 'id', 'preserveAspectRatio'))
+REFERENCE_ATTRS = ('aria-labelledby', 'aria-describedby')
+COLOR_ATTRS = frozenset(('fill', 'stroke', 'color', 'stop-color', 'flood-color', 'lighting-color'))
+
+NUMBER_RE = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+PATH_TOKEN_RE = re.compile(r'[MmZzLlHhVvCcSsQqTtAa]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+URL_REF_RE = re.compile(r'url\(\s*[\'"]?#([^\'")\s]+)[\'"]?\s*\)')
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+CSS_RULE_RE = re.compile(r'([^{}]+)\{([^{}]*)\}')
+SIMPLE_CLASS_RE = re.compile(r'^\.([\w-]+)$')
+LONG_HEX_RE = re.compile(r'#([0-9a-fA-F])\1([0-9a-fA-F])\2([0-9a-fA-F])\3\b')
+IMG_SVG_RE = re.compile(r'(<img\b[^>]*\bsrc=")(/assets/images/projects/([\w.-]+)\.svg)(")')
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def text_hash(text, length=6):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:length]
+
+
+def load_state():
+    try:
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'outputs': [], 'sprites': {}}
+
+
+def save_state(state):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(STATE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def settings_key(precision):
+    return f"precision={precision};v={OPTIMIZER_VERSION}"
+
+
+# --- Numbers and path data ----------------------------------------------
+
+def format_number(value, precision):
+    text = f"{round(float(value), precision):.{precision}f}".rstrip('0').rstrip('.') if precision else \
+        str(int(round(float(value))))
+    if text in ('-0', ''):
+        text = '0'
+    if text.startswith('0.'):
+        text = text[1:]
+    elif text.startswith('-0.'):
+        text = '-' + text[2:]
+    return text
+
+
+def join_numbers(numbers):
+    """Numbers with the fewest separators: a sign or a second decimal point starts a new number"""
+    out, previous = '', ''
+    for number in numbers:
+        continues = number.startswith('-') or (number.startswith('.') and '.' in previous)
+        if out and not continues:
+            out += ' '
+        out += number
+        previous = number
+    return out
+
+
+def round_numbers(value, precision):
+    return NUMBER_RE.sub(lambda match: format_number(match.group(0), precision), value)
+
+
+def minify_path(data, precision):
+    """Round path coordinates and drop redundant separators"""
+    out, numbers = [], []
+    for token in PATH_TOKEN_RE.findall(data):
+        if token.isalpha():
+            if numbers:
+                out.append(join_numbers(numbers))
+                numbers = []
+            out.append(token)
+        else:
+            numbers.append(format_number(token, precision))
+    if numbers:
+        out.append(join_numbers(numbers))
+    return ''.join(out)
+
+
+def short_colors(value):
+    return LONG_HEX_RE.sub(lambda match: '#' + ''.join(match.groups()).lower(), value)
+
+
+def minify_css(text):
+    parts = []
+    for index, piece in enumerate(re.split(r'("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')', CSS_COMMENT_RE.sub('', text))):
+        if index % 2 == 0:
+            piece = re.sub(r'\s+', ' ', piece)
+            piece = short_colors(re.sub(r'\s*([{};,:])\s*', r'\1', piece))
+        parts.append(piece)
+    return ''.join(parts).strip().replace(';}', '}')
+
+
+# --- Tree ---------------------------------------------------------------
+
+def local_name(name):
+    """Attribute or tag name without the SVG namespace; None for editor namespaces"""
+    if not name.startswith('{'):
+        return name
+    namespace, _, local = name[1:].partition('}')
+    if namespace == SVG_NS:
+        return local
+    if namespace == XLINK_NS:
+        # SVG 2 href works in every browser that renders these diagrams
+        return local if local == 'href' else None
+    if namespace == XML_NS:
+        return 'xml:' + local
+    return None
+
+
+def parse_svg(text):
+    root = ET.fromstring(text)
+    if local_name(root.tag) != 'svg':
+        raise ValueError('not an SVG document')
+    return root
+
+
+def clean(element, precision, preserve=False):
+    """Drop editor metadata and round numbers in place"""
+    for name in list(element.attrib):
+        value = element.attrib.pop(name)
+        local = local_name(name)
+        if local is None or local in DROPPED_ATTRS or (local == 'style' and not value.strip()):
+            continue
+        if local == 'd':
+            value = minify_path(value, precision)
+        elif local in NUMERIC_ATTRS:
+            value = ' '.join(round_numbers(value, precision).replace(',', ' ').split())
+        elif local in COLOR_ATTRS:
+            value = short_colors(value.strip())
+        element.set(local, value)
+    element.tag = local_name(element.tag) or element.tag
+    preserve = preserve or element.get('xml:space') == 'preserve'
+    for child in list(element):
+        if not isinstance(child.tag, str) or local_name(child.tag) in (None,) + tuple(DROPPED_ELEMENTS):
+            element.remove(child)
+            continue
+        clean(child, precision, preserve)
+    if element.tag == 'style' and element.text:
+        element.text = minify_css(element.text)
+    elif not preserve:
+        # Formatting whitespace only matters inside text content, where runs collapse to one space
+        inline = element.tag in TEXT_ELEMENTS
+        if element.text is not None:
+            element.text = re.sub(r'\s+', ' ', element.text)
+            if not inline or not len(element):
+                element.text = element.text.strip()
+        for child in element:
+            if child.tail is not None:
+                child.tail = re.sub(r'\s+', ' ', child.tail) if inline else None
+
+
+def references(root):
+    """Ids used by url(#), href="#", aria-labelledby/describedby or <style>"""
+    used = set()
+    for element in root.iter():
+        for name, value in element.attrib.items():
+            used.update(URL_REF_RE.findall(value))
+            if name == 'href' and value.startswith('#'):
+                used.add(value[1:])
+            if name in REFERENCE_ATTRS:
+                used.update(value.split())
+        if element.tag == 'style' and element.text:
+            used.update(URL_REF_RE.findall(element.text))
+    return used
+
+
+def rename_references(root, mapping):
+    """Rewrite ids and every reference to them"""
+    if not mapping:
+        return
+
+    def url(match):
+        return f"url(#{mapping.get(match.group(1), match.group(1))})"
+
+    for element in root.iter():
+        for name, value in list(element.attrib.items()):
+            if name == 'id':
+                value = mapping.get(value, value)
+            elif name == 'href' and value.startswith('#'):
+                value = '#' + mapping.get(value[1:], value[1:])
+            elif name in REFERENCE_ATTRS:
+                value = ' '.join(mapping.get(token, token) for token in value.split())
+            elif 'url(' in value:
+                value = URL_REF_RE.sub(url, value)
+            element.set(name, value)
+        if element.tag == 'style' and element.text:
+            element.text = URL_REF_RE.sub(url, element.text)
+
+
+def definition_key(element):
+    """Serialized definition without its id, for spotting duplicates"""
+    copy = ET.Element(element.tag, {k: v for k, v in element.attrib.items() if k != 'id'})
+    copy.extend(list(element))
+    copy.text = element.text
+    return serialize(copy)
+
+
+def dedupe_defs(root):
+    """Merge identical <defs> entries, keeping the first id"""
+    seen, mapping = {}, {}
+    for defs in root.iter('defs'):
+        for child in list(defs):
+            if child.tag == 'style' or 'id' not in child.attrib:
+                continue
+            key = definition_key(child)
+            if key in seen:
+                mapping[child.get('id')] = seen[key]
+                defs.remove(child)
+            else:
+                seen[key] = child.get('id')
+    rename_references(root, mapping)
+
+
+def prune(root):
+    """Remove unreferenced ids, empty <defs> and attribute-less groups"""
+    used = references(root)
+    for element in root.iter():
+        if element.get('id') and element.get('id') not in used and element.tag not in ('marker', 'view', 'symbol'):
+            del element.attrib['id']
+    for parent in list(root.iter()):
+        for index, child in reversed(list(enumerate(parent))):
+            if child.tag == 'defs' and not len(child):
+                parent.remove(child)
+            elif child.tag == 'g' and not child.attrib and parent.tag != 'text':
+                # Unwrap: the group carries nothing its children need
+                parent.remove(child)
+                for offset, grandchild in enumerate(list(child)):
+                    parent.insert(index + offset, grandchild)
+
+
+def escape(text, attribute=False):
+    text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    return text.replace('"', '&quot;') if attribute else text
+
+
+def serialize(element, root=False):
+    attrs = dict(element.attrib)
+    if root:
+        attrs = dict([('xmlns', SVG_NS)] + [(k, v) for k, v in attrs.items() if k != 'xmlns'])
+    out = ['<', element.tag]
+    for name, value in attrs.items():
+        out.append(f' {name}="{escape(value, attribute=True)}"')
+    if not len(element) and not element.text:
+        out.append('/>')
+    else:
+        out.append('>')
+        if element.text:
+            out.append(element.text if element.tag == 'style' else escape(element.text))
+        for child in element:
+            out.append(serialize(child))
+            if child.tail:
+                out.append(escape(child.tail))
+        out.append(f"</{element.tag}>")
+    return ''.join(out)
+
+
+def optimize_text(text, precision=DEFAULT_PRECISION):
+    root = parse_svg(text)
+    clean(root, precision)
+    dedupe_defs(root)
+    prune(root)
+    return serialize(root, root=True) + '\n'
+
+
+# --- Files --------------------------------------------------------------
+
+def collect(paths):
+    if paths:
+        return [os.path.abspath(path) for path in paths]
+    return sorted(glob.glob(os.path.join(SOURCE_DIR, '*.svg')))
+
+
+def output_path(source):
+    return os.path.join(SVG_DIR, os.path.basename(source))
+
+
+def refresh(paths=None, precision=DEFAULT_PRECISION, force=False, check=False):
+    """Optimize stale sources into SVG_DIR; returns [(name, before, after, status)]
+
+    An output is current when the state records it for the source hash and
+    settings. With check=True stale outputs are reported, not written.
+    """
+    state = load_state()
+    settings = settings_key(precision)
+    outputs = set(state.get('outputs', []))
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    results = []
+    for path in collect(paths):
+        name = os.path.relpath(path, REPO_ROOT)
+        target = output_path(path)
+        before = os.path.getsize(path)
+        digest = file_hash(path)
+        written = file_hash(target) if os.path.exists(target) else None
+        if not force and f"{digest}:{settings}:{written}" in outputs:
+            results.append((name, before, os.path.getsize(target), 'up to date'))
+            continue
+        key = hashlib.sha256(f"{digest}\0{settings}".encode('utf-8')).hexdigest()[:16]
+        cached = os.path.join(CACHE_DIR, key + '.svg')
+        if force or not os.path.exists(cached):
+            with open(path, encoding='utf-8') as f:
+                source = f.read()
+            try:
+                optimized = optimize_text(source, precision)
+            except (ET.ParseError, ValueError) as error:
+                results.append((name, before, before, f"failed: {error}"))
+                continue
+            # Never grow a file
+            if len(optimized.encode('utf-8')) >= before:
+                optimized = source
+            with open(cached, 'w', encoding='utf-8') as f:
+                f.write(optimized)
+            status = 'optimized'
+        else:
+            status = 'cached'
+        with open(cached, encoding='utf-8') as f:
+            optimized = f.read()
+        if check:
+            if written != hashlib.sha256(optimized.encode('utf-8')).hexdigest():
+                results.append((name, before, len(optimized.encode('utf-8')),
+                                f"failed: {os.path.relpath(target, REPO_ROOT)} is stale"))
+                continue
+        else:
+            with open(target, 'w', encoding='utf-8') as f:
+                f.write(optimized)
+        outputs.add(f"{digest}:{settings}:{file_hash(target)}")
+        results.append((name, before, os.path.getsize(target), 'up to date' if check else status))
+    state['outputs'] = sorted(outputs)
+    save_state(state)
+    return sorted(results)
+
+
+# --- Sprites ------------------------------------------------------------
+
+def view_box(root):
+    if root.get('viewBox'):
+        return [float(part) for part in root.get('viewBox').replace(',', ' ').split()]
+    return [0.0, 0.0, float(root.get('width', '300').rstrip('px')), float(root.get('height', '150').rstrip('px'))]
+
+
+def shared_styles(root, prefix, rules):
+    """Move simple class rules into `rules` under content-derived names; returns the class mapping"""
+    mapping = {}
+    for style in [child for defs in root.iter('defs') for child in defs if child.tag == 'style'] + \
+            [child for child in root if child.tag == 'style']:
+        for selector, body in CSS_RULE_RE.findall(style.text or ''):
+            match = SIMPLE_CLASS_RE.match(selector.strip())
+            if not match:
+                raise ValueError(f"{prefix}: only single-class style rules can be shared, found {selector.strip()!r}")
+            name = 'c' + text_hash(body, 5)
+            rules[name] = body
+            mapping[match.group(1)] = name
+        style.text = None
+    for element in root.iter():
+        if element.get('class'):
+            element.set('class', ' '.join(mapping.get(name, name) for name in element.get('class').split()))
+    return mapping
+
+
+def build_sprite(members):
+    """One SVG holding every (name, optimized text) member as a <view> stacked vertically"""
+    definitions, rules, bodies = {}, {}, []
+    width = offset = 0.0
+    for name, text in members:
+        root = parse_svg(text)
+        for element in root.iter():
+            element.tag = local_name(element.tag) or element.tag
+        # Definitions are named by content so identical markers and gradients are shared
+        mapping = {}
+        for defs in [child for child in root if child.tag == 'defs']:
+            for child in defs:
+                if child.tag != 'style' and child.get('id'):
+                    mapping[child.get('id')] = 'd' + text_hash(definition_key(child))
+        for element in root.iter():
+            element_id = element.get('id')
+            if element_id and element_id not in mapping:
+                mapping[element_id] = f"{name}-{element_id}"
+        rename_references(root, mapping)
+        shared_styles(root, name, rules)
+        for defs in [child for child in root if child.tag == 'defs']:
+            for child in defs:
+                if child.tag != 'style':
+                    definitions.setdefault(child.get('id'), child)
+            root.remove(defs)
+        for style in [child for child in root if child.tag == 'style']:
+            root.remove(style)
+        x, y, w, h = view_box(root)
+        nested = ET.Element('svg', {'y': format_number(offset, 2), 'width': format_number(w, 2),
+                                    'height': format_number(h, 2),
+                                    'viewBox': ' '.join(format_number(v, 2) for v in (x, y, w, h))})
+        for attr, value in root.attrib.items():
+            if attr not in ROOT_ONLY_ATTRS:
+                nested.set(attr, value)
+        nested.extend(list(root))
+        view = ET.Element('view', {'id': name, 'viewBox': ' '.join(format_number(v, 2) for v in (0, offset, w, h))})
+        bodies.extend([view, nested])
+        width = max(width, w)
+        offset += h
+
+    sprite = ET.Element('svg', {'viewBox': f"0 0 {format_number(width, 2)} {format_number(offset, 2)}"})
+    defs = ET.SubElement(sprite, 'defs')
+    if rules:
+        style = ET.SubElement(defs, 'style')
+        # First-seen order keeps each diagram's cascade
+        style.text = ''.join(f".{name}{{{body}}}" for name, body in rules.items())
+    for key in sorted(definitions):
+        defs.append(definitions[key])
+    if not len(defs):
+        sprite.remove(defs)
+    sprite.extend(bodies)
+    return serialize(sprite, root=True) + '\n'
+
+
+def page_diagrams(page):
+    with open(page, encoding='utf-8') as f:
+        text = f.read()
+    names = []
+    for match in IMG_SVG_RE.finditer(text):
+        if match.group(3) not in names:
+            names.append(match.group(3))
+    return text, names
+
+
+def sprite_page(page, precision=DEFAULT_PRECISION, rewrite=False, force=False):
+    """Build the sprite for one page; returns (sprite path, [(name, bytes)], status)"""
+    text, names = page_diagrams(page)
+    if len(names) < 2:
+        return None, [], 'fewer than two diagrams'
+    members = []
+    for name in names:
+        path = os.path.join(SOURCE_DIR, name + '.svg')
+        with open(path, encoding='utf-8') as f:
+            members.append((name, optimize_text(f.read(), precision)))
+    slug = os.path.splitext(os.path.basename(page))[0]
+    target = os.path.join(SPRITE_DIR, slug + '.svg')
+    key = text_hash(''.join(member for _, member in members) + settings_key(precision), 16)
+    state = load_state()
+    status = 'up to date'
+    if force or state.get('sprites', {}).get(slug) != key or not os.path.exists(target):
+        os.makedirs(SPRITE_DIR, exist_ok=True)
+        with open(target, 'w', encoding='utf-8') as f:
+            f.write(build_sprite(members))
+        state.setdefault('sprites', {})[slug] = key
+        save_state(state)
+        status = 'built'
+    if rewrite:
+        url = '/' + os.path.relpath(target, REPO_ROOT).replace(os.sep, '/')
+        updated = IMG_SVG_RE.sub(lambda m: f"{m.group(1)}{url}#{m.group(3)}{m.group(4)}", text)
+        if updated != text:
+            with open(page, 'w', encoding='utf-8') as f:
+                f.write(updated)
+            status += ', page rewritten'
+    sizes = [(name, len(member.encode('utf-8'))) for name, member in members]
+    return target, sizes, status
+
+
+def report(name, before, after, status):
+    mark = '✗' if status.startswith('failed') else '✓'
+    saved = (before - after) / before * 100 if before else 0.0
+    print(f"{mark} {name}: {status}, {before / 1024:.1f} KB → {after / 1024:.1f} KB ({saved:.1f}% saved)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Minify the project SVG diagrams and build per-page sprites')
+    parser.add_argument('svgs', nargs='*', metavar='SVG', help='source SVGs to optimize (default: _diagrams/*.svg)')
+    parser.add_argument('--precision', type=int, default=DEFAULT_PRECISION,
+                        help='decimal places kept in coordinates (default: 2)')
+    parser.add_argument('--sprite', action='append', default=[], metavar='PAGE',
+                        help='combine the diagrams embedded by a Markdown page into one sprite')
+    parser.add_argument('--rewrite', action='store_true', help='point the sprite page <img> tags at the sprite views')
+    parser.add_argument('--force', action='store_true', help='ignore cached results')
+    parser.add_argument('--check', action='store_true',
+                        help='exit 1 if an output is stale instead of writing it')
+    args = parser.parse_args()
+
+    missing = [path for path in args.svgs + args.sprite if not os.path.isfile(path)]
+    if missing:
+        parser.error(f"no such file(s): {', '.join(missing)}")
+
+    failed = False
+    if args.svgs or not args.sprite:
+        results = refresh(args.svgs, args.precision, args.force, args.check)
+        total_before = total_after = 0
+        for name, before, after, status in results:
+            total_before += before
+            total_after += after
+            report(name, before, after, status)
+        failed = any(result[3].startswith('failed') for result in results)
+        print(f"\nSaved {(total_before - total_after) / 1024:.1f} KB of {total_before / 1024:.1f} KB")
+
+    for page in args.sprite:
+        try:
+            target, sizes, status = sprite_page(page, args.precision, args.rewrite, args.force)
+        except (ET.ParseError, ValueError) as error:
+            print(f"✗ {page}: {error}")
+            failed = True
+            continue
+        if target is None:
+            print(f"✓ {page}: {status}, no sprite needed")
+            continue
+        before = sum(size for _, size in sizes)
+        report(os.path.relpath(target, REPO_ROOT), before, os.path.getsize(target),
+               f"{status}, {len(sizes)} diagrams in 1 request")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
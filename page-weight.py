@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+"""
+Per-page transfer weight and request budgets for the built site
+
+Walks every HTML page in _site, resolves what a browser would request
+for it (stylesheets and their @import/font chains, scripts, the favicon,
+preloads, the img/srcset or <picture> candidate a 390px DPR-1 phone
+picks, posters and inline-style images) and adds up transfer weight and
+request count per resource type. Text assets are weighed gzipped, as
+GitHub Pages serves them; everything else at its file size. Lazy images
+are listed separately from the initial weight, and linked PDFs are shown
+but never counted. Nothing is fetched: third-party URLs only count as
+requests.
+
+Each asset is weighed once per run, and the sizes are kept in
+.page-weight-cache.json keyed by mtime and size, so rerunning after a
+small rebuild only recompresses what changed. Budgets use the Lighthouse
+budget.json format (sizes in KB, the last matching path wins):
+
+    bundle exec jekyll build && python3 page-weight.py
+    python3 page-weight.py --sort image --top 5  # heaviest pages by images
+    python3 page-weight.py --assets 20           # heaviest assets and their pages
+    python3 page-weight.py --json                # full report for other tools
+"""
+import argparse
+import gzip
+import json
+import os
+import posixpath
+import re
+import sys
+from html.parser import HTMLParser
+from urllib.parse import unquote, urlsplit
+
+from script_loader import load_script
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+SITE_DIR = os.path.join(REPO_ROOT, '_site')
+BUDGET_FILE = os.path.join(REPO_ROOT, 'budget.json')
+CACHE_FILE = os.path.join(REPO_ROOT, '.page-weight-cache.json')
+CACHE_VERSION = 1
+
+# The Lighthouse mobile profile used by tests/quality-gates.spec.js
+VIEWPORT_WIDTH = 390
+DEVICE_PIXEL_RATIO = 1
+
+RESOURCE_TYPES = ('document', 'stylesheet', 'script', 'image', 'font', 'media', 'other')
+COLUMNS = ('requests', 'total') + RESOURCE_TYPES + ('third-party', 'lazy', 'linked')
+COMPRESSIBLE = {'.html', '.css', '.js', '.mjs', '.json', '.svg', '.xml', '.txt', '.ico', '.webmanifest'}
+SUPPORTED_IMAGE_TYPES = {'image/avif', 'image/webp', 'image/png', 'image/jpeg', 'image/gif', 'image/svg+xml'}
+FONT_FORMATS = ('woff2', 'woff', 'truetype', 'opentype')
+PRELOAD_TYPES = {'style': 'stylesheet', 'script': 'script', 'image': 'image', 'font': 'font',
+                 'fetch': 'other', 'video': 'media', 'audio': 'media'}
+
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+CSS_IMPORT_RE = re.compile(r'@import\s+(?:url\(\s*)?([\'"]?)([^\'")\s;]+)\1\s*\)?')
+CSS_FONT_FACE_RE = re.compile(r'@font-face\s*{([^}]*)}', re.I)
+CSS_URL_RE = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)(?:\s*format\(\s*[\'"]?([\w-]+))?')
+MEDIA_FEATURE_RE = re.compile(r'\(\s*(min|max)-width\s*:\s*([\d.]+)(px|em|rem)\s*\)')
+LENGTH_RE = re.compile(r'^([\d.]+)(px|vw|em|rem)$')
+
+
+data_loader = load_script('load-data.py')
+
+
+def format_kb(size):
+    return f"{size / 1024:.1f}"
+
+
+def load_site_config():
+    config = data_loader.load('_config.yml') or {}
+    return (config.get('url') or '').rstrip('/'), (config.get('baseurl') or '').rstrip('/')
+
+
+class AssetWeights:
+    """Transfer sizes per file, memoized in-process and across runs"""
+
+    def __init__(self, site_dir, cache_path=CACHE_FILE):
+        self.site_dir = site_dir
+        self.cache_path = cache_path
+        self.memo = {}
+        self.stored = {}
+        self.dirty = False
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, encoding='utf-8') as f:
+                    cache = json.load(f)
+                if cache.get('version') == CACHE_VERSION:
+                    self.stored = cache.get('assets', {})
+            except (OSError, ValueError):
+                self.stored = {}
+
+    def transfer(self, path):
+        if path in self.memo:
+            return self.memo[path]
+        stat = os.stat(path)
+        key = os.path.relpath(path, self.site_dir)
+        entry = self.stored.get(key)
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            size = entry[2]
+        else:
+            size = stat.st_size
+            if os.path.splitext(path)[1].lower() in COMPRESSIBLE:
+                with open(path, 'rb') as f:
+                    size = min(size, len(gzip.compress(f.read(), compresslevel=6, mtime=0)))
+            self.stored[key] = [stat.st_mtime_ns, stat.st_size, size]
+            self.dirty = True
+        self.memo[path] = size
+        return size
+
+    def save(self):
+        if not self.cache_path or not self.dirty:
+            return
+        live = {key: value for key, value in self.stored.items()
+                if os.path.exists(os.path.join(self.site_dir, key))}
+        with open(self.cache_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'assets': live}, f, sort_keys=True)
+
+
+def media_matches(query, viewport):
+    """Evaluate the width features of a media condition; anything else is assumed to match"""
+    query = query.strip().lower()
+    if not query or query == 'all' or query == 'screen':
+        return True
+    if query.startswith('print'):
+        return False
+    for kind, value, unit in MEDIA_FEATURE_RE.findall(query):
+        width = float(value) * (16 if unit in ('em', 'rem') else 1)
+        if (kind == 'min' and viewport < width) or (kind == 'max' and viewport > width):
+            return False
+    return True
+
+
+def slot_width(sizes, viewport):
+    """CSS pixel width of the image slot described by a sizes attribute"""
+    for entry in (sizes or '').split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        if 'calc(' in entry:
+            condition, length = entry[:entry.index('calc(')], ''
+        else:
+            condition, _, length = entry.rpartition(' ')
+        if condition and not media_matches(condition, viewport):
+            continue
+        match = LENGTH_RE.match(length.strip())
+        if not match:
+            return viewport
+        value, unit = float(match.group(1)), match.group(2)
+        if unit == 'vw':
+            return viewport * value / 100
+        return value * (16 if unit in ('em', 'rem') else 1)
+    return viewport
+
+
+def pick_candidate(srcset, sizes, viewport, dpr):
+    """The srcset URL a browser would fetch at this viewport and pixel ratio"""
+    candidates = []
+    for item in (srcset or '').split(','):
+        parts = item.strip().split()
+        if not parts:
+            continue
+        descriptor = parts[1] if len(parts) > 1 else '1x'
+        try:
+            if descriptor.endswith('w'):
+                density = float(descriptor[:-1]) / slot_width(sizes, viewport)
+            else:
+                density = float(descriptor.rstrip('x'))
+        except ValueError:
+            continue
+        candidates.append((density, parts[0]))
+    if not candidates:
+        return None
+    candidates.sort()
+    for density, url in candidates:
+        if density >= dpr:
+            return url
+    return candidates[-1][1]
+
+
+class PageParser(HTMLParser):
+    """Collects (url, type, lazy) requests, inline CSS and linked PDFs from one page"""
+
+    def __init__(self, viewport, dpr):
+        super().__init__(convert_charrefs=True)
+        self.viewport = viewport
+        self.dpr = dpr
+        self.requests = []
+        self.styles = []
+        self.linked = []
+        self.icon = None
+        self.picture = None
+        self.in_style = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value or '' for name, value in attrs}
+        lazy = attrs.get('loading', '').lower() == 'lazy'
+        if tag == 'link':
+            rel = attrs.get('rel', '').lower().split()
+            href = attrs.get('href')
+            if not href:
+                return
+            if 'stylesheet' in rel and media_matches(attrs.get('media', ''), self.viewport):
+                self.requests.append((href, 'stylesheet', False))
+            elif 'preload' in rel:
+                self.requests.append((href, PRELOAD_TYPES.get(attrs.get('as', ''), 'other'), False))
+            elif 'modulepreload' in rel:
+                self.requests.append((href, 'script', False))
+            elif 'icon' in rel and 'apple-touch-icon' not in rel and self.icon is None:
+                self.icon = href
+        elif tag == 'script' and attrs.get('src'):
+            self.requests.append((attrs['src'], 'script', False))
+        elif tag == 'picture':
+            self.picture = []
+        elif tag == 'source' and self.picture is not None:
+            source_type = attrs.get('type', '').lower()
+            if (not source_type or source_type in SUPPORTED_IMAGE_TYPES) and media_matches(attrs.get('media', ''), self.viewport):
+                self.picture.append(attrs)
+        elif tag == 'img':
+            # The first usable <source> wins over the <img> inside a <picture>
+            source = self.picture[0] if self.picture else attrs
+            url = pick_candidate(source.get('srcset'), source.get('sizes'), self.viewport, self.dpr)
+            url = url or attrs.get('src')
+            if url and not url.startswith('data:'):
+                self.requests.append((url, 'image', lazy))
+        elif tag == 'video':
+            if attrs.get('poster'):
+                self.requests.append((attrs['poster'], 'image', False))
+            if attrs.get('src') and attrs.get('preload', 'auto') != 'none':
+                self.requests.append((attrs['src'], 'media', False))
+        elif tag == 'iframe' and attrs.get('src'):
+            self.requests.append((attrs['src'], 'document', lazy))
+        elif tag == 'style':
+            self.in_style = True
+        elif tag == 'a' and urlsplit(attrs.get('href', '')).path.lower().endswith('.pdf'):
+            self.linked.append(attrs['href'])
+        if 'style' in attrs and 'url(' in attrs['style']:
+            self.styles.append(attrs['style'])
+
+    def handle_endtag(self, tag):
+        if tag == 'picture':
+            self.picture = None
+        elif tag == 'style':
+            self.in_style = False
+
+    def handle_data(self, data):
+        if self.in_style:
+            self.styles.append(data)
+
+
+class SiteAnalyzer:
+    def __init__(self, site_dir, weights, site_url='', baseurl='', viewport=VIEWPORT_WIDTH, dpr=DEVICE_PIXEL_RATIO):
+        self.site_dir = site_dir
+        self.weights = weights
+        self.host = urlsplit(site_url).netloc
+        self.baseurl = baseurl
+        self.viewport = viewport
+        self.dpr = dpr
+        self.css_requests = {}
+
+    def resolve(self, url, base):
+        """Map a URL referenced from `base` (a site path) to a file in the site, or None if third-party"""
+        parts = urlsplit(url)
+        if parts.scheme in ('data', 'blob', 'mailto', 'tel', 'javascript'):
+            return ''
+        if parts.scheme or parts.netloc:
+            if parts.netloc != self.host:
+                return None
+        path = unquote(parts.path)
+        if not path:
+            return ''
+        if not path.startswith('/'):
+            path = posixpath.join(posixpath.dirname(base), path)
+        path = posixpath.normpath(path)
+        if self.baseurl and (path == self.baseurl or path.startswith(self.baseurl + '/')):
+            path = path[len(self.baseurl):] or '/'
+        target = os.path.join(self.site_dir, path.lstrip('/'))
+        if os.path.isdir(target):
+            target = os.path.join(target, 'index.html')
+        return target
+
+    def site_path(self, target):
+        return '/' + os.path.relpath(target, self.site_dir).replace(os.sep, '/')
+
+    def css_references(self, text):
+        """@import and font URLs a stylesheet pulls in, one supported source per @font-face"""
+        text = CSS_COMMENT_RE.sub('', text)
+        found = [(url, 'stylesheet') for _, url in CSS_IMPORT_RE.findall(text)]
+        for block in CSS_FONT_FACE_RE.findall(text):
+            sources = [(url, fmt) for _, url, fmt in CSS_URL_RE.findall(block)]
+            usable = [url for url, fmt in sources if not fmt or fmt.lower() in FONT_FORMATS]
+            if usable:
+                found.append((usable[0], 'font'))
+        # Background images in rules are only fetched when a rule matches, so they are
+        # counted as an upper bound
+        outside = CSS_FONT_FACE_RE.sub('', CSS_IMPORT_RE.sub('', text))
+        found.extend((url, 'image') for _, url, _ in CSS_URL_RE.findall(outside) if not url.startswith('data:'))
+        return found
+
+    def stylesheet_requests(self, target, seen=()):
+        """Every request a stylesheet file triggers, memoized per file"""
+        if target in self.css_requests:
+            return self.css_requests[target]
+        with open(target, encoding='utf-8', errors='replace') as f:
+            text = f.read()
+        requests = self.expand(self.css_references(text), self.site_path(target), seen + (target,))
+        self.css_requests[target] = requests
+        return requests
+
+    def expand(self, references, base, seen=()):
+        """(url, type) pairs -> [(key, type, target)] including nested stylesheet requests"""
+        requests = []
+        for url, kind in references:
+            target = self.resolve(url, base)
+            if target == '':
+                continue
+            if target is None:
+                requests.append((url, kind, None))
+                continue
+            requests.append((target, kind, target))
+            if kind == 'stylesheet' and os.path.isfile(target) and target not in seen:
+                requests.extend(self.stylesheet_requests(target, seen))
+        return requests
+
+    def analyze_page(self, page_file):
+        page = self.site_path(page_file)
+        with open(page_file, encoding='utf-8', errors='replace') as f:
+            parser = PageParser(self.viewport, self.dpr)
+            parser.feed(f.read())
+        icon = parser.icon
+        if icon is None and os.path.isfile(os.path.join(self.site_dir, 'favicon.ico')):
+            icon = '/favicon.ico'
+        references = [(url, kind) for url, kind, lazy in parser.requests if not lazy]
+        lazy_references = [(url, kind) for url, kind, lazy in parser.requests if lazy]
+        if icon:
+            references.append((icon, 'other'))
+        for style in parser.styles:
+            references.extend(self.css_references(style))
+
+        row = dict.fromkeys(COLUMNS, 0)
+        row['document'] = self.weights.transfer(page_file)
+        row['requests'] = 1
+        counts = dict.fromkeys(RESOURCE_TYPES, 0)
+        counts['document'] = 1
+        assets, missing, external = {}, [], []
+        seen = {page_file}
+        for key, kind, target in self.expand(references, page):
+            if key in seen:
+                continue
+            seen.add(key)
+            row['requests'] += 1
+            counts[kind] += 1
+            if target is None:
+                row['third-party'] += 1
+                external.append(key)
+            elif not os.path.isfile(target):
+                missing.append(self.site_path(target))
+            else:
+                size = self.weights.transfer(target)
+                row[kind] += size
+                assets[self.site_path(target)] = (kind, size)
+        for key, kind, target in self.expand(lazy_references, page):
+            if key in seen or target is None:
+                continue
+            seen.add(key)
+            if not os.path.isfile(target):
+                missing.append(self.site_path(target))
+            else:
+                row['lazy'] += self.weights.transfer(target)
+        for url in parser.linked:
+            target = self.resolve(url, page)
+            if target and os.path.isfile(target) and target not in seen:
+                seen.add(target)
+                row['linked'] += self.weights.transfer(target)
+        row['total'] = sum(row[kind] for kind in RESOURCE_TYPES)
+        url = page[:-len('index.html')] if page.endswith('/index.html') else page
+        return {'page': url, 'weights': row, 'counts': counts, 'assets': assets, 'missing': sorted(set(missing)),
+                'external': sorted(set(external))}
+
+    def analyze(self):
+        pages = []
+        for directory, _, names in os.walk(self.site_dir):
+            for name in sorted(names):
+                if name.endswith('.html'):
+                    pages.append(self.analyze_page(os.path.join(directory, name)))
+        pages.sort(key=lambda page: page['page'])
+        return pages
+
+
+def load_budgets(path):
+    with open(path, encoding='utf-8') as f:
+        budgets = json.load(f)
+    if not isinstance(budgets, list):
+        raise ValueError(f"{path} must hold a list of budgets")
+    for budget in budgets:
+        for key in ('resourceSizes', 'resourceCounts'):
+            for entry in budget.get(key, []):
+                if entry.get('resourceType') not in ('total', 'third-party') + RESOURCE_TYPES:
+                    raise ValueError(f"{path}: unknown resourceType {entry.get('resourceType')!r}")
+    return budgets
+
+
+def path_matches(pattern, path):
+    """Lighthouse budget paths: '*' matches anything, a trailing '$' anchors the end"""
+    anchored = pattern.endswith('$')
+    regex = '.*'.join(re.escape(part) for part in pattern.rstrip('$').split('*'))
+    return re.match(regex + ('$' if anchored else ''), path) is not None
+
+
+def check_budgets(pages, budgets):
+    """(page, metric, actual, limit) for every exceeded budget; sizes in bytes"""
+    violations = []
+    for page in pages:
+        matching = [budget for budget in budgets if path_matches(budget.get('path', '/*'), page['page'])]
+        if not matching:
+            continue
+        budget = matching[-1]
+        row = page['weights']
+        counts = dict(page['counts'], total=row['requests'])
+        counts['third-party'] = row['third-party']
+        for entry in budget.get('resourceSizes', []):
+            kind = entry['resourceType']
+            if kind != 'third-party' and row[kind] > entry['budget'] * 1024:
+                violations.append((page['page'], kind + ' size', row[kind], entry['budget'] * 1024))
+        for entry in budget.get('resourceCounts', []):
+            kind = entry['resourceType']
+            actual = counts[kind]
+            if actual > entry['budget']:
+                violations.append((page['page'], kind + ' requests', actual, entry['budget']))
+    return violations
+
+
+def heaviest_assets(pages):
+    assets = {}
+    for page in pages:
+        for path, (kind, size) in page['assets'].items():
+            entry = assets.setdefault(path, {'asset': path, 'type': kind, 'transfer': size, 'pages': 0})
+            entry['pages'] += 1
+    return sorted(assets.values(), key=lambda asset: (-asset['transfer'], asset['asset']))
+
+
+def print_pages(pages, sort, top):
+    ranked = sorted(pages, key=lambda page: (-page['weights'][sort], page['page']))[:top]
+    columns = ('requests', 'total', 'document', 'stylesheet', 'script', 'image', 'font', 'lazy', 'linked')
+    width = max([len(page['page']) for page in ranked] + [4])
+    print(f"{'page':<{width}}  {'  '.join(f'{column:>10}' for column in columns)}")
+    for page in ranked:
+        row = page['weights']
+        cells = [str(row['requests'])] + [format_kb(row[column]) for column in columns[1:]]
+        print(f"{page['page']:<{width}}  {'  '.join(f'{cell:>10}' for cell in cells)}")
+    print('(KB transferred; lazy images and linked PDFs are not part of the total)')
+
+
+def print_assets(assets, top):
+    ranked = assets[:top]
+    width = max([len(asset['asset']) for asset in ranked] + [5])
+    print(f"{'asset':<{width}}  {'type':>10}  {'KB':>10}  {'pages':>6}")
+    for asset in ranked:
+        print(f"{asset['asset']:<{width}}  {asset['type']:>10}  {format_kb(asset['transfer']):>10}  {asset['pages']:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-page transfer weight and budgets for the built site')
+    parser.add_argument('--site', default=SITE_DIR, help='built site directory (default: _site)')
+    parser.add_argument('--budgets', default=BUDGET_FILE, help='Lighthouse-format budget file (default: budget.json)')
+    parser.add_argument('--sort', default='total', choices=COLUMNS, help='column to rank pages by')
+    parser.add_argument('--top', type=int, default=15, help='pages to list (default: 15)')
+    parser.add_argument('--assets', type=int, default=0, metavar='N', help='also list the N heaviest assets')
+    parser.add_argument('--width', type=int, default=VIEWPORT_WIDTH, help='viewport width for srcset and media queries')
+    parser.add_argument('--dpr', type=float, default=DEVICE_PIXEL_RATIO, help='device pixel ratio for srcset')
+    parser.add_argument('--json', action='store_true', help='print the full report as JSON')
+    args = parser.parse_args()
+
+    site_dir = os.path.abspath(args.site)
+    if not os.path.isdir(site_dir):
+        print(f'{os.path.relpath(site_dir)} not found. Run "bundle exec jekyll build" first.')
+        sys.exit(1)
+    try:
+        budgets = load_budgets(args.budgets) if os.path.exists(args.budgets) else []
+    except ValueError as error:
+        print(f"✗ {error}")
+        sys.exit(1)
+
+    site_url, baseurl = load_site_config()
+    weights = AssetWeights(site_dir)
+    pages = SiteAnalyzer(site_dir, weights, site_url, baseurl, args.width, args.dpr).analyze()
+    weights.save()
+    violations = check_budgets(pages, budgets)
+    missing = sorted({(page['page'], path) for page in pages for path in page['missing']})
+
+    if args.json:
+        json.dump({'pages': pages, 'assets': heaviest_assets(pages), 'violations': violations,
+                   'missing': missing}, sys.stdout, indent=2)
+        print()
+    else:
+        print_pages(pages, args.sort, args.top)
+        if args.assets:
+            print()
+            print_assets(heaviest_assets(pages), args.assets)
+        print()
+        for page, path in missing:
+            print(f"✗ {page} references missing {path}")
+        for page, metric, actual, limit in violations:
+            if metric.endswith('size'):
+                print(f"✗ {page} {metric}: {format_kb(actual)} KB > {format_kb(limit)} KB")
+            else:
+                print(f"✗ {page} {metric}: {actual} > {limit}")
+        if not violations and not missing:
+            print(f"✓ {len(pages)} pages within budget")
+    sys.exit(1 if violations or missing else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""
+Import the hyphenated sibling scripts (load-data.py, build-latex.py, ...)
+
+Script file names are not valid module names, so a script that reuses
+another one loads it by file name:
+
+    from script_loader import load_script
+    data_loader = load_script('load-data.py')
+
+Each script runs once per process; later calls return the same module, so
+its caches and locks are shared by every script that loads it.
+"""
+import importlib.util
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_script(filename):
+    """Import a sibling script with a hyphenated name, e.g. load-data.py"""
+    name = filename[:-3].replace('-', '_')
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(REPO_ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
@@ -106,6 +106,13 @@ rm -rf "${REPO_ROOT}/_site"
 export JEKYLL_ENV=production
 bundle exec jekyll build
 
+if [[ "${MODE}" == "full" ]]; then
+  echo "verify-ui: checking per-page transfer budgets..."
+  python3 page-weight.py --top 10
+  echo "verify-ui: checking links in data and content..."
+  python3 check-links.py --internal-only
+fi
+
 SERVER_LOG="$(mktemp -t verify-ui-server.XXXXXX.log)"
 if command -v lsof >/dev/null 2>&1; then
   EXISTING_SERVER_PIDS="$(lsof -ti:"${PORT}" 2>/dev/null || true)"
@@ -18,6 +18,18 @@ function filesUnder(directory) {
   });
 }
 
+// Layout stylesheets generated by critical-css.py replace the render-blocking overhaul.css link
+// while the data was generated from the current overhaul.css (default.html makes the same comparison)
+function layoutStylesheet(layout) {
+  const file = path.join(ROOT, '_data/critical_css.json');
+  if (!fs.existsSync(file)) return null;
+  const data = JSON.parse(fs.readFileSync(file, 'utf8'));
+  const source = fs.readFileSync(path.join(ROOT, 'assets/css/overhaul.css'), 'utf8')
+    .replace(/^---\s*\n[\s\S]*?\n?^(?:---|\.\.\.)\s*$\n?/m, '');
+  if (data.source_css !== source) return null;
+  return data.layouts[layout] ? data.layouts[layout].stylesheet : null;
+}
+
 async function mockGitHubCount(page) {
   await page.route('https://api.github.com/search/issues*', async (route) => {
     await route.fulfill({ contentType: 'application/json', body: JSON.stringify({ total_count: 47, incomplete_results: false, items: [] }) });
@@ -192,15 +204,16 @@ test.describe('accessibility and release-quality gates', () => {
   });
 
   test('first-party CSS and JavaScript URLs share a build revision', async ({ page }) => {
+    const stylesheet = layoutStylesheet('default') || '/assets/css/overhaul.css';
     const expectedByRoute = {
-      '/': ['/assets/css/overhaul.css', '/assets/js/site-shell.js'],
-      '/contributions': ['/assets/css/overhaul.css', '/assets/js/contribution-count.js', '/assets/js/site-shell.js'],
+      '/': [stylesheet, '/assets/js/site-shell.js'],
+      '/contributions': [stylesheet, '/assets/js/contribution-count.js', '/assets/js/site-shell.js'],
     };
     const revisions = [];
 
     for (const [route, expectedPaths] of Object.entries(expectedByRoute)) {
       await page.goto(`${BASE_URL}${route}`, { waitUntil: 'domcontentloaded' });
-      const assetUrls = await page.locator('link[rel="stylesheet"], script[src]').evaluateAll((elements) => elements
+      const assetUrls = await page.locator('link[rel="stylesheet"], link[rel="preload"][as="style"], script[src]').evaluateAll((elements) => elements
         .map((element) => new URL(element.href || element.src, location.href))
         .filter((url) => url.origin === location.origin && /\/assets\/(css|js)\//.test(url.pathname))
         .map((url) => ({ pathname: url.pathname, revision: url.searchParams.get('v') })));
@@ -233,11 +246,19 @@ test.describe('accessibility and release-quality gates', () => {
       });
       const lcp = report.lhr.audits['largest-contentful-paint'].numericValue;
       const cls = report.lhr.audits['cumulative-layout-shift'].numericValue;
+      const fcp = report.lhr.audits['first-contentful-paint'].numericValue;
+      test.info().annotations.push({ type: 'first-contentful-paint', description: `${Math.round(fcp)} ms` });
       expect(report.lhr.runtimeError, report.lhr.runtimeError?.message).toBeUndefined();
       expect(Number.isFinite(lcp), 'Lighthouse should produce an LCP measurement').toBe(true);
       expect(Number.isFinite(cls), 'Lighthouse should produce a CLS measurement').toBe(true);
       expect(lcp).toBeLessThanOrEqual(2500);
       expect(cls).toBeLessThanOrEqual(0.1);
+      if (layoutStylesheet('default')) {
+        const blocking = (report.lhr.audits['render-blocking-resources']?.details?.items || [])
+          .map((item) => new URL(item.url).pathname)
+          .filter((pathname) => pathname.startsWith('/assets/css/'));
+        expect(blocking, 'critical CSS is inlined and the layout stylesheet loads without blocking').toEqual([]);
+      }
     } finally {
       await chrome.kill();
     }
@@ -12,6 +12,16 @@ async function expectNoHorizontalOverflow(page, path, width) {
   expect(dimensions.scrollWidth, `${path} at ${width}px`).toBeLessThanOrEqual(dimensions.clientWidth + 1);
 }
 
+async function setCountSnapshot(page, snapshot) {
+  await page.locator('[data-contribution-count]').evaluate((element, value) => {
+    element.removeAttribute('data-snapshot-count');
+    element.removeAttribute('data-snapshot-generated');
+    if (!value) return;
+    element.setAttribute('data-snapshot-count', String(value.count));
+    element.setAttribute('data-snapshot-generated', value.generated);
+  }, snapshot);
+}
+
 test.describe('research records and contribution proof', () => {
   test('publications are citation-first research records', async ({ page }) => {
     await page.setViewportSize({ width: 1280, height: 900 });
@@ -160,6 +170,7 @@ test.describe('research records and contribution proof', () => {
       }
     });
     await page.goto(`${BASE_URL}/contributions`, { waitUntil: 'domcontentloaded' });
+    await setCountSnapshot(page, null);
 
     const count = page.locator('[data-contribution-count]');
     await expect(count).toHaveAttribute('data-state', 'unavailable');
@@ -188,6 +199,7 @@ test.describe('research records and contribution proof', () => {
         await route.fulfill({ status: testCase.response.status, contentType: 'application/json', body: JSON.stringify(testCase.response.body) });
       });
       await page.goto(`${BASE_URL}/contributions?state=${testCase.state}`, { waitUntil: 'domcontentloaded' });
+      await setCountSnapshot(page, null);
       await page.locator('[data-contribution-count]').scrollIntoViewIfNeeded();
       await expect(page.locator('[data-contribution-count]')).toHaveAttribute('data-state', testCase.state);
       if (testCase.state === 'incomplete') {
@@ -202,10 +214,38 @@ test.describe('research records and contribution proof', () => {
       await route.fulfill({ contentType: 'application/json', body: JSON.stringify({ total_count: 1, items: [] }) }).catch(() => {});
     });
     await page.goto(`${BASE_URL}/contributions?state=timeout`, { waitUntil: 'domcontentloaded' });
+    await setCountSnapshot(page, null);
     await page.locator('[data-contribution-count]').scrollIntoViewIfNeeded();
     await expect(page.locator('[data-contribution-count]')).toHaveAttribute('data-state', 'timeout', { timeout: 7000 });
   });
 
+  test('compact GitHub count reads a fresh build snapshot and only falls back to the API when it is stale', async ({ page }) => {
+    let calls = 0;
+    await page.route('https://api.github.com/search/issues*', async (route) => {
+      calls += 1;
+      await route.fulfill({ contentType: 'application/json', body: JSON.stringify({ total_count: 48, incomplete_results: false, items: [] }) });
+    });
+    const count = page.locator('[data-contribution-count]');
+
+    await page.goto(`${BASE_URL}/contributions?snapshot=fresh`, { waitUntil: 'domcontentloaded' });
+    await setCountSnapshot(page, { count: 47, generated: new Date(Date.now() - 60 * 60 * 1000).toISOString() });
+    await count.scrollIntoViewIfNeeded();
+    await expect(count).toHaveAttribute('data-state', 'success');
+    await expect(page.locator('#contribution-count-value')).toHaveText('47');
+    await expect(page.locator('#contribution-count-status')).toContainText('as of');
+    expect(calls).toBe(0);
+
+    await page.getByRole('button', { name: 'Refresh count' }).click();
+    await expect(page.locator('#contribution-count-value')).toHaveText('48');
+    expect(calls).toBe(1);
+
+    await page.goto(`${BASE_URL}/contributions?snapshot=stale`, { waitUntil: 'domcontentloaded' });
+    await setCountSnapshot(page, { count: 40, generated: new Date(Date.now() - 10 * 24 * 60 * 60 * 1000).toISOString() });
+    await count.scrollIntoViewIfNeeded();
+    await expect(page.locator('#contribution-count-value')).toHaveText('48');
+    expect(calls).toBe(2);
+  });
+
   test('core archive pages do not overflow from phone to desktop', async ({ page }) => {
     for (const path of ['/publications', '/projects', '/contributions']) {
       for (const width of [320, 390, 768, 1440]) {
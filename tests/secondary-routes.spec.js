@@ -15,6 +15,7 @@ const ROUTES = [
   '/cv/',
   '/404.html',
   '/offline/',
+  '/search/',
 ];
 
 test.describe('secondary route convergence', () => {
@@ -39,6 +40,28 @@ test.describe('secondary route convergence', () => {
     }
   });
 
+  test('search loads the manifest and only the index shards a query needs', async ({ page }) => {
+    const requested = [];
+    page.on('request', (request) => {
+      const { pathname } = new URL(request.url());
+      if (pathname.startsWith('/assets/search/')) requested.push(pathname);
+    });
+    await page.goto(`${BASE_URL}/search/?q=ctxhelm`, { waitUntil: 'domcontentloaded' });
+
+    const results = page.locator('[data-search-results] [data-search-result]');
+    await expect(results.first()).toHaveAttribute('data-search-result', '/showcase/projects/ctxhelm/');
+    await expect(page.locator('[data-search-status]')).toContainText('for “ctxhelm”');
+    const manifest = JSON.parse(fs.readFileSync(path.join(ROOT, 'assets/search/manifest.json'), 'utf8'));
+    const shardRequests = requested.filter((pathname) => /\/terms\.[0-9a-f]+\.json$/.test(pathname));
+    expect(requested).toContain('/assets/search/manifest.json');
+    expect(shardRequests.length).toBeGreaterThan(0);
+    expect(shardRequests.length).toBeLessThan(manifest.shards.length / 4);
+
+    await page.locator('[data-search-input]').fill('zzzzqx');
+    await expect(page.locator('[data-search-status]')).toHaveText('No results for “zzzzqx”.');
+    await expect(results).toHaveCount(0);
+  });
+
   test('CV is a focused download surface rather than an embedded document viewer', async ({ page }) => {
     await page.goto(`${BASE_URL}/cv/`, { waitUntil: 'domcontentloaded' });
     await expect(page.locator('iframe')).toHaveCount(0);
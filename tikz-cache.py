@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Externalized TikZ figure cache
+
+Compiles each TikZ figure body (figures/fig1_methodology.tex,
+figures/fig2_taxonomy.tex) once into a PDF keyed by a hash of its source
+and preamble, and writes figures/tikz-cache/manifest.tex mapping figure
+names to the cached PDFs. Documents that \\input{tikz-cache} and use
+\\tikzfigure{<name>} include the cached PDF when its hash matches and
+fall back to typesetting the TikZ source otherwise. Changed figures
+recompile in parallel.
+"""
+import argparse
+import glob
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(REPO_ROOT, 'figures', 'tikz-cache')
+MANIFEST = os.path.join(CACHE_DIR, 'manifest.tex')
+DOCUMENT_CLASS = '\\documentclass[border=10pt]{standalone}'
+
+# name -> TikZ body, the preamble it needs, and where to publish the PDF
+FIGURES = {
+    'fig1_methodology': {
+        'source': 'figures/fig1_methodology.tex',
+        'preamble': ['\\usepackage{tikz}', '\\usetikzlibrary{shapes,arrows,positioning,shadows}'],
+        'outputs': ['figures/fig1_standalone.pdf'],
+    },
+    'fig2_taxonomy': {
+        'source': 'figures/fig2_taxonomy.tex',
+        'preamble': ['\\usepackage{tikz}', '\\usetikzlibrary{trees,positioning,shadows,shapes}'],
+        'outputs': ['figures/fig2_standalone.pdf'],
+    },
+}
+
+
+class Figure:
+    """One TikZ body and its content-addressed cache entry"""
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.source = os.path.join(REPO_ROOT, spec['source'])
+        self.preamble = '\n'.join([DOCUMENT_CLASS, *spec['preamble']])
+        self.outputs = [os.path.join(REPO_ROOT, path) for path in spec['outputs']]
+        with open(self.source, 'r', encoding='utf-8') as f:
+            self.body = f.read()
+        digest = hashlib.sha256()
+        digest.update(self.preamble.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(self.body.encode('utf-8'))
+        self.hash = digest.hexdigest()[:16]
+
+    @property
+    def stem(self):
+        return f"{self.name}-{self.hash}"
+
+    @property
+    def pdf(self):
+        return os.path.join(CACHE_DIR, self.stem + '.pdf')
+
+    @property
+    def cached(self):
+        return os.path.exists(self.pdf)
+
+    def compile(self):
+        """Typeset the figure into the cache; returns an error string or None"""
+        wrapper = os.path.join(CACHE_DIR, self.stem + '.tex')
+        with open(wrapper, 'w', encoding='utf-8') as f:
+            f.write(f"{self.preamble}\n\\begin{{document}}\n{self.body}\n\\end{{document}}\n")
+        result = subprocess.run(
+            ['pdflatex', '-interaction=nonstopmode', '-halt-on-error', self.stem + '.tex'],
+            cwd=CACHE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for extension in ('.tex', '.aux', '.log'):
+            path = os.path.join(CACHE_DIR, self.stem + extension)
+            if extension == '.log' and result.returncode != 0:
+                continue
+            if os.path.exists(path):
+                os.remove(path)
+        if result.returncode != 0 or not self.cached:
+            return f"pdflatex failed; see {os.path.relpath(os.path.join(CACHE_DIR, self.stem + '.log'), REPO_ROOT)}"
+        return None
+
+    def prune(self):
+        """Drop cache entries for older versions of this figure"""
+        for path in glob.glob(os.path.join(CACHE_DIR, f"{self.name}-*.pdf")):
+            if path != self.pdf:
+                os.remove(path)
+
+    def publish(self):
+        for output in self.outputs:
+            if not os.path.exists(output) or not same_file_content(self.pdf, output):
+                shutil.copyfile(self.pdf, output)
+
+
+def same_file_content(first, second):
+    if os.path.getsize(first) != os.path.getsize(second):
+        return False
+    with open(first, 'rb') as a, open(second, 'rb') as b:
+        return a.read() == b.read()
+
+
+def write_manifest(figures):
+    """Map every figure whose cached PDF matches its current hash"""
+    lines = ['% Generated by tikz-cache.py; do not edit.']
+    for figure in figures:
+        if figure.cached:
+            path = os.path.relpath(figure.pdf, os.path.dirname(CACHE_DIR)).replace(os.sep, '/')
+            lines.append(f"\\expandafter\\def\\csname tikzcache@{figure.name}\\endcsname{{{path}}}")
+    content = '\n'.join(lines) + '\n'
+    try:
+        with open(MANIFEST, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return
+    except OSError:
+        pass
+    # Only rewrite on change so documents that read the manifest stay up to date
+    with open(MANIFEST, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def load_figures(names=None):
+    return [Figure(name, FIGURES[name]) for name in (names or FIGURES)]
+
+
+def refresh(names=None, jobs=None, force=False):
+    """Compile stale figures in parallel; returns {name: status}"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    figures = load_figures(names)
+    stale = [figure for figure in figures if force or not figure.cached]
+
+    results = {figure.name: 'cached' for figure in figures if figure not in stale}
+    if stale:
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as executor:
+            for figure, error in zip(stale, executor.map(Figure.compile, stale)):
+                results[figure.name] = f"failed: {error}" if error else 'compiled'
+
+    for figure in figures:
+        if figure.cached:
+            figure.prune()
+            figure.publish()
+    write_manifest(load_figures())
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile TikZ figures into the content-hashed cache')
+    parser.add_argument('figures', nargs='*', metavar='FIGURE',
+                        help=f"figures to refresh (default: all of {', '.join(FIGURES)})")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='figures to compile in parallel')
+    parser.add_argument('--force', action='store_true', help='recompile even if the cache entry exists')
+    args = parser.parse_args()
+
+    unknown = [name for name in args.figures if name not in FIGURES]
+    if unknown:
+        parser.error(f"unknown figure(s): {', '.join(unknown)}")
+    if shutil.which('pdflatex') is None:
+        print("pdflatex not found. Please install a LaTeX distribution.")
+        sys.exit(1)
+
+    results = refresh(args.figures, max(1, args.jobs), args.force)
+    for name, status in results.items():
+        mark = '✗' if status.startswith('failed') else '✓'
+        print(f"{mark} {name}: {status}")
+    sys.exit(1 if any(status.startswith('failed') for status in results.values()) else 0)
+
+if __name__ == '__main__':
+    main()
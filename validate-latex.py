@@ -1,104 +1,964 @@
 #!/usr/bin/env python3
 """
 LaTeX validation script to check for common syntax errors
+
+Every check is a rule that subscribes to token events from one shared
+lexer pass, so adding a rule never adds another loop over the file.
+Regex rules are compiled into a single combined pattern that is scanned
+in lockstep with the lexer. Rules can be switched on or off per project
+with a `.validate-latex.json` file next to (or above) the .tex sources:
+
+    {"disable": ["unescaped-underscore"], "enable": ["straight-quotes"]}
+
+Labels, references, citations and bibliography entries of the whole
+include graph are kept in a per-file symbol index (.validate-latex-index.json)
+that is invalidated by content hash, so undefined, duplicate and unused
+keys are reported without a pdflatex + bibtex run.
 """
+import argparse
+import hashlib
+import json
+import os
 import re
+import shutil
+import subprocess
 import sys
+import threading
+from collections import namedtuple
 
-def validate_latex(filename):
-    """Check for common LaTeX errors"""
-    errors = []
-    line_num = 0
-    
-    with open(filename, 'r', encoding='utf-8') as f:
-        content = f.read()
-        lines = content.split('\n')
-    
-    # Check for matching braces
-    brace_count = 0
-    for i, line in enumerate(lines, 1):
-        for char in line:
-            if char == '{':
-                brace_count += 1
-            elif char == '}':
-                brace_count -= 1
-                if brace_count < 0:
-                    errors.append(f"Line {i}: Unmatched closing brace")
-    
-    if brace_count > 0:
-        errors.append(f"Document has {brace_count} unmatched opening braces")
-    elif brace_count < 0:
-        errors.append(f"Document has {abs(brace_count)} extra closing braces")
-    
-    # Check for common environment mismatches
-    environments = {}
-    for i, line in enumerate(lines, 1):
-        # Find \begin{env}
-        begin_match = re.search(r'\\begin\{([^}]+)\}', line)
-        if begin_match:
-            env_name = begin_match.group(1)
-            if env_name not in environments:
-                environments[env_name] = []
-            environments[env_name].append(('begin', i))
-        
-        # Find \end{env}
-        end_match = re.search(r'\\end\{([^}]+)\}', line)
-        if end_match:
-            env_name = end_match.group(1)
-            if env_name not in environments:
-                environments[env_name] = []
-            environments[env_name].append(('end', i))
-    
-    # Check environment matching
-    for env_name, occurrences in environments.items():
-        begin_count = sum(1 for action, _ in occurrences if action == 'begin')
-        end_count = sum(1 for action, _ in occurrences if action == 'end')
-        
-        if begin_count != end_count:
-            errors.append(f"Environment '{env_name}': {begin_count} \\begin but {end_count} \\end")
-        
-        # Check order
-        stack = []
-        for action, line_num in occurrences:
-            if action == 'begin':
-                stack.append(line_num)
-            elif action == 'end':
-                if not stack:
-                    errors.append(f"Line {line_num}: \\end{{{env_name}}} without matching \\begin")
+CONFIG_NAME = '.validate-latex.json'
+INDEX_NAME = '.validate-latex-index.json'
+INDEX_VERSION = 1
+# build-latex.py validates several roots from threads; they share one index per directory
+INDEX_LOCK = threading.Lock()
+
+TOKEN_RE = re.compile(r'''
+    (?P<comment>%[^\n]*)
+  | (?P<command>\\(?:[A-Za-z@]+\*?|[^A-Za-z@]))
+  | (?P<open>\{)
+  | (?P<close>\})
+  | (?P<math>\$\$?)
+  | (?P<special>[&_^\#])
+  | (?P<newline>\n)
+''', re.VERBOSE)
+
+ENV_ARG_RE = re.compile(r'[ \t]*\{([A-Za-z@*]+)\}')
+# Optional [..] arguments followed by one brace group without nested braces
+RAW_ARG_RE = re.compile(r'(?:[ \t]*\[[^\]\n]*\])*[ \t]*\{([^{}]*)\}')
+VERB_RE = re.compile(r'\*?([^A-Za-z\s*])(.*?)\1')
+
+VERBATIM_ENVS = {'verbatim', 'verbatim*', 'Verbatim', 'lstlisting', 'minted', 'comment'}
+MATH_ENVS = {
+    'math', 'displaymath', 'equation', 'equation*', 'align', 'align*',
+    'alignat', 'alignat*', 'gather', 'gather*', 'multline', 'multline*',
+    'flalign', 'flalign*', 'eqnarray', 'eqnarray*',
+}
+ALIGNMENT_ENVS = MATH_ENVS | {
+    'tabular', 'tabular*', 'tabularx', 'tabulary', 'longtable', 'array',
+    'matrix', 'pmatrix', 'bmatrix', 'vmatrix', 'Vmatrix', 'smallmatrix',
+    'cases', 'aligned', 'alignedat', 'split', 'gathered', 'supertabular',
+}
+# Commands whose (first) braced argument is a name, key, path or URL
+RAW_ARG_COMMANDS = {
+    '\\label', '\\ref', '\\eqref', '\\pageref', '\\autoref', '\\cref', '\\Cref',
+    '\\nameref', '\\cite', '\\citep', '\\citet', '\\citeauthor', '\\citeyear',
+    '\\nocite', '\\bibitem', '\\url', '\\href', '\\hrefWithoutArrow',
+    '\\input', '\\include', '\\includegraphics', '\\bibliography',
+    '\\bibliographystyle', '\\usepackage', '\\RequirePackage', '\\documentclass',
+    '\\usetikzlibrary', '\\definecolor', '\\hypersetup', '\\lstset', '\\tcbset',
+    '\\addbibresource', '\\InputIfFileExists',
+}
+REF_COMMANDS = {
+    '\\ref', '\\eqref', '\\pageref', '\\autoref', '\\cref', '\\Cref', '\\nameref',
+}
+CITE_COMMANDS = {
+    '\\cite', '\\citep', '\\citet', '\\citeauthor', '\\citeyear', '\\nocite',
+}
+BIB_ENTRY_RE = re.compile(r'^[ \t]*@(\w+)[ \t]*[{(][ \t]*([^,\s]+)[ \t]*,', re.MULTILINE)
+DEFINITION_COMMANDS = {
+    '\\newcommand', '\\renewcommand', '\\providecommand', '\\def', '\\gdef',
+    '\\edef', '\\xdef', '\\newenvironment', '\\renewenvironment', '\\tikzset',
+}
+
+Token = namedtuple('Token', 'kind value line offset end arg')
+
+
+class Rule:
+    """Base class for rules driven by lexer token events
+
+    Subclasses implement any of on_command, on_begin, on_end, on_open,
+    on_close, on_math, on_special and on_comment, each called as
+    handler(token, ctx). finish(ctx) runs once after the last token.
+    """
+    name = ''
+    description = ''
+    default = True
+
+    def finish(self, ctx):
+        pass
+
+
+class RegexRule(Rule):
+    """Rule expressed as a regular expression over the raw source
+
+    Matches inside comments and verbatim blocks are ignored.
+    """
+    name = ''
+    description = ''
+    default = True
+    pattern = ''
+    message = ''
+
+    def __init__(self):
+        self.regex = re.compile(self.pattern)
+
+    def describe(self, match):
+        return self.message.format(*match.groups(), match=match.group(0))
+
+
+class Context:
+    """Shared lexer state handed to every rule"""
+
+    def __init__(self, filename, text):
+        self.filename = filename
+        self.text = text
+        self.line = 1
+        self.depth = 0
+        self.env_stack = []
+        self.dollar = None
+        self.math_delims = 0
+        self.math_envs = 0
+        self.def_depth = None
+        self.def_closed = False
+        self.gap = ''
+        self.scan_pos = 0
+        self.issues = []
+
+    @property
+    def in_math(self):
+        return self.dollar is not None or self.math_delims > 0 or self.math_envs > 0
+
+    @property
+    def in_definition(self):
+        return self.def_depth is not None and self.depth > self.def_depth
+
+    def in_env(self, names):
+        return any(name in names for name in self.env_stack)
+
+    def report(self, rule, line, message):
+        """Record an issue; line=None marks a document-level finding"""
+        self.issues.append((line, rule.name, message, None))
+
+
+# ---------------------------------------------------------------------------
+# Token rules
+
+class BraceBalanceRule(Rule):
+    name = 'brace-balance'
+    description = 'Unmatched { and } outside comments and verbatim blocks'
+
+    def on_close(self, token, ctx):
+        if ctx.depth < 0:
+            ctx.report(self, token.line, 'Unmatched closing brace')
+
+    def finish(self, ctx):
+        if ctx.depth > 0:
+            ctx.report(self, None, f"Document has {ctx.depth} unmatched opening braces")
+        elif ctx.depth < 0:
+            ctx.report(self, None, f"Document has {abs(ctx.depth)} extra closing braces")
+
+
+class EnvironmentBalanceRule(Rule):
+    name = 'environment-balance'
+    description = r'Every \begin{env} has a matching \end{env}'
+
+    def __init__(self):
+        self.occurrences = {}
+
+    def on_begin(self, token, ctx):
+        self.occurrences.setdefault(token.arg, []).append(('begin', token.line))
+
+    def on_end(self, token, ctx):
+        self.occurrences.setdefault(token.arg, []).append(('end', token.line))
+
+    def finish(self, ctx):
+        for env_name, occurrences in self.occurrences.items():
+            begin_count = sum(1 for action, _ in occurrences if action == 'begin')
+            end_count = len(occurrences) - begin_count
+            if begin_count != end_count:
+                ctx.report(self, None, f"Environment '{env_name}': {begin_count} \\begin but {end_count} \\end")
+
+            stack = []
+            for action, line_num in occurrences:
+                if action == 'begin':
+                    stack.append(line_num)
+                elif not stack:
+                    ctx.report(self, line_num, f"\\end{{{env_name}}} without matching \\begin")
                 else:
                     stack.pop()
-        
-        if stack:
             for line_num in stack:
-                errors.append(f"Line {line_num}: \\begin{{{env_name}}} without matching \\end")
-    
-    # Check for specific issues
-    for i, line in enumerate(lines, 1):
-        # Check for common typos
-        if r'\end{onecolentry>' in line:
-            errors.append(f"Line {i}: Invalid command '\\end{{onecolentry>}}' - should be '\\end{{onecolentry}}'")
-        
-        # Check for unescaped special characters in text (skip comments)
-        if not line.strip().startswith('%') and '\\%' not in line:
-            # Look for % that's not part of a comment
-            comment_pos = line.find('%')
-            if comment_pos > 0 and line[comment_pos-1] != '\\':
-                # Check if it's actually a comment or unescaped %
-                before_percent = line[:comment_pos].strip()
-                if before_percent and not before_percent.endswith('\\'):
-                    # This might be an unescaped % in the middle of text
-                    pass  # Skip this check for now as it's too aggressive
-    
-    return errors
+                ctx.report(self, line_num, f"\\begin{{{env_name}}} without matching \\end")
+
+
+class UnescapedAmpersandRule(Rule):
+    name = 'unescaped-ampersand'
+    description = "'&' outside tabular and alignment environments"
+
+    def on_special(self, token, ctx):
+        if token.value == '&' and not ctx.in_definition and not ctx.in_env(ALIGNMENT_ENVS):
+            ctx.report(self, token.line, "Unescaped '&' outside an alignment environment - use '\\&'")
+
+
+class UnescapedScriptRule(Rule):
+    name = 'unescaped-underscore'
+    description = "'_' and '^' outside math mode"
+
+    def on_special(self, token, ctx):
+        if token.value in '_^' and not ctx.in_math and not ctx.in_definition:
+            ctx.report(self, token.line, f"Unescaped '{token.value}' outside math mode - use '\\{token.value}'")
+
+
+class UnescapedHashRule(Rule):
+    name = 'unescaped-hash'
+    description = "'#' that is not a macro parameter"
+
+    def on_special(self, token, ctx):
+        if token.value != '#':
+            return
+        following = ctx.text[token.end:token.end + 1]
+        if not (following.isdigit() or following == '#'):
+            ctx.report(self, token.line, "Unescaped '#' - use '\\#'")
+
+
+class PercentAfterNumberRule(Rule):
+    name = 'percent-after-number'
+    description = "'%' directly after a digit, which silently comments out the rest of the line"
+
+    def on_comment(self, token, ctx):
+        if token.offset and ctx.text[token.offset - 1].isdigit():
+            ctx.report(self, token.line, "Possible unescaped '%' after a number - use '\\%'")
+
+
+class DuplicateLabelRule(Rule):
+    name = 'duplicate-label'
+    description = r'The same \label key defined twice'
+
+    def __init__(self):
+        self.labels = {}
+
+    def on_command(self, token, ctx):
+        if token.value != '\\label' or token.arg is None:
+            return
+        if token.arg in self.labels:
+            first = self.labels[token.arg]
+            ctx.report(self, token.line, f"Duplicate label '{token.arg}' (first defined on line {first})")
+        else:
+            self.labels[token.arg] = token.line
+
+
+class DeprecatedCommandRule(Rule):
+    name = 'deprecated-command'
+    description = 'Plain TeX and LaTeX 2.09 font commands'
+
+    replacements = {
+        '\\bf': '\\textbf{...} or \\bfseries',
+        '\\it': '\\textit{...} or \\itshape',
+        '\\rm': '\\textrm{...} or \\rmfamily',
+        '\\sf': '\\textsf{...} or \\sffamily',
+        '\\tt': '\\texttt{...} or \\ttfamily',
+        '\\sl': '\\textsl{...} or \\slshape',
+        '\\sc': '\\textsc{...} or \\scshape',
+        '\\cal': '\\mathcal{...}',
+        '\\over': '\\frac{...}{...}',
+        '\\centerline': '\\centering or a center environment',
+    }
+
+    def on_command(self, token, ctx):
+        replacement = self.replacements.get(token.value)
+        if replacement:
+            ctx.report(self, token.line, f"Deprecated command '{token.value}' - use {replacement}")
+
+
+class DisplayDollarsRule(Rule):
+    name = 'display-dollars'
+    description = r'$$...$$ display math instead of \[...\]'
+
+    def on_math(self, token, ctx):
+        if token.value == '$$' and ctx.dollar == '$$':
+            ctx.report(self, token.line, "Use '\\[...\\]' instead of '$$...$$'")
+
+
+class MacroArityRule(Rule):
+    name = 'macro-arity'
+    description = r'Calls to \newcommand macros (e.g. \resumeItem) with too few arguments'
+
+    def __init__(self):
+        self.arity = {}
+        self.defining = False
+        self.pending = []
+
+    def on_command(self, token, ctx):
+        if self.defining:
+            self.defining = False
+            signature = re.match(r'\}?\s*\[(\d)\](\s*\[)?', ctx.text[token.end:token.end + 12])
+            if signature and not signature.group(2):
+                self.arity[token.value] = int(signature.group(1))
+            return
+        if token.value in ('\\newcommand', '\\renewcommand', '\\providecommand'):
+            self.defining = True
+            return
+        self._interrupt(ctx)
+        expected = self.arity.get(token.value)
+        if expected and not ctx.in_definition:
+            self.pending.append([token, expected, 0, ctx.depth])
+
+    def on_open(self, token, ctx):
+        if not self.pending or ctx.depth - 1 != self.pending[-1][3]:
+            return
+        if ctx.gap.strip():
+            self._interrupt(ctx, depth=ctx.depth - 1)
+            return
+        call = self.pending[-1]
+        call[2] += 1
+        if call[2] == call[1]:
+            self.pending.pop()
+
+    def on_close(self, token, ctx):
+        if self.pending and ctx.depth < self.pending[-1][3]:
+            self._interrupt(ctx, depth=self.pending[-1][3])
+
+    def on_special(self, token, ctx):
+        self._interrupt(ctx)
+
+    on_math = on_begin = on_end = on_special
+
+    def _interrupt(self, ctx, depth=None):
+        """Anything but another argument group ends the call at this depth"""
+        depth = ctx.depth if depth is None else depth
+        while self.pending and self.pending[-1][3] == depth:
+            self._report(self.pending.pop(), ctx)
+
+    def _report(self, call, ctx):
+        token, expected, found, _ = call
+        ctx.report(self, token.line, f"'{token.value}' expects {expected} arguments, found {found}")
+
+    def finish(self, ctx):
+        while self.pending:
+            self._report(self.pending.pop(), ctx)
+
+
+class ListMacroPairRule(Rule):
+    name = 'list-macro-pairs'
+    description = r'CV list macros such as \resumeItemListStart/\resumeItemListEnd used in pairs'
+
+    def __init__(self):
+        self.counts = {}
+        self.first_line = {}
+
+    def on_command(self, token, ctx):
+        if ctx.in_definition:
+            return
+        for suffix, delta in (('Start', 1), ('End', -1)):
+            if token.value.endswith(suffix) and len(token.value) > len(suffix) + 1:
+                prefix = token.value[:-len(suffix)]
+                self.counts[prefix] = self.counts.get(prefix, 0) + delta
+                self.first_line.setdefault(prefix, token.line)
+
+    def finish(self, ctx):
+        for prefix, balance in self.counts.items():
+            if balance:
+                ctx.report(self, None, f"'{prefix}Start' and '{prefix}End' are unbalanced by {balance:+d}")
+
+
+# ---------------------------------------------------------------------------
+# Regex rules
+
+class EnvironmentTypoRule(RegexRule):
+    name = 'environment-typo'
+    description = r"Mistyped environment names such as \end{onecolentry>"
+    pattern = r'\\(begin|end)\{([A-Za-z@*]+)>'
+    message = "Invalid command '\\{0}{{{1}>}}' - should be '\\{0}{{{1}}}'"
+
+
+class SpaceBeforeFootnoteRule(RegexRule):
+    name = 'space-before-footnote'
+    description = r'Whitespace before \footnote'
+    default = False
+    pattern = r'[ \t]+\\footnote\b'
+    message = "Remove the space before '\\footnote'"
+
+
+class UntiedReferenceRule(RegexRule):
+    name = 'untied-reference'
+    description = r"Breakable space before \ref or \cite"
+    default = False
+    pattern = r'\w[ \t]+\\(ref|eqref|cite)\{'
+    message = "Use '~\\{0}' to keep the reference on the same line"
+
+
+class StraightQuotesRule(RegexRule):
+    name = 'straight-quotes'
+    description = "Straight double quotes in text"
+    default = False
+    pattern = r'(?<![\\=])"(?=\w)'
+    message = "Use ``...'' instead of straight double quotes"
+
+
+# ---------------------------------------------------------------------------
+# Cross-reference rules over the symbol index of the whole include graph
+
+class IndexRule(Rule):
+    """Rule evaluated once over the SymbolIndex instead of token events"""
+
+    def check(self, index, report):
+        pass
+
+
+class MissingIncludeRule(IndexRule):
+    name = 'missing-include'
+    description = r'\input, \include or \bibliography target that does not exist'
+
+    def check(self, index, report):
+        for kind, target, path, line in index.missing:
+            report(self, path, line, f"Included file '{target}' not found")
+
+
+class UndefinedReferenceRule(IndexRule):
+    name = 'undefined-reference'
+    description = r'\ref to a \label that is not defined anywhere in the document'
+
+    def check(self, index, report):
+        labels = index.definitions('labels')
+        for key, path, line in index.uses('refs'):
+            if key not in labels:
+                report(self, path, line, f"Undefined reference '{key}'")
+
+
+class UndefinedCitationRule(IndexRule):
+    name = 'undefined-citation'
+    description = r'\cite key missing from every \bibitem and .bib file'
+
+    def check(self, index, report):
+        entries = index.definitions('bibitems')
+        for key, path, line in index.uses('cites'):
+            if key != '*' and key not in entries:
+                report(self, path, line, f"Undefined citation '{key}'")
+
+
+class DuplicateKeyRule(IndexRule):
+    name = 'duplicate-key'
+    description = 'Bibliography keys defined twice, or labels defined in two files'
+
+    def check(self, index, report):
+        for key, places in index.definitions('bibitems').items():
+            for path, line in places[1:]:
+                report(self, path, line, f"Duplicate bibliography key '{key}' (first defined in {places[0][0]})")
+        for key, places in index.definitions('labels').items():
+            # Same-file duplicates are already reported by duplicate-label
+            first_path = places[0][0]
+            for path, line in places[1:]:
+                if path != first_path:
+                    report(self, path, line, f"Duplicate label '{key}' (first defined in {first_path})")
+
+
+class UnusedLabelRule(IndexRule):
+    name = 'unused-label'
+    description = r'\label never referenced'
+    default = False
+
+    def check(self, index, report):
+        used = {key for key, _, _ in index.uses('refs')}
+        for key, places in index.definitions('labels').items():
+            if key not in used:
+                path, line = places[0]
+                report(self, path, line, f"Label '{key}' is never referenced")
+
+
+class UnusedCitationRule(IndexRule):
+    name = 'unused-citation'
+    description = r'\bibitem entries that are never cited'
+
+    def check(self, index, report):
+        cited = {key for key, _, _ in index.uses('cites')}
+        if '*' in cited:
+            return
+        for key, places in index.definitions('bibitems').items():
+            path, line = places[0]
+            # Unused .bib entries are dropped by BibTeX; \bibitem ones are printed
+            if key not in cited and path.endswith('.tex'):
+                report(self, path, line, f"Bibliography entry '{key}' is never cited")
+
+
+class SymbolCollector(Rule):
+    """Records labels, references, citations and includes for the index"""
+    name = 'symbols'
+
+    def __init__(self):
+        self.symbols = {'labels': [], 'refs': [], 'cites': [], 'bibitems': [], 'includes': []}
+
+    def on_command(self, token, ctx):
+        if token.arg is None:
+            return
+        name = token.value.rstrip('*')
+        keys = [key.strip() for key in token.arg.split(',') if key.strip()]
+        if name == '\\label':
+            self.symbols['labels'].append([token.arg, token.line])
+        elif name == '\\bibitem':
+            self.symbols['bibitems'].append([token.arg, token.line])
+        elif name in REF_COMMANDS:
+            self.symbols['refs'].extend([key, token.line] for key in keys)
+        elif name in CITE_COMMANDS:
+            self.symbols['cites'].extend([key, token.line] for key in keys)
+        elif name in ('\\input', '\\include'):
+            self.symbols['includes'].append(['tex', token.arg, token.line])
+        elif name == '\\InputIfFileExists':
+            self.symbols['includes'].append(['optional-tex', token.arg, token.line])
+        elif name in ('\\bibliography', '\\addbibresource'):
+            self.symbols['includes'].extend(['bib', key, token.line] for key in keys)
+        elif name == '\\includegraphics':
+            self.symbols['includes'].append(['graphics', token.arg, token.line])
+
+
+def bib_symbols(text):
+    """Index the entry keys of a .bib file"""
+    entries = []
+    for match in BIB_ENTRY_RE.finditer(text):
+        if match.group(1).lower() not in ('comment', 'string', 'preamble'):
+            entries.append([match.group(2), text.count('\n', 0, match.start()) + 1])
+    return {'labels': [], 'refs': [], 'cites': [], 'bibitems': entries, 'includes': []}
+
+
+def in_tex_tree(name):
+    """Whether a file the document includes comes from the TeX distribution"""
+    kpsewhich = shutil.which('kpsewhich')
+    if kpsewhich is None:
+        # Without a TeX installation, assume bare names such as glyphtounicode are system files
+        return os.sep not in name and '/' not in name
+    result = subprocess.run([kpsewhich, name], capture_output=True, text=True)
+    return result.returncode == 0 and bool(result.stdout.strip())
+
+
+class SymbolIndex:
+    """Persisted per-file symbol tables for a root document and its includes
+
+    Files are re-read only when their size or mtime changes, and
+    re-lexed only when their content hash changes.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.directory = os.path.dirname(self.root)
+        self.path = os.path.join(self.directory, INDEX_NAME)
+        self.files = {}
+        self.missing = []
+        self.cache = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                self.cache = data.get('files', {})
+        except (OSError, ValueError):
+            pass
+
+    def build(self, root_text=None, root_symbols=None):
+        """Walk the include graph from the root, reusing cached entries"""
+        root_name = os.path.basename(self.root)
+        if root_symbols is not None:
+            self._store(root_name, self.root, root_text.encode('utf-8'), root_symbols)
+        queue = [root_name]
+        visited = set()
+        while queue:
+            name = queue.pop()
+            if name in visited:
+                continue
+            visited.add(name)
+            symbols = self.files.get(name) or self._load(name)
+            if symbols is None:
+                continue
+            self.files[name] = symbols
+            for kind, target, line in symbols['includes']:
+                resolved = self._resolve(kind, target)
+                if resolved is None:
+                    continue
+                if os.path.isfile(os.path.join(self.directory, resolved)):
+                    queue.append(resolved)
+                elif kind != 'optional-tex' and not in_tex_tree(resolved):
+                    self.missing.append((kind, resolved, name, line))
+        return self
+
+    def save(self):
+        """Merge this root's entries into the index on disk
+
+        Other roots in the same directory (the CV variants in _posts/) keep
+        their entries; entries for files that no longer exist are dropped.
+        """
+        live = {name: self.cache[name] for name in self.files if name in self.cache}
+        with INDEX_LOCK:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                stored = data.get('files', {}) if data.get('version') == INDEX_VERSION else {}
+            except (OSError, ValueError):
+                stored = {}
+            merged = {name: entry for name, entry in stored.items()
+                      if os.path.exists(os.path.join(self.directory, name))}
+            merged.update(live)
+            temp = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                with open(temp, 'w', encoding='utf-8') as f:
+                    json.dump({'version': INDEX_VERSION, 'files': merged}, f, separators=(',', ':'))
+                os.replace(temp, self.path)
+            except OSError:
+                pass
+
+    def definitions(self, kind):
+        """Map each defined key to its [(path, line), ...] in include order"""
+        found = {}
+        for path, symbols in self.files.items():
+            for key, line in symbols[kind]:
+                found.setdefault(key, []).append((path, line))
+        return found
+
+    def uses(self, kind):
+        return [(key, path, line) for path, symbols in self.files.items() for key, line in symbols[kind]]
+
+    def _resolve(self, kind, target):
+        if kind in ('tex', 'optional-tex'):
+            return target if os.path.splitext(target)[1] else target + '.tex'
+        if kind == 'bib':
+            return target if target.endswith('.bib') else target + '.bib'
+        return None
+
+    def _load(self, name):
+        path = os.path.join(self.directory, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        entry = self.cache.get(name)
+        if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+            return entry['symbols']
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if entry and entry['hash'] == digest:
+            entry['size'], entry['mtime'] = stat.st_size, stat.st_mtime_ns
+            return entry['symbols']
+        text = data.decode('utf-8', errors='replace')
+        if name.endswith('.bib'):
+            symbols = bib_symbols(text)
+        else:
+            collector = SymbolCollector()
+            Engine([collector]).run(name, text)
+            symbols = collector.symbols
+        return self._store(name, path, data, symbols, digest)
+
+    def _store(self, name, path, data, symbols, digest=None):
+        stat = os.stat(path)
+        self.cache[name] = {
+            'hash': digest or hashlib.sha256(data).hexdigest(),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'symbols': symbols,
+        }
+        self.files[name] = symbols
+        return symbols
+
+
+RULES = [
+    BraceBalanceRule,
+    EnvironmentBalanceRule,
+    UnescapedAmpersandRule,
+    UnescapedScriptRule,
+    UnescapedHashRule,
+    PercentAfterNumberRule,
+    DuplicateLabelRule,
+    DeprecatedCommandRule,
+    DisplayDollarsRule,
+    MacroArityRule,
+    ListMacroPairRule,
+    EnvironmentTypoRule,
+    SpaceBeforeFootnoteRule,
+    UntiedReferenceRule,
+    StraightQuotesRule,
+    MissingIncludeRule,
+    UndefinedReferenceRule,
+    UndefinedCitationRule,
+    DuplicateKeyRule,
+    UnusedLabelRule,
+    UnusedCitationRule,
+]
+
+
+def load_config(filename):
+    """Find the nearest .validate-latex.json above filename"""
+    directory = os.path.dirname(os.path.abspath(filename))
+    while True:
+        path = os.path.join(directory, CONFIG_NAME)
+        if os.path.isfile(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        if os.path.isdir(os.path.join(directory, '.git')):
+            return {}
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return {}
+        directory = parent
+
+
+def select_rules(enable=(), disable=(), config=None):
+    """Instantiate the enabled rules, CLI flags overriding the project config"""
+    config = config or {}
+    known = {rule.name for rule in RULES}
+    for name in [*config.get('enable', []), *config.get('disable', []), *enable, *disable]:
+        if name not in known:
+            raise ValueError(f"Unknown rule '{name}'")
+
+    selected = []
+    for rule in RULES:
+        active = rule.default
+        if rule.name in config.get('enable', []):
+            active = True
+        if rule.name in config.get('disable', []):
+            active = False
+        if rule.name in enable:
+            active = True
+        if rule.name in disable:
+            active = False
+        if active:
+            selected.append(rule())
+    return selected
+
+
+class Engine:
+    """Single-pass dispatcher from lexer events to rules"""
+
+    EVENTS = ('command', 'begin', 'end', 'open', 'close', 'math', 'special', 'comment')
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.handlers = {event: [] for event in self.EVENTS}
+        self.regex_rules = []
+        for rule in rules:
+            if isinstance(rule, RegexRule):
+                self.regex_rules.append(rule)
+                continue
+            for event in self.EVENTS:
+                handler = getattr(rule, 'on_' + event, None)
+                if handler:
+                    self.handlers[event].append(handler)
+        self.combined = None
+        if self.regex_rules:
+            alternatives = '|'.join(f'(?P<r{i}>{rule.pattern})' for i, rule in enumerate(self.regex_rules))
+            # Zero-width so one rule's match never hides another's at a later offset
+            self.combined = re.compile(f'(?=(?:{alternatives}))')
+
+    def run(self, filename, text):
+        ctx = Context(filename, text)
+        hits = self.combined.finditer(text) if self.combined else iter(())
+        pending_hit = next(hits, None)
+
+        pos = 0
+        while True:
+            match = TOKEN_RE.search(text, pos)
+            if not match:
+                break
+            kind = match.lastgroup
+            start, end = match.span()
+
+            # Regex hits that precede this token are reported with the current line
+            while pending_hit is not None and pending_hit.start() < start:
+                self._report_hit(pending_hit, ctx)
+                pending_hit = next(hits, None)
+
+            ctx.gap = text[pos:start]
+            ctx.scan_pos = pos = end
+
+            if kind == 'newline':
+                ctx.line += 1
+                continue
+            if kind == 'comment':
+                while pending_hit is not None and pending_hit.start() < end:
+                    pending_hit = next(hits, None)
+                self._dispatch('comment', Token(kind, match.group(), ctx.line, start, end, None), ctx)
+                continue
+
+            value = match.group()
+            token = Token(kind, value, ctx.line, start, end, None)
+
+            if kind == 'command':
+                pos, token = self._command(token, ctx)
+                if token.kind == 'verbatim':
+                    while pending_hit is not None and pending_hit.start() < pos:
+                        pending_hit = next(hits, None)
+                    continue
+            elif kind == 'open':
+                ctx.depth += 1
+                self._dispatch('open', token, ctx)
+            elif kind == 'close':
+                ctx.depth -= 1
+                if ctx.def_depth is not None and ctx.depth == ctx.def_depth:
+                    ctx.def_closed = True
+                self._dispatch('close', token, ctx)
+            elif kind == 'math':
+                self._end_definition(ctx)
+                if ctx.dollar is None:
+                    ctx.dollar = value
+                    self._dispatch('math', token, ctx)
+                else:
+                    ctx.dollar = None
+                    self._dispatch('math', token, ctx)
+            elif kind == 'special':
+                self._end_definition(ctx)
+                self._dispatch('special', token, ctx)
+
+        while pending_hit is not None:
+            self._report_hit(pending_hit, ctx)
+            pending_hit = next(hits, None)
+
+        for rule in self.rules:
+            rule.finish(ctx)
+        return ctx.issues
+
+    def _dispatch(self, event, token, ctx):
+        for handler in self.handlers[event]:
+            handler(token, ctx)
+
+    def _report_hit(self, hit, ctx):
+        rule = self.regex_rules[int(hit.lastgroup[1:])]
+        match = rule.regex.match(ctx.text, hit.start())
+        # ctx.line is exact at ctx.scan_pos; raw arguments may span lines
+        line = ctx.line - ctx.text.count('\n', hit.start(), ctx.scan_pos)
+        ctx.report(rule, line, rule.describe(match))
+
+    def _end_definition(self, ctx):
+        if ctx.def_closed and ctx.depth == ctx.def_depth:
+            ctx.def_depth = None
+            ctx.def_closed = False
+
+    def _command(self, token, ctx):
+        """Handle a control sequence; returns the new scan position and token"""
+        text = ctx.text
+        name = token.value
+        pos = token.end
+
+        if name in ('\\verb', '\\verb*', '\\lstinline'):
+            verb = VERB_RE.match(text, pos)
+            if verb and '\n' not in verb.group(2):
+                return verb.end(), token._replace(kind='verbatim')
+
+        if name in ('\\begin', '\\end'):
+            env = ENV_ARG_RE.match(text, pos)
+            if env:
+                env_name = env.group(1)
+                event = token._replace(kind=name[1:], arg=env_name, end=env.end())
+                self._dispatch('command', token, ctx)
+                if name == '\\begin':
+                    ctx.env_stack.append(env_name)
+                    if env_name in MATH_ENVS:
+                        ctx.math_envs += 1
+                    self._dispatch('begin', event, ctx)
+                    if env_name in VERBATIM_ENVS:
+                        close = text.find(f'\\end{{{env_name}}}', env.end())
+                        if close != -1:
+                            ctx.line += text.count('\n', env.end(), close)
+                            return close, token._replace(kind='verbatim')
+                else:
+                    self._dispatch('end', event, ctx)
+                    for index in range(len(ctx.env_stack) - 1, -1, -1):
+                        if ctx.env_stack[index] == env_name:
+                            del ctx.env_stack[index]
+                            if env_name in MATH_ENVS:
+                                ctx.math_envs -= 1
+                            break
+                return env.end(), event
+
+        if name in ('\\(', '\\['):
+            ctx.math_delims += 1
+        elif name in ('\\)', '\\]') and ctx.math_delims:
+            ctx.math_delims -= 1
+
+        self._end_definition(ctx)
+        if name in DEFINITION_COMMANDS and ctx.def_depth is None:
+            ctx.def_depth = ctx.depth
+            ctx.def_closed = False
+
+        if name in RAW_ARG_COMMANDS:
+            arg = RAW_ARG_RE.match(text, pos)
+            if arg:
+                token = token._replace(arg=arg.group(1).strip(), end=arg.end())
+                self._dispatch('command', token, ctx)
+                ctx.line += text.count('\n', pos, arg.end())
+                return arg.end(), token
+
+        self._dispatch('command', token, ctx)
+        return pos, token
+
+
+def format_issue(line, rule_name, message, path=None):
+    if path is not None:
+        prefix = f"{path}, line {line}: " if line is not None else f"{path}: "
+    else:
+        prefix = f"Line {line}: " if line is not None else ''
+    return f"{prefix}{message} [{rule_name}]"
+
+
+def check_latex(filename, enable=(), disable=()):
+    """Run the enabled rules; returns sorted (line, rule, message, path) tuples"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    rules = select_rules(enable, disable, load_config(filename))
+    index_rules = [rule for rule in rules if isinstance(rule, IndexRule)]
+    collector = SymbolCollector()
+    issues = Engine(rules + [collector]).run(filename, content)
+
+    if index_rules:
+        index = SymbolIndex(filename).build(content, collector.symbols)
+        root_name = os.path.basename(index.root)
+
+        def report(rule, path, line, message):
+            issues.append((line, rule.name, message, None if path == root_name else path))
+
+        for rule in index_rules:
+            rule.check(index, report)
+        index.save()
+
+    # Root-file findings in document order, included files and summaries last
+    issues.sort(key=lambda issue: (issue[3] is not None, issue[3] or '', issue[0] is None, issue[0] or 0))
+    return issues
+
+
+def validate_latex(filename, enable=(), disable=()):
+    """Check for common LaTeX errors"""
+    return [format_issue(*issue) for issue in check_latex(filename, enable, disable)]
+
 
 def main():
-    if len(sys.argv) != 2:
+    parser = argparse.ArgumentParser(description='Check LaTeX sources for common syntax errors')
+    parser.add_argument('filename', nargs='?', help='.tex file to validate')
+    parser.add_argument('--enable', action='append', default=[], metavar='RULE',
+                        help='enable a rule that is off by default or in the project config')
+    parser.add_argument('--disable', action='append', default=[], metavar='RULE',
+                        help='disable a rule')
+    parser.add_argument('--list-rules', action='store_true', help='list available rules and exit')
+    args = parser.parse_args()
+
+    if args.list_rules:
+        for rule in RULES:
+            state = 'on ' if rule.default else 'off'
+            print(f"  {state}  {rule.name:24} {rule.description}")
+        sys.exit(0)
+    if not args.filename:
         print("Usage: python validate-latex.py <filename.tex>")
         sys.exit(1)
-    
-    filename = sys.argv[1]
-    errors = validate_latex(filename)
-    
+
+    try:
+        errors = validate_latex(args.filename, args.enable, args.disable)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
     if errors:
         print("LaTeX validation errors found:")
         for error in errors:
@@ -109,4 +969,4 @@ def main():
         sys.exit(0)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()